@@ -0,0 +1,150 @@
+"""
+A small in-process stand-in for the Harbor v2.0 API, for benchmarks and local checks.
+
+Serves /projects, /projects/{p}/repositories (sortable by update_time), .../artifacts (with scan_overview),
+single artifacts and POST .../scan, with Link/X-Total-Count pagination and an
+optional per-request latency to mimic a remote registry. Scans triggered via
+POST complete after `scan_seconds`.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlparse
+
+def _scan_overview(rng, status="Success"):
+  if status != "Success":
+    return {"application/vnd.security.vulnerability.report; version=1.1": {"scan_status": status}}
+  counts = {name: rng.randint(0, 5) for name in ("critical", "high", "medium", "low")}
+  severity = next((s.capitalize() for s in ("critical", "high", "medium", "low") if counts[s]), "None")
+  return {
+    "application/vnd.security.vulnerability.report; version=1.1": {
+      "scan_status": status,
+      "severity": severity,
+      "end_time": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+      "summary": {**counts, "total": sum(counts.values())}
+    }
+  }
+
+class FakeHarbor:
+  """Builds a deterministic registry and serves it on a local port."""
+
+  def __init__(self, projects=5, repos_per_project=20, artifacts_per_repo=5, latency_ms=20, scan_seconds=0.5, seed=7):
+    rng = random.Random(seed)
+    self.latency = latency_ms / 1000
+    self.scan_seconds = scan_seconds
+    self.lock = threading.Lock()
+    self.requests = 0
+    self.pending_scans = {}  # (project, repo, reference) -> completes_at
+    self.registry = {}
+    start = 1_700_000_000
+    for p in range(projects):
+      project = f"project{p}"
+      self.registry[project] = {}
+      for r in range(repos_per_project):
+        repo = f"app{r}" if r % 4 else f"team/app{r}"
+        artifacts = []
+        for a in range(artifacts_per_repo):
+          pushed = start + rng.randint(0, 10_000_000)
+          artifacts.append({
+            "digest": f"sha256:{rng.getrandbits(256):064x}",
+            "push_time": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(pushed)),
+            "tags": [{"name": f"1.{a}.{rng.randint(0, 9)}", "push_time": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(pushed))}],
+            "scan_overview": _scan_overview(rng) if rng.random() > 0.1 else None
+          })
+        self.registry[project][repo] = artifacts
+    self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+    self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+  def __enter__(self):
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    return self
+
+  def __exit__(self, *exc):
+    self.server.shutdown()
+
+  def _artifact(self, project, repo, reference):
+    for artifact in self.registry.get(project, {}).get(repo, []):
+      if artifact["digest"] == reference or any(t["name"] == reference for t in artifact["tags"]):
+        return artifact
+    return None
+
+  def _settle_scans(self):
+    now = time.monotonic()
+    for key, completes_at in list(self.pending_scans.items()):
+      artifact = self._artifact(*key)
+      if now >= completes_at:
+        artifact["scan_overview"] = _scan_overview(random.Random(key[2]))
+        del self.pending_scans[key]
+      else:
+        artifact["scan_overview"] = _scan_overview(None, status="Running")
+
+  def _handler(self):
+    harbor = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def log_message(self, *args):
+        pass
+
+      def _send(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+          self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+      def _route(self):
+        parsed = urlparse(self.path)
+        parts = [unquote(unquote(p)) for p in parsed.path.split("/")[3:]]  # drop '', 'api', 'v2.0'
+        return parsed, parts, {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+      def _page(self, parsed, items, query):
+        page, size = int(query.get("page", 1)), int(query.get("page_size", 10))
+        chunk = items[(page - 1) * size: page * size]
+        headers = {"X-Total-Count": str(len(items))}
+        if page * size < len(items):
+          next_query = urlencode({**query, "page": page + 1, "page_size": size})
+          headers["Link"] = f'<{parsed.path}?{next_query}>; rel="next"'
+        self._send(200, chunk, headers)
+
+      def do_GET(self):
+        time.sleep(harbor.latency)
+        with harbor.lock:
+          harbor.requests += 1
+          harbor._settle_scans()
+          parsed, parts, query = self._route()
+          if parts == ["projects"]:
+            return self._page(parsed, [{"name": p, "update_time": "2024-01-01T00:00:00.000Z"} for p in harbor.registry], query)
+          if len(parts) == 3 and parts[0] == "projects" and parts[2] == "repositories":
+            repos = harbor.registry.get(parts[1], {})
+            listing = [
+              {"name": f"{parts[1]}/{r}", "artifact_count": len(a), "update_time": max((x["push_time"] for x in a), default="")}
+              for r, a in repos.items()
+            ]
+            if query.get("sort", "").lstrip("-") == "update_time":
+              listing.sort(key=lambda repo: repo["update_time"], reverse=query["sort"].startswith("-"))
+            return self._page(parsed, listing, query)
+          if len(parts) == 5 and parts[4] == "artifacts":
+            artifacts = harbor.registry.get(parts[1], {}).get(parts[3], [])
+            return self._page(parsed, artifacts, query)
+          if len(parts) == 6 and parts[4] == "artifacts":
+            artifact = harbor._artifact(parts[1], parts[3], parts[5])
+            return self._send(200, artifact) if artifact else self._send(404, {"errors": [{"code": "NOT_FOUND"}]})
+        self._send(404, {"errors": [{"code": "NOT_FOUND"}]})
+
+      def do_POST(self):
+        time.sleep(harbor.latency)
+        with harbor.lock:
+          harbor.requests += 1
+          _, parts, _ = self._route()
+          if len(parts) == 7 and parts[6] == "scan" and harbor._artifact(parts[1], parts[3], parts[5]):
+            harbor.pending_scans[(parts[1], parts[3], parts[5])] = time.monotonic() + harbor.scan_seconds
+            return self._send(202)
+        self._send(404, {"errors": [{"code": "NOT_FOUND"}]})
+
+    return Handler
@@ -0,0 +1,183 @@
+"""
+A minimal MySQL wire-protocol stand-in for benchmarks and local checks.
+
+Speaks enough of the classic protocol (handshake v10 with mysql_native_password,
+COM_QUERY text result sets, COM_PING, COM_INIT_DB, COM_QUIT) for
+mysql-connector-python's pure Python client and SQLAlchemy's MySQL dialect.
+Every statement succeeds: SELECT / SHOW return one plausible row, anything else
+returns OK. `connect_ms` models the TCP + authentication round trips a real
+server costs on each new connection; `query_ms` is added to every query.
+"""
+
+import os
+import re
+import socket
+import struct
+import threading
+import time
+
+VARIABLES = {
+  "sql_mode": "ONLY_FULL_GROUP_BY,STRICT_TRANS_TABLES,NO_ENGINE_SUBSTITUTION",
+  "lower_case_table_names": "0",
+  "character_set_client": "utf8mb4",
+  "collation_connection": "utf8mb4_0900_ai_ci",
+  "max_allowed_packet": "67108864",
+}
+
+def _lenenc_int(value: int) -> bytes:
+  if value < 251:
+    return bytes([value])
+  if value < 1 << 16:
+    return b"\xfc" + struct.pack("<H", value)
+  if value < 1 << 24:
+    return b"\xfd" + struct.pack("<I", value)[:3]
+  return b"\xfe" + struct.pack("<Q", value)
+
+def _lenenc_str(value: bytes) -> bytes:
+  return _lenenc_int(len(value)) + value
+
+class FakeMySQL:
+  """Threaded fake server on a local port; use as a context manager."""
+
+  def __init__(self, connect_ms: float = 20, query_ms: float = 1):
+    self.connect_s, self.query_s = connect_ms / 1000, query_ms / 1000
+    self.lock = threading.Lock()
+    self.connections = self.open_connections = self.queries = 0
+    self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    self.sock.bind(("127.0.0.1", 0))
+    self.sock.listen(128)
+    self.port = self.sock.getsockname()[1]
+    self._running = True
+
+  def __enter__(self):
+    threading.Thread(target=self._accept, daemon=True).start()
+    return self
+
+  def __exit__(self, *exc):
+    self._running = False
+    self.sock.close()
+
+  def _accept(self):
+    while self._running:
+      try:
+        conn, _ = self.sock.accept()
+      except OSError:
+        return
+      conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+      threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+  # Framing
+
+  @staticmethod
+  def _send(conn, seq: int, payload: bytes):
+    conn.sendall(struct.pack("<I", len(payload))[:3] + bytes([seq & 0xFF]) + payload)
+
+  @staticmethod
+  def _recv(conn):
+    header = b""
+    while len(header) < 4:
+      chunk = conn.recv(4 - len(header))
+      if not chunk:
+        return None, None
+      header += chunk
+    length, seq = int.from_bytes(header[:3], "little"), header[3]
+    payload = b""
+    while len(payload) < length:
+      chunk = conn.recv(length - len(payload))
+      if not chunk:
+        return None, None
+      payload += chunk
+    return seq, payload
+
+  @staticmethod
+  def _ok():
+    return b"\x00" + _lenenc_int(0) + _lenenc_int(0) + struct.pack("<HH", 0x0002, 0)
+
+  @staticmethod
+  def _eof():
+    return b"\xfe" + struct.pack("<HH", 0, 0x0002)
+
+  def _result_set(self, conn, columns: list, rows: list):
+    seq = 1
+    self._send(conn, seq, _lenenc_int(len(columns)))
+    for name in columns:
+      seq += 1
+      definition = (
+        _lenenc_str(b"def") + _lenenc_str(b"") + _lenenc_str(b"") + _lenenc_str(b"")
+        + _lenenc_str(name.encode()) + _lenenc_str(name.encode())
+        + b"\x0c" + struct.pack("<HIBHB", 255, 1024, 0xFD, 0, 0) + b"\x00\x00"
+      )
+      self._send(conn, seq, definition)
+    seq += 1
+    self._send(conn, seq, self._eof())
+    for row in rows:
+      seq += 1
+      self._send(conn, seq, b"".join(b"\xfb" if value is None else _lenenc_str(str(value).encode()) for value in row))
+    self._send(conn, seq + 1, self._eof())
+
+  # Session
+
+  def _handshake(self, conn):
+    salt = os.urandom(20).replace(b"\x00", b"\x01")
+    capabilities = 0x00000001 | 0x00000008 | 0x00000200 | 0x00002000 | 0x00008000 | 0x00080000
+    payload = (
+      b"\x0a" + b"8.0.36-fake\x00" + struct.pack("<I", threading.get_ident() & 0xFFFFFFFF)
+      + salt[:8] + b"\x00" + struct.pack("<H", capabilities & 0xFFFF) + bytes([255])
+      + struct.pack("<H", 0x0002) + struct.pack("<H", capabilities >> 16) + bytes([21]) + b"\x00" * 10
+      + salt[8:] + b"\x00" + b"mysql_native_password\x00"
+    )
+    self._send(conn, 0, payload)
+    seq, _ = self._recv(conn)
+    if seq is None:
+      return False
+    time.sleep(self.connect_s)
+    self._send(conn, seq + 1, self._ok())
+    return True
+
+  def _answer(self, conn, sql: str, database: str):
+    statement = sql.strip().rstrip(";")
+    lowered = statement.lower()
+    like = re.match(r"show (?:global |session )?variables like '([^']+)'", lowered)
+    if like:
+      name = like.group(1)
+      rows = [(name, VARIABLES[name])] if name in VARIABLES else []
+      return self._result_set(conn, ["Variable_name", "Value"], rows)
+    if "isolation" in lowered and lowered.startswith("select"):
+      return self._result_set(conn, ["isolation"], [("REPEATABLE-READ",)])
+    if lowered.startswith("select version()"):
+      return self._result_set(conn, ["VERSION()"], [("8.0.36-fake",)])
+    if lowered.startswith("select database()"):
+      return self._result_set(conn, ["DATABASE()"], [(database,)])
+    if lowered.startswith(("select", "show")):
+      return self._result_set(conn, ["value"], [("1",)])
+    self._send(conn, 1, self._ok())
+
+  def _serve(self, conn):
+    with self.lock:
+      self.connections += 1
+      self.open_connections += 1
+    database = None
+    try:
+      if not self._handshake(conn):
+        return
+      while True:
+        seq, payload = self._recv(conn)
+        if payload is None or payload[:1] == b"\x01":  # closed or COM_QUIT
+          return
+        command, body = payload[0], payload[1:].decode("utf-8", "replace")
+        if command == 0x03:  # COM_QUERY
+          with self.lock:
+            self.queries += 1
+          time.sleep(self.query_s)
+          self._answer(conn, body, database)
+        else:  # COM_PING, COM_INIT_DB, COM_RESET_CONNECTION, ...
+          if command == 0x02:
+            database = body
+          self._send(conn, 1, self._ok())
+    except OSError:
+      pass
+    finally:
+      conn.close()
+      with self.lock:
+        self.open_connections -= 1
@@ -0,0 +1,49 @@
+"""
+Measures the registry-wide vulnerability sweep (eternium/sub_agents/harbor/sweep.py)
+against a local fake Harbor with per-request latency, sequentially (1 worker)
+and with a bounded pool.
+
+Runs offline; no registry is needed.
+Usage: python benchmarks/harbor_sweep.py [projects] [repos_per_project] [latency_ms] [workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_harbor import FakeHarbor
+
+def main():
+  projects = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+  repos = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+  latency_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+  workers = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+
+  with FakeHarbor(projects=projects, repos_per_project=repos, latency_ms=latency_ms) as harbor:
+    # config.settings is built at import time, so the environment must be set first
+    os.environ["HARBOR_URL"] = harbor.url
+    for name, value in (("HARBOR_USERNAME", "bench"), ("HARBOR_TOKEN", "bench"),
+                        ("MEMORY_EMBEDDING_URL", "http://127.0.0.1:1"), ("MYSQL_HOST", "127.0.0.1")):
+      os.environ.setdefault(name, value)
+    os.environ.setdefault("HARBOR_POOL_SIZE", str(workers))
+    from eternium.sub_agents.harbor.client import HARBOR_CLIENT
+    from eternium.sub_agents.harbor.sweep import sweep_registry
+
+    print(f"{projects} projects x {repos} repositories, {latency_ms} ms per request")
+    baseline = None
+    for count in (1, workers):
+      harbor.requests = 0
+      start = time.perf_counter()
+      result = sweep_registry(HARBOR_CLIENT, min_severity="High", workers=count)
+      elapsed = time.perf_counter() - start
+      baseline = baseline or elapsed
+      summary = result["summary"]
+      print(f"  workers={count:<3} {elapsed * 1000:8.0f} ms  {harbor.requests} requests  "
+            f"{summary['artifacts']} artifacts  {summary['repositories'] / elapsed:7.1f} repos/s  "
+            f"x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+  main()
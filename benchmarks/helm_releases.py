@@ -0,0 +1,164 @@
+"""
+Measures the native Helm release reader (eternium/sub_agents/helm/releases.py)
+against a local fake Kubernetes API serving helm.sh/release.v1 secrets:
+a cold read (every release decoded), warm reads (metadata-only list, decoded
+releases reused by resourceVersion) and a warm read after one upgrade.
+
+Runs offline; no cluster or helm binary is needed.
+Usage: python benchmarks/helm_releases.py [namespaces] [releases_per_namespace] [revisions] [latency_ms]
+"""
+
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def make_release(namespace: str, name: str, revision: int, status: str) -> dict:
+  """A release with roughly the size of a real one: chart templates plus the rendered manifest."""
+  rng = random.Random(f"{namespace}/{name}/{revision}")
+  manifest = "".join(
+    f"---\n# Source: {name}/templates/{kind.lower()}.yaml\napiVersion: v1\nkind: {kind}\nmetadata:\n  name: {name}-{i}\n"
+    f"  labels:\n    app: {name}\n    token: {rng.randbytes(12).hex()}\n" + "  # padding\n" * 20
+    for i, kind in enumerate(["Service", "Deployment", "ConfigMap", "Secret", "ServiceAccount", "Ingress"] * 4)
+  )
+  templates = [{"name": f"templates/t{i}.yaml", "data": base64.b64encode(rng.randbytes(1500)).decode()} for i in range(20)]
+  return {
+    "name": name,
+    "namespace": namespace,
+    "version": revision,
+    "info": {
+      "status": status,
+      "description": "Upgrade complete" if revision > 1 else "Install complete",
+      "first_deployed": "2025-01-01T00:00:00Z",
+      "last_deployed": f"2025-01-{revision:02d}T00:00:00Z",
+      "notes": f"{name} is running."
+    },
+    "chart": {"metadata": {"name": name, "version": f"1.{revision}.0", "appVersion": f"2.{revision}"}, "templates": templates},
+    "config": {"replicaCount": 2},
+    "manifest": manifest
+  }
+
+def make_secret(namespace: str, name: str, revision: int, status: str, resource_version: int) -> dict:
+  payload = base64.b64encode(gzip.compress(json.dumps(make_release(namespace, name, revision, status)).encode()))
+  return {
+    "apiVersion": "v1",
+    "kind": "Secret",
+    "type": "helm.sh/release.v1",
+    "metadata": {
+      "name": f"sh.helm.release.v1.{name}.v{revision}",
+      "namespace": namespace,
+      "resourceVersion": str(resource_version),
+      "labels": {"owner": "helm", "name": name, "version": str(revision), "status": status}
+    },
+    "data": {"release": base64.b64encode(payload).decode()}
+  }
+
+class FakeKube:
+  """Threaded fake API server for Secrets: list (all / per namespace, paginated, metadata-only on request) and read."""
+
+  def __init__(self, namespaces: int, releases: int, revisions: int, latency_ms: int):
+    self.latency = latency_ms / 1000
+    self.requests = self.bytes_sent = 0
+    self.resource_version = 1000
+    self.secrets = {}
+    for n in range(namespaces):
+      for r in range(releases):
+        for revision in range(1, revisions + 1):
+          self.add(f"ns-{n}", f"app-{r}", revision, "deployed" if revision == revisions else "superseded")
+    fake = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def log_message(self, *args):
+        pass
+
+      def do_GET(self):
+        time.sleep(fake.latency)
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if len(parts) == 6:  # api/v1/namespaces/{ns}/secrets/{name}
+          secret = fake.secrets.get((parts[3], parts[5]))
+          return self._reply(secret if secret else {"kind": "Status", "code": 404}, 200 if secret else 404)
+        namespace = parts[3] if len(parts) == 5 else None
+        items = [secret for (ns, _), secret in sorted(fake.secrets.items()) if namespace in (None, ns)]
+        start, limit = int(query.get("continue") or 0), int(query.get("limit") or len(items) or 1)
+        page = items[start:start + limit]
+        if "as=PartialObjectMetadataList" in self.headers.get("Accept", ""):
+          page = [{"kind": "PartialObjectMetadata", "metadata": secret["metadata"]} for secret in page]
+        more = start + limit < len(items)
+        self._reply({"kind": "List", "metadata": {"continue": str(start + limit) if more else None}, "items": page})
+
+      def _reply(self, body: dict, status: int = 200):
+        data = json.dumps(body).encode()
+        fake.requests += 1
+        fake.bytes_sent += len(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+  def add(self, namespace: str, name: str, revision: int, status: str):
+    self.resource_version += 1
+    secret = make_secret(namespace, name, revision, status, self.resource_version)
+    self.secrets[(namespace, secret["metadata"]["name"])] = secret
+
+  def __enter__(self):
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    return self
+
+  def __exit__(self, *exc):
+    self.server.shutdown()
+
+def main():
+  namespaces = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+  releases = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+  revisions = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+  latency_ms = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+
+  # config.settings is built at import time, so the environment must be set first
+  for name, value in (("HARBOR_URL", "http://127.0.0.1:1"), ("HARBOR_USERNAME", "bench"), ("HARBOR_TOKEN", "bench"),
+                      ("MEMORY_EMBEDDING_URL", "http://127.0.0.1:1"), ("MYSQL_HOST", "127.0.0.1")):
+    os.environ.setdefault(name, value)
+  from kubernetes import client
+  from eternium.sub_agents.helm.releases import HelmReleaseReader
+
+  with FakeKube(namespaces, releases, revisions, latency_ms) as kube:
+    configuration = client.Configuration()
+    configuration.host = kube.url
+    reader = HelmReleaseReader()
+    reader._api = client.CoreV1Api(client.ApiClient(configuration))
+
+    print(f"{namespaces} namespaces x {releases} releases x {revisions} revisions, {latency_ms} ms per API request")
+
+    def run(label: str, call):
+      kube.requests = kube.bytes_sent = 0
+      start = time.perf_counter()
+      result = call()
+      elapsed = time.perf_counter() - start
+      print(f"  {label:<28} {elapsed * 1000:8.1f} ms  {kube.requests:3} requests  {kube.bytes_sent / 1024:9.1f} KiB")
+      return result
+
+    listed = run("list, all namespaces (cold)", lambda: reader.list_releases())
+    run("list, all namespaces (warm)", lambda: reader.list_releases())
+    run("history, first call", lambda: reader.history("app-0", "ns-0"))
+    run("history, again", lambda: reader.history("app-0", "ns-0"))
+    kube.add("ns-0", "app-0", revisions + 1, "deployed")
+    run("list after one upgrade", lambda: reader.list_releases())
+    print(f"  {len(listed)} releases, e.g. {listed[0]}")
+    print(f"  status: {reader.status('app-0', 'ns-0')}")
+    print(f"  stats: {reader.stats()}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,107 @@
+"""
+Compares the two ways of turning a pod list response into the get_pods payload:
+the kubernetes client's V1PodList model deserialization versus the raw orjson
+path used by eternium/sub_agents/kubernetes/listing.py.
+
+Runs offline against a synthetic PodList; no cluster is needed.
+Usage: python benchmarks/k8s_list_parsing.py [pod_count]
+"""
+
+import json
+import sys
+import time
+import orjson
+from kubernetes.client import ApiClient
+
+def make_pod_list(count: int) -> bytes:
+  """Builds a PodList body with roughly the shape and size of real pods."""
+  pods = []
+  for i in range(count):
+    pods.append({
+      "metadata": {
+        "name": f"app-{i}-7c9f8d6b5-x2k4p",
+        "namespace": "bench",
+        "uid": f"00000000-0000-0000-0000-{i:012d}",
+        "resourceVersion": str(100000 + i),
+        "creationTimestamp": "2025-01-01T00:00:00Z",
+        "labels": {"app": f"app-{i % 50}", "pod-template-hash": "7c9f8d6b5"},
+        "ownerReferences": [{"apiVersion": "apps/v1", "kind": "ReplicaSet", "name": f"app-{i}-7c9f8d6b5", "uid": "x", "controller": True}],
+      },
+      "spec": {
+        "nodeName": f"node-{i % 10}",
+        "containers": [{
+          "name": "app",
+          "image": "registry.local/app:1.2.3",
+          "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+          "env": [{"name": f"VAR_{j}", "value": "x" * 20} for j in range(10)],
+          "resources": {"limits": {"cpu": "500m", "memory": "256Mi"}, "requests": {"cpu": "100m", "memory": "128Mi"}},
+          "volumeMounts": [{"name": "data", "mountPath": "/data"}],
+        }],
+        "volumes": [{"name": "data", "emptyDir": {}}],
+      },
+      "status": {
+        "phase": "Running",
+        "podIP": f"10.0.{i // 256 % 256}.{i % 256}",
+        "startTime": "2025-01-01T00:00:05Z",
+        "conditions": [{"type": t, "status": "True", "lastTransitionTime": "2025-01-01T00:00:05Z"} for t in ("Initialized", "Ready", "ContainersReady", "PodScheduled")],
+        "containerStatuses": [{
+          "name": "app", "ready": True, "restartCount": i % 3, "image": "registry.local/app:1.2.3",
+          "imageID": "sha256:" + "a" * 64, "containerID": "containerd://" + "b" * 64,
+          "state": {"running": {"startedAt": "2025-01-01T00:00:06Z"}},
+        }],
+      },
+    })
+  return json.dumps({"apiVersion": "v1", "kind": "PodList", "metadata": {"resourceVersion": "1"}, "items": pods}).encode()
+
+class _Response:
+  def __init__(self, data):
+    self.data = data
+
+def deserialize(api_client, body):
+  """Model deserialization as the list_* calls do it, across client generations."""
+  try:
+    return api_client.deserialize(body.decode(), "V1PodList", "application/json")
+  except TypeError:
+    return api_client.deserialize(_Response(body), "V1PodList")
+
+def model_path(api_client, body):
+  pod_list = deserialize(api_client, body)
+  return [
+    {
+      "name": pod.metadata.name,
+      "status": pod.status.phase,
+      "restarts": pod.status.container_statuses[0].restart_count if pod.status.container_statuses else 0
+    }
+    for pod in pod_list.items
+  ]
+
+def raw_path(body):
+  result = []
+  for pod in orjson.loads(body).get("items") or []:
+    statuses = pod.get("status", {}).get("containerStatuses")
+    result.append({
+      "name": pod["metadata"]["name"],
+      "status": pod.get("status", {}).get("phase"),
+      "restarts": statuses[0].get("restartCount", 0) if statuses else 0
+    })
+  return result
+
+def timed(fn, *args, repeat=5):
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn(*args)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+if __name__ == "__main__":
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+  body = make_pod_list(count)
+  api_client = ApiClient()
+  assert model_path(api_client, body) == raw_path(body)
+
+  model_s = timed(model_path, api_client, body)
+  raw_s = timed(raw_path, body)
+  print(f"pods: {count}, body: {len(body) / 1e6:.1f} MB")
+  print(f"model deserialization: {model_s * 1000:8.1f} ms")
+  print(f"raw orjson:            {raw_s * 1000:8.1f} ms  ({model_s / raw_s:.1f}x faster)")
@@ -0,0 +1,79 @@
+"""
+Compares one-fact-at-a-time memory writes (add_to_memory's add_texts([fact]))
+with the batched path in eternium/sub_agents/memory/ingest.py.
+
+Runs offline: the embedding model and the vector store are local stubs whose
+latencies are modelled on an Ollama CPU host and a Milvus insert round trip.
+Usage: python benchmarks/memory_ingest.py [facts] [request_ms] [per_text_ms] [insert_ms]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+for name, value in (("HARBOR_URL", "http://127.0.0.1:1"), ("HARBOR_USERNAME", "bench"), ("HARBOR_TOKEN", "bench"),
+                    ("MEMORY_EMBEDDING_URL", "http://127.0.0.1:1"), ("MYSQL_HOST", "127.0.0.1")):
+  os.environ.setdefault(name, value)
+
+# Loaded by path: importing the memory package would connect to Milvus
+spec = importlib.util.spec_from_file_location("ingest", os.path.join(ROOT, "eternium", "sub_agents", "memory", "ingest.py"))
+ingest = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingest)
+
+class StubEmbeddings:
+  """Fixed cost per request plus a cost per text, like a CPU-bound embedding server."""
+
+  def __init__(self, request_ms: float, per_text_ms: float, dimension: int = 1024):
+    self.request_s, self.per_text_s, self.dimension = request_ms / 1000, per_text_ms / 1000, dimension
+    self.requests = 0
+
+  def embed_documents(self, texts):
+    self.requests += 1
+    time.sleep(self.request_s + self.per_text_s * len(texts))
+    return [[float(len(text))] * self.dimension for text in texts]
+
+class StubVectorStore:
+  """Fixed cost per insert call, like a Milvus round trip."""
+
+  def __init__(self, embeddings, insert_ms: float):
+    self.embeddings, self.insert_s = embeddings, insert_ms / 1000
+    self.rows, self.inserts = 0, 0
+
+  def add_embeddings(self, texts, embeddings, metadatas=None):
+    self.inserts += 1
+    time.sleep(self.insert_s)
+    self.rows += len(texts)
+    return list(range(self.rows - len(texts), self.rows))
+
+  def add_texts(self, texts, metadatas=None):
+    return self.add_embeddings(texts, self.embeddings.embed_documents(texts), metadatas)
+
+def main():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+  request_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+  per_text_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 2
+  insert_ms = float(sys.argv[4]) if len(sys.argv) > 4 else 10
+  facts = [f"Host node-{i} runs service svc-{i % 37} on port {8000 + i % 100}." for i in range(count)]
+  print(f"{count} facts, embedding {request_ms} ms/request + {per_text_ms} ms/text, insert {insert_ms} ms/call")
+
+  embeddings = StubEmbeddings(request_ms, per_text_ms)
+  store = StubVectorStore(embeddings, insert_ms)
+  start = time.perf_counter()
+  for fact in facts:
+    store.add_texts([fact])
+  single = time.perf_counter() - start
+  print(f"  one at a time  {single * 1000:8.0f} ms  {count / single:8.1f} facts/s  "
+        f"{embeddings.requests} embed requests  {store.inserts} inserts")
+
+  embeddings = StubEmbeddings(request_ms, per_text_ms)
+  store = StubVectorStore(embeddings, insert_ms)
+  result = ingest.bulk_ingest(store, embeddings, facts)
+  bulk = result["embed_seconds"] + result["insert_seconds"]
+  print(f"  bulk_ingest    {bulk * 1000:8.0f} ms  {result['facts_per_second']:8.1f} facts/s  "
+        f"{embeddings.requests} embed requests  {store.inserts} inserts  x{single / bulk:.1f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,94 @@
+"""
+Measures database backups as before (mysqldump of one database at a time into
+an uncompressed .sql file) against the backup engine
+(eternium/sub_agents/mysql/backups.py): streaming compression and several
+dumps at once.
+
+Runs offline. A stand-in `mysqldump` put first on PATH emits a synthetic dump
+of `tables` tables, `mb_per_db` MiB per database, throttled to `rate_mb` MiB/s
+to model a server-bound dump.
+Usage: python benchmarks/mysql_backup.py [databases] [mb_per_db] [rate_mb] [workers]
+"""
+
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_MYSQLDUMP = """#!{python}
+import random, sys, time
+size, rate, tables = {size}, {rate}, {tables}
+random.seed(sys.argv[-1])
+# A few MiB of varied rows, cycled: realistic-ish redundancy without a trivially repeating stream
+pool = b"".join(b"(%d,'node-%d.cluster.local','%s',%d,'user %s requested /api/v1/items/%d')," % (
+  i, random.randrange(40), random.randbytes(8).hex().encode(), random.randrange(10 ** 6),
+  random.choice([b"alice", b"bob", b"carol", b"dave"]), random.randrange(10 ** 5)) for i in range(40000))
+sys.stdout.buffer.write(b"-- MySQL dump 10.13\\n--\\n-- Host: bench    Database: " + sys.argv[-1].encode() + b"\\n")
+per_table, chunk, started, written = size // tables, 65536, time.monotonic(), 0
+for t in range(tables):
+  sys.stdout.buffer.write(b"\\n--\\n-- Table structure for table `t%d`\\n--\\n\\nCREATE TABLE `t%d` (id int, host varchar(64), token char(16), n int, msg text);\\n" % (t, t))
+  emitted = 0
+  while emitted < per_table:
+    offset = written % (len(pool) - chunk)
+    piece = pool[offset:offset + min(chunk, per_table - emitted)]
+    sys.stdout.buffer.write(piece)
+    emitted += len(piece)
+    written += len(piece)
+    delay = written / rate - (time.monotonic() - started)
+    if delay > 0:
+      time.sleep(delay)
+sys.stdout.buffer.flush()
+"""
+
+def _disk_bytes(directory: str) -> int:
+  return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if ".sql" in name)
+
+def main():
+  databases = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+  mb_per_db = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+  rate_mb = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+  workers = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+  with tempfile.TemporaryDirectory() as tmp:
+    bin_dir, old_dir, new_dir = (os.path.join(tmp, name) for name in ("bin", "old", "new"))
+    for directory in (bin_dir, old_dir, new_dir):
+      os.makedirs(directory)
+    script = os.path.join(bin_dir, "mysqldump")
+    with open(script, "w") as f:
+      f.write(FAKE_MYSQLDUMP.format(python=sys.executable, size=mb_per_db << 20, rate=rate_mb << 20, tables=8))
+    os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+
+    # config.settings is built at import time, so the environment must be set first
+    for name, value in (("HARBOR_URL", "http://127.0.0.1:1"), ("HARBOR_USERNAME", "bench"), ("HARBOR_TOKEN", "bench"),
+                        ("MEMORY_EMBEDDING_URL", "http://127.0.0.1:1"), ("MYSQL_HOST", "127.0.0.1"),
+                        ("MYSQL_USERNAME", "bench"), ("MYSQL_PASSWORD", "bench")):
+      os.environ.setdefault(name, value)
+    os.environ["MYSQL_BACKUP_DIR"] = new_dir
+    os.environ["MYSQL_BACKUP_WORKERS"] = str(workers)
+    from eternium.sub_agents.mysql.backups import BACKUP_JOBS
+
+    names = [f"db{i}" for i in range(databases)]
+    print(f"{databases} databases x {mb_per_db} MiB, mysqldump at {rate_mb} MiB/s each")
+
+    start = time.perf_counter()
+    for name in names:
+      with open(os.path.join(old_dir, f"{name}.sql"), "w") as f:
+        subprocess.run(["mysqldump", name], stdout=f, stderr=subprocess.PIPE, text=True, check=True)
+    baseline = time.perf_counter() - start
+    print(f"  sequential .sql        {baseline * 1000:8.0f} ms  {_disk_bytes(old_dir) / 2**20:7.1f} MiB on disk")
+
+    start = time.perf_counter()
+    job = BACKUP_JOBS.submit(names)
+    job.done.wait()
+    elapsed = time.perf_counter() - start
+    snapshot = job.snapshot()
+    print(f"  {workers} workers, {snapshot['compression']:<6}   {elapsed * 1000:8.0f} ms  "
+          f"{_disk_bytes(new_dir) / 2**20:7.1f} MiB on disk  {snapshot['by_state']}  x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+  main()
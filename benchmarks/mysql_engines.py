@@ -0,0 +1,79 @@
+"""
+Measures run_sql_query-style access with a new SQLAlchemy engine per query
+(the previous behaviour) against the shared EngineRegistry
+(eternium/sub_agents/mysql/engines.py), using a local fake MySQL server that
+charges `connect_ms` for every new connection.
+
+Runs offline; no MySQL server is needed. Uses mysql-connector's pure Python
+client, which is what the fake server speaks.
+Usage: python benchmarks/mysql_engines.py [queries] [databases] [connect_ms] [query_ms]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_mysql import FakeMySQL
+
+def _report(label: str, timings: list, server: FakeMySQL, baseline: float = None) -> float:
+  total = sum(timings)
+  timings = sorted(timings)
+  print(f"  {label:<18} {total * 1000:8.0f} ms  p50 {statistics.median(timings) * 1000:6.1f} ms  "
+        f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:6.1f} ms  "
+        f"{server.connections} connections opened, {server.open_connections} still open"
+        + (f"  x{baseline / total:.1f}" if baseline else ""))
+  return total
+
+def main():
+  queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+  databases = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+  connect_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+  query_ms = float(sys.argv[4]) if len(sys.argv) > 4 else 1
+
+  # config.settings is built at import time, so the environment must be set first
+  for name, value in (("HARBOR_URL", "http://127.0.0.1:1"), ("HARBOR_USERNAME", "bench"), ("HARBOR_TOKEN", "bench"),
+                      ("MEMORY_EMBEDDING_URL", "http://127.0.0.1:1"), ("MYSQL_HOST", "127.0.0.1")):
+    os.environ.setdefault(name, value)
+  from sqlalchemy import create_engine, text
+  from sqlalchemy.engine import URL
+  from eternium.sub_agents.mysql.engines import EngineRegistry
+
+  names = [f"db{i}" for i in range(databases)]
+  print(f"{queries} queries over {databases} databases, {connect_ms:g} ms per connect, {query_ms:g} ms per query")
+
+  with FakeMySQL(connect_ms=connect_ms, query_ms=query_ms) as server:
+    def url_for(db_name):
+      return URL.create("mysql+mysqlconnector", username="bench", password="bench",
+                        host="127.0.0.1", port=server.port, database=db_name)
+
+    connect_args = {"use_pure": True}
+    timings, engines = [], []
+    for i in range(queries):
+      start = time.perf_counter()
+      engine = create_engine(url_for(names[i % databases]), pool_pre_ping=True, connect_args=connect_args)
+      with engine.connect() as conn:
+        conn.execute(text("SELECT 1")).fetchall()
+      timings.append(time.perf_counter() - start)
+      engines.append(engine)  # the old code never disposed these
+    baseline = _report("engine per query", timings, server)
+    for engine in engines:
+      engine.dispose()
+
+    server.connections = 0
+    registry = EngineRegistry(url_for, max_engines=databases, idle_seconds=600, pool_size=2, max_overflow=2,
+                              pool_pre_ping=True, connect_args=connect_args)
+    timings = []
+    for i in range(queries):
+      start = time.perf_counter()
+      with registry.get(names[i % databases]).connect() as conn:
+        conn.execute(text("SELECT 1")).fetchall()
+      timings.append(time.perf_counter() - start)
+    _report("engine registry", timings, server, baseline)
+    registry.dispose_all()
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,61 @@
+"""
+Measures run_sql_query's result handling for a careless `SELECT *` on a big
+table: the previous full `mappings().all()` list of dicts against the capped
+columnar reader (eternium/sub_agents/mysql/results.py), on an in-memory SQLite
+table so no MySQL server is needed.
+
+Usage: python benchmarks/sql_result_cap.py [rows] [max_rows]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+import orjson
+from sqlalchemy import create_engine, text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def _load_results():
+  # Load the module on its own; importing the mysql package would build the agent
+  spec = importlib.util.spec_from_file_location("results", os.path.join(ROOT, "eternium/sub_agents/mysql/results.py"))
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+def _measure(label: str, run) -> float:
+  tracemalloc.start()
+  start = time.perf_counter()
+  payload = run()
+  elapsed = time.perf_counter() - start
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  size = len(orjson.dumps(payload, default=str))
+  print(f"  {label:<14} {elapsed * 1000:8.1f} ms  peak {peak / 2**20:7.1f} MiB  response {size / 1024:9.1f} KiB")
+  return elapsed
+
+def main():
+  rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+  max_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+  results = _load_results()
+
+  engine = create_engine("sqlite://")
+  with engine.begin() as conn:
+    conn.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, host TEXT, level TEXT, message TEXT, created TEXT)"))
+    conn.execute(
+      text("INSERT INTO events (host, level, message, created) VALUES (:host, :level, :message, :created)"),
+      [{"host": f"node-{i % 50}", "level": "INFO", "message": f"request {i} served in {i % 97} ms",
+        "created": f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}"} for i in range(rows)]
+    )
+
+  print(f"SELECT * over {rows} rows, max_rows={max_rows}")
+  query = "SELECT * FROM events"
+  with engine.connect() as conn:
+    baseline = _measure("all rows", lambda: [dict(row) for row in conn.execute(text(query)).mappings().all()])
+    capped = _measure("capped", lambda: results.run_capped(conn, query, max_rows=max_rows, max_bytes=64_000))
+  print(f"  x{baseline / capped:.0f} faster")
+
+if __name__ == "__main__":
+  main()
@@ -28,6 +28,20 @@ class AppSettings(BaseSettings):
   enabled_mysql: bool = True
   enabled_prometheus: bool = True
 
+  # Parallel fan-out from the coordinator to several specialists
+  enabled_fanout: bool = True
+  fanout_max_concurrency: int = 4
+  fanout_timeout_seconds: int = 300
+
+  # Keyword fast-path router in front of the coordinator LLM
+  enabled_router: bool = True
+  router_min_score: int = 1
+  router_max_words: int = 30
+
+  # Shared TTL cache for read-only tool results
+  tool_cache_enabled: bool = True
+  tool_cache_max_entries: int = 1024
+
   model_config = SettingsConfigDict(env_prefix='APP_')
 
   @property
@@ -55,6 +69,23 @@ class HarborSettings(BaseSettings):
   username: str
   token: str
   ssl_verify: bool = True
+  connect_timeout_seconds: float = 5.0
+  read_timeout_seconds: float = 30.0
+  max_retries: int = 3
+  retry_backoff_seconds: float = 0.5
+  page_size: int = 100
+  pool_size: int = 10
+  sweep_workers: int = 8
+  scan_max_concurrent: int = 4
+  scan_poll_initial_seconds: float = 2.0
+  scan_poll_max_seconds: float = 30.0
+  scan_timeout_seconds: int = 900
+  scan_wait_max_seconds: int = 120
+  scan_jobs_retained: int = 100
+  catalog_enabled: bool = True
+  catalog_path: str = "data/harbor_catalog.db"
+  catalog_refresh_seconds: int = 300
+  catalog_full_refresh_seconds: int = 3600
   model_config = SettingsConfigDict(env_prefix='HARBOR_')
 
 class MilvusSettings(BaseSettings):
@@ -71,6 +102,32 @@ class MemorySettings(BaseSettings):
   auto_id: bool = True
   drop_old: bool = False
   threshold: float = 0.7
+  embedding_cache_enabled: bool = True
+  embedding_cache_dir: str = "data/embeddings"
+  embedding_cache_max_entries: int = 10000
+  ingest_embed_batch_size: int = 64
+  ingest_insert_batch_size: int = 512
+  ingest_chunk_chars: int = 1000
+  ingest_chunk_overlap: int = 100
+  # Vector store: 'milvus', or 'local' for the embedded file-backed index
+  backend: str = "milvus"
+  local_store_dir: str = "data/memory_index"
+  local_ann_min_rows: int = 20000
+  local_ann_nprobe: int = 8
+  local_checkpoint_every: int = 1000
+  # Retrieval: 'vector', or 'hybrid' to fuse BM25 keyword and vector rankings
+  retrieval_mode: str = "hybrid"
+  query_k: int = 3
+  hybrid_candidates: int = 20
+  rrf_k: int = 60
+  keyword_index_path: str = "data/memory_keywords.db"
+  # Near-duplicate detection: MinHash/LSH prefilter, then embedding distance
+  dedup_enabled: bool = True
+  dedup_num_perm: int = 64
+  dedup_bands: int = 16
+  dedup_shingle_size: int = 2
+  dedup_min_jaccard: float = 0.5
+  dedup_max_distance: float = 0.1
   model_config = SettingsConfigDict(env_prefix='MEMORY_')
 
 class MysqlSettings(BaseSettings):
@@ -79,6 +136,29 @@ class MysqlSettings(BaseSettings):
   username: Optional[str] = None
   password: Optional[str] = None
   port: int = 3306
+  pool_size: int = 5
+  max_overflow: int = 5
+  pool_recycle_seconds: int = 1800
+  pool_timeout_seconds: int = 10
+  max_engines: int = 16
+  engine_idle_seconds: int = 600
+  query_max_rows: int = 200
+  query_max_bytes: int = 64_000
+  query_batch_rows: int = 200
+  query_auto_limit: bool = True
+  schema_cache_ttl_seconds: int = 600
+  schema_digest_max_chars: int = 6000
+  explain_max_nodes: int = 60
+  explain_min_scan_rows: int = 1000
+  backup_dir: str = "/backups"
+  backup_workers: int = 2
+  backup_compression: str = "zstd"  # zstd | gzip | none; zstd falls back to gzip without the binary
+  backup_compression_level: int = 3
+  backup_chunk_bytes: int = 1048576
+  backup_retention_days: int = 14
+  backup_keep_last: int = 3
+  backup_jobs_retained: int = 20
+  backup_wait_max_seconds: int = 300
   model_config = SettingsConfigDict(env_prefix='MYSQL_')
 
 class DockerSettings(BaseSettings):
@@ -87,10 +167,49 @@ class DockerSettings(BaseSettings):
   client: Optional[str] = None
   model_config = SettingsConfigDict(env_prefix='DOCKER_')
 
+class KubernetesSettings(BaseSettings):
+  """Configuration for the Kubernetes agent's watch-backed resource cache."""
+  cache_enabled: bool = True
+  cache_resync_seconds: int = 600
+  cache_max_staleness_seconds: int = 180
+  watch_timeout_seconds: int = 60
+  list_page_size: int = 500
+  log_workers: int = 8
+  log_max_total_bytes: int = 200000
+  log_request_timeout_seconds: int = 15
+  log_condense_min_lines: int = 200
+  log_condense_max_lines: int = 150
+  log_condense_max_line_chars: int = 500
+  events_retention_seconds: int = 3600
+  events_per_object: int = 50
+  events_max_warnings: int = 2000
+  model_config = SettingsConfigDict(env_prefix='KUBERNETES_')
+
 class HelmSettings(BaseSettings):
-  """Configuration for the Docker agent."""
-  # This agent doesn't need env vars, but we have a class for consistency.
-  pass
+  """Configuration for the Helm agent's native release reader."""
+  native_releases: bool = True  # read release secrets via the Kubernetes API instead of forking helm
+  driver: str = "secret"  # Helm's own HELM_DRIVER; the native reader only understands the secret driver
+  list_page_size: int = 500
+  read_workers: int = 8
+  model_config = SettingsConfigDict(env_prefix='HELM_')
+
+class ExecutorSettings(BaseSettings):
+  """Thread pool, per-backend concurrency limits and timeouts for the blocking tools."""
+  max_workers: int = 32
+  default_concurrency: int = 4
+  default_timeout_seconds: int = 60
+  kubernetes_concurrency: int = 8
+  harbor_concurrency: int = 4
+  helm_concurrency: int = 2
+  helm_timeout_seconds: int = 120
+  helm_upgrade_timeout_seconds: int = 660
+  docker_concurrency: int = 2
+  docker_timeout_seconds: int = 900
+  mysql_concurrency: int = 4
+  memory_concurrency: int = 4
+  memory_ingest_timeout_seconds: int = 900
+  prometheus_concurrency: int = 4
+  model_config = SettingsConfigDict(env_prefix='EXECUTOR_')
 
 # --- The Master Settings Class ---
 class Settings(BaseSettings):
@@ -103,6 +222,8 @@ class Settings(BaseSettings):
   memory: MemorySettings = MemorySettings()
   docker: DockerSettings = DockerSettings()
   helm: HelmSettings = HelmSettings()
+  kubernetes: KubernetesSettings = KubernetesSettings()
+  executor: ExecutorSettings = ExecutorSettings()
   mysql: MysqlSettings = MysqlSettings()
 
 # --- Global Singleton ---
@@ -6,7 +6,7 @@ import importlib
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.models.lite_llm import LiteLlm
-from . import prompt
+from . import fanout, prompt, router
 from config import settings
 
 llm = LiteLlm(
@@ -26,6 +26,7 @@ AGENT_BLUEPRINTS = {
 }
 available_agents = []
 enabled_agent_rules = []
+specialists = {}
 
 print("Assembling agency...")
 for agent_name, config in AGENT_BLUEPRINTS.items():
@@ -39,13 +40,21 @@ for agent_name, config in AGENT_BLUEPRINTS.items():
       # The worker agent is created with the same llm
       agent_instance = factory_function(llm)
 
-      available_agents.append(AgentTool(agent=agent_instance))
+      agent_tool = AgentTool(agent=agent_instance)
+      available_agents.append(agent_tool)
+      specialists[agent_name] = agent_tool
       enabled_agent_rules.append(config['prompt_snippet'])
     except (ImportError, AttributeError) as e:
       print(f"  - WARNING: Could not load agent '{agent_name}'. Error: {e}")
   else:
     print(f"No settngs for {agent_name}")
 
+# Let the coordinator fan independent sub-tasks out to several specialists at once
+if settings.app.enabled_fanout and len(specialists) > 1:
+  print(f"  - Enabling parallel fan-out across: {', '.join(specialists)}")
+  available_agents.append(fanout.create_fanout_tool(specialists))
+  enabled_agent_rules.append(prompt.FANOUT_RULE.format(specialist_keys=", ".join(f"`{key}`" for key in specialists)))
+
 delegation_rules = "\n".join(enabled_agent_rules)
 final_prompt = prompt.COORDINATOR_PROMPT_TEMPLATE.format(delegation_rules=delegation_rules)
 
@@ -54,7 +63,8 @@ eternium_coordinator = Agent(
   name="eternium_coordinator",
   model=llm,
   instruction=final_prompt,
-  tools=available_agents
+  tools=available_agents,
+  before_model_callback=router.create_router_callback(specialists) if settings.app.enabled_router else None
 )
 
 root_agent = eternium_coordinator
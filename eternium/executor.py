@@ -0,0 +1,62 @@
+"""
+Shared execution layer that keeps blocking tools off the server's event loop.
+
+Every tool in the sub-agents is a plain synchronous function (kubernetes client,
+requests, subprocess, Docker SDK, Milvus). ADK calls synchronous tools inline on
+the uvicorn event loop, so one slow call stalls every other session. The agent
+factories wrap their tools with `offload`, which turns each one into a coroutine
+that runs the original function on a shared thread pool, under a per-backend
+concurrency limit and timeout.
+"""
+
+import asyncio
+import functools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+
+_POOL = ThreadPoolExecutor(max_workers=settings.executor.max_workers, thread_name_prefix="tool")
+_SEMAPHORES = {}
+
+def _semaphore(backend: str) -> asyncio.Semaphore:
+  semaphore = _SEMAPHORES.get(backend)
+  if semaphore is None:
+    limit = getattr(settings.executor, f"{backend}_concurrency", settings.executor.default_concurrency)
+    semaphore = _SEMAPHORES[backend] = asyncio.Semaphore(limit)
+  return semaphore
+
+def _returns_list(func) -> bool:
+  return_type = typing.get_type_hints(func).get("return")
+  return return_type is list or typing.get_origin(return_type) is list
+
+def offload(backend: str, func, timeout: int = None):
+  """
+  Wraps a blocking tool as a coroutine that runs on the shared thread pool.
+  At most `<backend>_concurrency` calls per backend run at once, and a call that
+  outlives `timeout` (default `<backend>_timeout_seconds`) returns an error to the
+  agent. The worker thread itself cannot be interrupted: it keeps its backend slot
+  until it finishes, so timed-out calls still count against the limit.
+  """
+  timeout = timeout or getattr(settings.executor, f"{backend}_timeout_seconds", settings.executor.default_timeout_seconds)
+  returns_list = _returns_list(func)
+
+  @functools.wraps(func)
+  async def wrapper(*args, **kwargs):
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphore(backend)
+    await semaphore.acquire()
+    future = loop.run_in_executor(_POOL, functools.partial(func, *args, **kwargs))
+    future.add_done_callback(lambda _: semaphore.release())
+    try:
+      return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+    except asyncio.TimeoutError:
+      print(f"--- WARNING: {func.__name__} timed out after {timeout}s ---")
+      error = {"error": f"{func.__name__} timed out after {timeout} seconds."}
+      return [error] if returns_list else error
+
+  return wrapper
+
+def offload_all(backend: str, funcs: list, timeouts: dict = None) -> list:
+  """Applies `offload` to a list of tools, with optional per-tool timeouts keyed by function name."""
+  timeouts = timeouts or {}
+  return [offload(backend, func, timeouts.get(func.__name__)) for func in funcs]
@@ -0,0 +1,58 @@
+"""
+Parallel fan-out from the coordinator to several specialists at once.
+
+Normally the coordinator calls its specialists (AgentTools) one after another, so
+a cross-domain question costs the sum of every specialist's latency. The tool
+built here lets the coordinator hand independent sub-tasks to several
+specialists in a single call; they run concurrently under a global cap and the
+outputs come back merged, so the call takes about as long as the slowest one.
+"""
+
+import asyncio
+import time
+from google.adk.tools.tool_context import ToolContext
+from config import settings
+
+def create_fanout_tool(specialists: dict):
+  """
+  Builds the `delegate_in_parallel` tool over the enabled specialists.
+  `specialists` maps a specialist key (e.g. 'kubernetes') to its AgentTool.
+  """
+
+  async def _run_task(semaphore: asyncio.Semaphore, task: dict, tool_context: ToolContext) -> dict:
+    key = str(task.get("specialist", "")).lower()
+    request = task.get("request", "")
+    agent_tool = specialists.get(key)
+    if agent_tool is None:
+      return {"specialist": key, "request": request, "error": f"Unknown specialist '{key}'. Options: {sorted(specialists)}"}
+
+    async with semaphore:
+      start = time.monotonic()
+      try:
+        result = await asyncio.wait_for(
+          agent_tool.run_async(args={"request": request}, tool_context=tool_context),
+          timeout=settings.app.fanout_timeout_seconds
+        )
+        outcome = {"result": result}
+      except asyncio.TimeoutError:
+        outcome = {"error": f"Timed out after {settings.app.fanout_timeout_seconds} seconds."}
+      except Exception as e:
+        outcome = {"error": f"Specialist failed: {e}"}
+      return {"specialist": key, "request": request, **outcome, "elapsed_seconds": round(time.monotonic() - start, 2)}
+
+  async def delegate_in_parallel(tasks: list[dict], tool_context: ToolContext) -> dict:
+    """
+    Sends several independent sub-tasks to different specialists at the same time and returns all their answers together.
+    Use this when a question needs more than one specialist and the sub-tasks do not depend on each other's results
+    (e.g. "is app X healthy?" -> pods from kubernetes, release status from helm, CPU from prometheus).
+    Args:
+      tasks: A list of objects, each with a 'specialist' (one of the specialist keys, e.g. 'kubernetes', 'helm', 'prometheus')
+             and a 'request' (the full natural-language sub-task for that specialist).
+    """
+    print(f"--- TOOL: Called delegate_in_parallel with {len(tasks)} tasks ---")
+    semaphore = asyncio.Semaphore(settings.app.fanout_max_concurrency)
+    start = time.monotonic()
+    results = await asyncio.gather(*(_run_task(semaphore, task, tool_context) for task in tasks))
+    return {"results": list(results), "elapsed_seconds": round(time.monotonic() - start, 2)}
+
+  return delegate_in_parallel
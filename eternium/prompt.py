@@ -43,6 +43,13 @@ MYSQL_DELEGATION_RULE = """
     * **Delegate When:** The user's query involves keywords such as: `mysql`, `create database`, `create db user`, `change db password`, `backup database`, `retore database`.
 """
 
+FANOUT_RULE = """
+**Parallel Delegation (`delegate_in_parallel`)**
+    * **Function:** Sends several independent sub-tasks to different specialists at the same time and returns all of their answers together.
+    * **Use When:** A request needs more than one specialist and no sub-task depends on another's result (e.g. "is app X healthy?" needs pods, Helm release status and CPU usage). Each task names a `specialist` ({specialist_keys}) and gives it a complete `request`.
+    * **Do Not Use When:** One step needs the output of another (e.g. find a pod's image first, then scan that image). Call those specialists one after another instead.
+"""
+
 # --- Main Prompt Template ---
 
 COORDINATOR_PROMPT_TEMPLATE = """
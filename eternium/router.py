@@ -0,0 +1,142 @@
+"""
+Deterministic fast-path router for the coordinator.
+
+The coordinator spends a full LLM turn just to pick a specialist, even for
+requests whose keywords make the choice obvious under the delegation rules in
+prompt.py. This router scores the user's message against the same keywords in a
+`before_model_callback`. When exactly one specialist matches the opening message
+of a session, it answers the coordinator's first model call itself with a
+function call to that specialist, skipping one LLM round trip. Anything
+ambiguous falls through to the LLM, and so does every follow-up: a specialist
+called as a tool sees only its request, not the conversation, so "and its
+logs?" needs the coordinator to fill in what "its" means (and to consult memory
+first).
+"""
+
+import re
+import threading
+from collections import Counter, deque
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from config import settings
+
+# Mirrors the "Delegate When" keywords of each *_DELEGATION_RULE in prompt.py.
+# Words shared between domains (status, version, memory, usage) are left out on
+# purpose: they are exactly the cases the LLM should decide.
+ROUTING_KEYWORDS = {
+  'kubernetes': [r"pods?", r"deployments?", r"namespaces?", r"statefulsets?", r"daemonsets?", r"ingress(es)?", r"logs?", r"describe", r"kubernetes", r"k8s", r"crash ?loop\w*"],
+  'harbor':     [r"harbor", r"vulnerabilit(y|ies)", r"cves?", r"scan", r"registry", r"repositor(y|ies)"],
+  'prometheus': [r"prometheus", r"metrics?", r"cpu", r"promql", r"traffic", r"load average"],
+  'docker':     [r"docker", r"pull (the )?image", r"push (the )?image", r"re-?tag"],
+  'helm':       [r"helm", r"releases?", r"charts?"],
+  'memory':     [r"remember", r"recall", r"forget", r"take a note", r"save this", r"what did i (say|tell you)", r"delete (the )?note"],
+  'mysql':      [r"mysql", r"databases?", r"db users?", r"sql", r"mysqldump"],
+}
+_PATTERNS = {
+  key: [re.compile(rf"\b{pattern}\b", re.IGNORECASE) for pattern in patterns]
+  for key, patterns in ROUTING_KEYWORDS.items()
+}
+
+class RouterStats:
+  """Thread-safe counters for routing decisions, exposed by main.py."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.total = 0
+    self.routed = Counter()
+    self.fallthrough = Counter()  # reason -> count
+    self.recent = deque(maxlen=50)
+
+  def record(self, specialist: str, reason: str, scores: dict):
+    with self._lock:
+      self.total += 1
+      if specialist:
+        self.routed[specialist] += 1
+      else:
+        self.fallthrough[reason] += 1
+      self.recent.append({"specialist": specialist, "reason": reason, "scores": scores})
+
+  def snapshot(self) -> dict:
+    with self._lock:
+      routed = sum(self.routed.values())
+      return {
+        "total_requests": self.total,
+        "routed": routed,
+        "hit_rate": round(routed / self.total, 4) if self.total else 0.0,
+        "routed_by_specialist": dict(self.routed),
+        "fallthrough_by_reason": dict(self.fallthrough),
+        "recent_decisions": list(self.recent)
+      }
+
+ROUTER_STATS = RouterStats()
+
+def classify(text: str, candidates) -> tuple:
+  """
+  Scores text against each candidate specialist's keywords.
+  Returns (specialist or None, reason, scores); a specialist is only chosen when
+  it is the single one with at least `router_min_score` keyword hits. Long,
+  multi-part requests are left to the LLM (and its memory lookup step).
+  """
+  if len(text.split()) > settings.app.router_max_words:
+    return None, "too_long", {}
+
+  scores = {}
+  for key in candidates:
+    hits = sum(1 for pattern in _PATTERNS.get(key, []) if pattern.search(text))
+    if hits:
+      scores[key] = hits
+  if not scores:
+    return None, "no_match", scores
+  if len(scores) > 1:
+    return None, "ambiguous", scores
+  key, hits = next(iter(scores.items()))
+  if hits < settings.app.router_min_score:
+    return None, "low_score", scores
+  return key, "matched", scores
+
+def _user_text(llm_request: LlmRequest):
+  """The user's message if this is the first model call of the turn, else None."""
+  if not llm_request.contents:
+    return None
+  last = llm_request.contents[-1]
+  if last.role != "user" or not last.parts or any(part.function_response for part in last.parts):
+    return None
+  return " ".join(part.text for part in last.parts if part.text).strip() or None
+
+def _is_follow_up(llm_request: LlmRequest) -> bool:
+  """True when the session already has model replies or tool calls before the latest message."""
+  return any(
+    content.role == "model" or any(part.function_call or part.function_response for part in content.parts or [])
+    for content in llm_request.contents[:-1]
+  )
+
+def create_router_callback(specialists: dict):
+  """
+  Builds a before_model_callback for the coordinator. `specialists` maps a
+  specialist key (e.g. 'kubernetes') to its AgentTool.
+  """
+
+  def route_request(callback_context: CallbackContext, llm_request: LlmRequest):
+    text = _user_text(llm_request)
+    if text is None:
+      return None  # Tool results are back: let the LLM synthesise the answer
+    if _is_follow_up(llm_request):
+      ROUTER_STATS.record(None, "follow_up", {})
+      return None
+
+    specialist, reason, scores = classify(text, specialists)
+    ROUTER_STATS.record(specialist, reason, scores)
+    if specialist is None:
+      return None
+
+    agent_tool = specialists[specialist]
+    print(f"--- ROUTER: Fast-path to {agent_tool.name} (scores: {scores}) ---")
+    return LlmResponse(
+      content=types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name=agent_tool.name, args={"request": text}))]
+      )
+    )
+
+  return route_request
@@ -1,7 +1,11 @@
 """Tools for pulling, tagging, and pushing container images using the Docker daemon."""
+from urllib.parse import urlparse
 import docker
 from google.adk.agents import Agent
 from config import settings
+from ...executor import offload_all
+from ...tool_cache import invalidates
+from ..harbor.catalog import HARBOR_CATALOG
 from . import prompt
 
 DOCKER_CLIENT = None
@@ -45,6 +49,18 @@ def retag_image(source_image: str, target_image: str, **kwargs) -> dict:
   except Exception as e:
     return {"status": "error", "message": str(e)}
 
+def _harbor_repository(image_name_with_tag: str):
+  """(project, repository) when the image is pushed to the configured Harbor registry, else None."""
+  name = image_name_with_tag.split("@", 1)[0]
+  if ":" in name.rsplit("/", 1)[-1]:
+    name = name.rsplit(":", 1)[0]
+  registry, _, path = name.partition("/")
+  project, _, repository = path.partition("/")
+  if registry.split(":", 1)[0] != urlparse(settings.harbor.url).hostname or not repository:
+    return None
+  return project, repository
+
+@invalidates(("harbor",))
 def push_image(image_name_with_tag: str, **kwargs) -> dict:
   """
   Pushes a tagged image from the local Docker host to a registry.
@@ -57,6 +73,11 @@ def push_image(image_name_with_tag: str, **kwargs) -> dict:
     result = DOCKER_CLIENT.images.push(image_name_with_tag, stream=False, decode=False)
     if "error" in result:
       return {"status": "error", "message": result}
+    harbor_repository = _harbor_repository(image_name_with_tag)
+    if harbor_repository:
+      # The registry catalog answers tag listings; have it re-read this repository now
+      HARBOR_CATALOG.mark_stale(*harbor_repository)
+      HARBOR_CATALOG.refresh_async()
     return {"status": "success", "message": f"Successfully pushed {image_name_with_tag}."}
   except Exception as e:
     return {"status": "error", "message": str(e)}
@@ -68,9 +89,9 @@ def create_docker_agent(llm):
     model=llm,
     instruction=prompt.DOCKER_AGENT_INSTRUCTIONS,
     output_key="docker_output",
-    tools=[
+    tools=offload_all("docker", [
       pull_image,
       retag_image,
       push_image
-    ],
+    ]),
   )
@@ -4,88 +4,96 @@ import json
 import requests
 from google.adk import Agent
 from config import settings
+from ...executor import offload_all
+from ...tool_cache import cached
 from . import prompt
+from .catalog import HARBOR_CATALOG
+from .client import HARBOR_CLIENT, repo_path
+from .scan_jobs import SCAN_JOBS
+from .sweep import sweep_registry
 
-# Helper for API calls
-def _make_harbor_request(method, endpoint):
+# Helpers for API calls
+def _make_harbor_request(method, endpoint, payload=None, params=None):
   """
   A helper to abstract away the request and error handling.
   """
-  url = f"{HARBOR_URL}{endpoint}"
   try:
-    response = requests.request(
-      method,
-      settings.harbor.url,
-      auth=(
-        settings.harbor.username,
-        settings.harbor.token
-      ),
-      verify=settings.harbor.ssl_verify
-    )
-    response.raise_for_status()
-    return response.json()
+    response = HARBOR_CLIENT.request(method, endpoint, params=params, payload=payload)
+    return response.json() if response.content else {"status": "success"}
   except requests.exceptions.HTTPError as e:
     # Return a structured error
     return {"error": f"HTTP Error: {e.response.status_code} - {e.response.text}"}
   except requests.exceptions.RequestException as e:
     return {"error": f"Request failed: {e}"}
 
+def _get_all_pages(endpoint, params=None):
+  """
+  Fetches every page of a Harbor list endpoint. Returns a list, or an error dict.
+  """
+  try:
+    return HARBOR_CLIENT.get_all(endpoint, params=params)
+  except requests.exceptions.HTTPError as e:
+    return {"error": f"HTTP Error: {e.response.status_code} - {e.response.text}"}
+  except requests.exceptions.RequestException as e:
+    return {"error": f"Request failed: {e}"}
+
 # Tool Functions
 
+@cached(ttl=300, scope=("harbor",))
 def list_harbor_projects(**kwargs) -> list:
   """
   Retrieves a list of all project names in the Harbor registry.
   """
   print("--- TOOL: Called list_harbor_projects ---")
-  data = _make_harbor_request("GET", "/api/v2.0/projects")
+  if HARBOR_CATALOG.ensure_fresh():
+    return HARBOR_CATALOG.projects()
+  data = _get_all_pages("/projects")
 
   if "error" in data:
     return [data]  # Return list with an error dict
 
-  if not data:
-    return []  # Return an empty list if no projects
-
   return [project['name'] for project in data]
 
+@cached(ttl=300, scope=("harbor", "project_name"))
 def list_harbor_repositories(project_name: str, **kwargs) -> list:
   """
   Lists all container image repositories within a specific Harbor project.
   """
   print(f"--- TOOL: Called list_harbor_repositories for project '{project_name}' ---")
-  endpoint = f"/api/v2.0/projects/{project_name}/repositories"
-  data = _make_harbor_request("GET", endpoint)
+  if HARBOR_CATALOG.ensure_fresh() and not HARBOR_CATALOG.is_stale(project_name) and project_name in HARBOR_CATALOG.projects():
+    return HARBOR_CATALOG.repositories(project_name)
+  data = _get_all_pages(f"/projects/{project_name}/repositories")
 
   if "error" in data:
     return [data]
 
-  if not data:
-    return []
-
-  return [repo['name'].replace(f"{project_name}/", "") for repo in data]
+  return [repo['name'].replace(f"{project_name}/", "", 1) for repo in data]
 
+@cached(ttl=120, scope=("harbor", "project_name", "repository_name"))
 def list_image_tags(project_name: str, repository_name: str, **kwargs) -> list:
   """
   Lists all the tags for a specific image repository in a Harbor project.
   """
   print(f"--- TOOL: Called list_image_tags for {project_name}/{repository_name} ---")
-  endpoint = f"/api/v2.0/projects/{project_name}/repositories/{repository_name}/artifacts"
-  data = _make_harbor_request("GET", endpoint)
+  if (HARBOR_CATALOG.ensure_fresh() and not HARBOR_CATALOG.is_stale(project_name, repository_name)
+      and repository_name in HARBOR_CATALOG.repositories(project_name)):
+    return HARBOR_CATALOG.tags(project_name, repository_name)
+  endpoint = f"/projects/{project_name}/repositories/{repo_path(repository_name)}/artifacts"
+  data = _get_all_pages(endpoint, params={"with_tag": "true", "with_label": "false", "with_scan_overview": "false"})
 
   if "error" in data:
     return [data]
 
-  if not data:
-    return []
-
-  return [artifact['tags'][0]['name'] for artifact in data if artifact.get('tags')]
+  return [tag['name'] for artifact in data for tag in artifact.get('tags') or []]
 
+@cached(ttl=120, scope=("harbor", "project_name", "repository_name"))
 def get_vulnerability_report(project_name: str, repository_name: str, tag: str, **kwargs) -> dict:
   """
   Retrieves the security vulnerability report for a specific container image tag.
   """
   print(f"--- TOOL: Called get_vulnerability_report for {project_name}/{repository_name}:{tag} ---")
-  endpoint = f"/api/v2.0/projects/{project_name}/repositories/{repository_name}/artifacts/{tag}?with_scan_overview=true"
-  data = _make_harbor_request("GET", endpoint)
+  endpoint = f"/projects/{project_name}/repositories/{repo_path(repository_name)}/artifacts/{tag}"
+  data = _make_harbor_request("GET", endpoint, params={"with_scan_overview": "true"})
 
   if "error" in data:
     return data
@@ -111,20 +119,118 @@ def get_vulnerability_report(project_name: str, repository_name: str, tag: str,
     }
   }
 
+def find_images(query: str, max_results: int = 50, **kwargs) -> list:
+  """
+  Searches the whole registry for repositories whose name or tags contain the query text.
+  Use this for "which repository has image X" or "where is tag Y" questions.
+  Args:
+    query: Part of a repository name or tag, e.g. 'nginx' or '1.25'.
+    max_results: Maximum number of repositories to return.
+  """
+  print(f"--- TOOL: Called find_images for '{query}' ---")
+  if not HARBOR_CATALOG.ensure_synced():
+    return [{"error": "The registry catalog is still being built. Try again shortly, or use list_harbor_repositories."}]
+  return HARBOR_CATALOG.search(query, limit=max_results)
+
+def get_latest_tags(project_name: str, repository_name: str, count: int = 5, **kwargs) -> list:
+  """
+  Returns the newest tags of a repository ordered by semantic version (1.10.0 before 1.9.2),
+  with each tag's digest, push time and scan severity.
+  Args:
+    project_name: The Harbor project.
+    repository_name: The repository within the project.
+    count: How many tags to return, newest first.
+  """
+  print(f"--- TOOL: Called get_latest_tags for {project_name}/{repository_name} ---")
+  if not HARBOR_CATALOG.ensure_synced():
+    return [{"error": "The registry catalog is still being built. Try again shortly, or use list_image_tags."}]
+  tags = HARBOR_CATALOG.latest_tags(project_name, repository_name, limit=count)
+  return tags or [{"error": f"No tags found for {project_name}/{repository_name}."}]
+
+def find_image_by_digest(digest: str, **kwargs) -> list:
+  """
+  Finds every repository and tag that holds an image with the given digest.
+  Args:
+    digest: A full 'sha256:...' digest or a unique prefix of it.
+  """
+  print(f"--- TOOL: Called find_image_by_digest for {digest} ---")
+  if not HARBOR_CATALOG.ensure_synced():
+    return [{"error": "The registry catalog is still being built. Try again shortly."}]
+  return HARBOR_CATALOG.find_digest(digest) or [{"error": f"No image with digest {digest} found."}]
+
+@cached(ttl=300, scope=("harbor", "project_name"))
+def sweep_vulnerabilities(project_name: str = None, min_severity: str = "High", max_results: int = 50, **kwargs) -> dict:
+  """
+  Scans the scan results of EVERY image in the registry (or in one project) in a single call and
+  returns a table of the most vulnerable images, ranked by severity.
+  Use this for registry-wide security questions such as "which images have critical CVEs?".
+  Args:
+    project_name: Restrict the sweep to one Harbor project. Leave empty for the whole registry.
+    min_severity: Lowest severity to include: 'Critical', 'High', 'Medium' or 'Low'.
+    max_results: Maximum number of image rows to return.
+  """
+  print(f"--- TOOL: Called sweep_vulnerabilities (project={project_name}, min_severity={min_severity}) ---")
+  try:
+    project_names = [project_name] if project_name else None
+    return sweep_registry(HARBOR_CLIENT, project_names, min_severity=min_severity, max_results=max_results)
+  except requests.exceptions.HTTPError as e:
+    return {"error": f"HTTP Error: {e.response.status_code} - {e.response.text}"}
+  except requests.exceptions.RequestException as e:
+    return {"error": f"Request failed: {e}"}
+
+def _parse_image_ref(image: str) -> tuple:
+  """Splits 'project/repository[:tag|@digest]' into (project, repository, reference)."""
+  if "@" in image:
+    path, reference = image.split("@", 1)
+  else:
+    path, _, reference = image.rpartition(":") if ":" in image.rsplit("/", 1)[-1] else (image, ":", "latest")
+  project, _, repository = path.partition("/")
+  if not project or not repository:
+    raise ValueError(f"'{image}' is not of the form project/repository:tag")
+  return project, repository, reference
+
 def scan_image(project_name: str, repository_name: str, tag: str, **kwargs) -> dict:
   """
   Triggers a new vulnerability scan for a specific container image tag in Harbor.
-  This is an ACTION that initiates a process. It does not return the results directly.
-  Use get_vulnerability_report to check the results after the scan is complete.
+  This is an ACTION that starts a background scan job and returns its job_id immediately.
+  Use get_scan_job with the job_id to follow the scan and read its results.
   """
   print(f"--- ACTION TOOL: Called scan_image for {project_name}/{repository_name}:{tag} ---")
+  job = SCAN_JOBS.submit([(project_name, repository_name, tag)])
+  return {"status": "success", "job_id": job.id, "message": f"Scan started for {project_name}/{repository_name}:{tag}."}
 
-  # The API endpoint to trigger a scan on an artifact (image tag)
-  endpoint = f"/api/v2.0/projects/{project_name}/repositories/{repository_name}/artifacts/{tag}/scan"
-  payload = {}
-  result = _make_harbor_request("POST", endpoint, payload=payload)
-
-  return result
+def scan_images(images: list[str], **kwargs) -> dict:
+  """
+  Triggers vulnerability scans for a batch of images as ONE background job and returns its job_id.
+  Scans run with limited concurrency and are polled automatically; use get_scan_job to follow them.
+  Args:
+    images: Image references of the form 'project/repository:tag', e.g. ['library/nginx:1.25'].
+  """
+  print(f"--- ACTION TOOL: Called scan_images for {len(images)} images ---")
+  try:
+    artifacts = [_parse_image_ref(image) for image in images]
+  except ValueError as e:
+    return {"status": "error", "message": str(e)}
+  if not artifacts:
+    return {"status": "error", "message": "No images given."}
+  job = SCAN_JOBS.submit(artifacts)
+  return {"status": "success", "job_id": job.id, "message": f"Started scans for {len(artifacts)} images."}
+
+def get_scan_job(job_id: str, wait_seconds: int = 0, **kwargs) -> dict:
+  """
+  Reports the progress of a scan job started by scan_image or scan_images, with each image's
+  state, severity and vulnerability counts once its scan has finished.
+  Args:
+    job_id: The job id returned when the scan was started.
+    wait_seconds: How long to wait for the job to finish before reporting (0 reports immediately).
+  """
+  print(f"--- TOOL: Called get_scan_job for {job_id} (wait={wait_seconds}s) ---")
+  job = SCAN_JOBS.get(job_id)
+  if job is None:
+    return {"error": f"Unknown scan job '{job_id}'."}
+  if wait_seconds:
+    job.done.wait(min(wait_seconds, settings.harbor.scan_wait_max_seconds))
+  return job.snapshot()
 
 def create_harbor_agent(llm):
   """Factory function that builds and returns the Harbor agent."""
@@ -133,11 +239,17 @@ def create_harbor_agent(llm):
     model=llm,
     instruction=prompt.HARBOR_INSPECTOR_INSTRUCTIONS,
     output_key="harbor_query_output",
-    tools=[
+    tools=offload_all("harbor", [
       list_harbor_projects,
       list_harbor_repositories,
       list_image_tags,
       get_vulnerability_report,
-      scan_image
-    ],
+      find_images,
+      get_latest_tags,
+      find_image_by_digest,
+      sweep_vulnerabilities,
+      scan_image,
+      scan_images,
+      get_scan_job
+    ], timeouts={"get_scan_job": settings.harbor.scan_wait_max_seconds + 10}),
   )
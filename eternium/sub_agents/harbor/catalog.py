@@ -0,0 +1,335 @@
+"""
+Local SQLite index of the Harbor registry: projects, repositories, artifacts,
+tags, digests, push times and scan summaries.
+
+Discovery questions ("newest tag of X", "which repository has image Y") used to
+page through the registry over HTTP on every call. The catalog answers them
+from disk in milliseconds and keeps itself current incrementally: each project's
+repositories are read newest `update_time` first, and only repositories that
+changed since the last sync have their artifacts fetched again. Deleted
+repositories and scan results that changed without a push are picked up by a
+periodic full refresh.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from .client import HARBOR_CLIENT, repo_path
+from .sweep import scan_summary
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+  name TEXT PRIMARY KEY,
+  watermark TEXT
+);
+CREATE TABLE IF NOT EXISTS repositories (
+  name TEXT PRIMARY KEY,
+  project TEXT NOT NULL,
+  repository TEXT NOT NULL,
+  update_time TEXT,
+  synced_update_time TEXT
+);
+CREATE INDEX IF NOT EXISTS repositories_project ON repositories (project);
+CREATE TABLE IF NOT EXISTS artifacts (
+  repository_name TEXT NOT NULL,
+  digest TEXT NOT NULL,
+  push_time TEXT,
+  scan_status TEXT,
+  severity TEXT,
+  critical INTEGER,
+  high INTEGER,
+  medium INTEGER,
+  low INTEGER,
+  total INTEGER,
+  PRIMARY KEY (repository_name, digest)
+);
+CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest);
+CREATE TABLE IF NOT EXISTS tags (
+  repository_name TEXT NOT NULL,
+  tag TEXT NOT NULL,
+  digest TEXT NOT NULL,
+  push_time TEXT,
+  PRIMARY KEY (repository_name, tag)
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
+"""
+
+ARTIFACT_PARAMS = {"with_tag": "true", "with_scan_overview": "true", "with_label": "false"}
+_SEMVER = re.compile(r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:[-.]?([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$")
+
+def semver_key(tag: str) -> tuple:
+  """
+  Sort key ordering tags by semantic version: '1.10.0' > '1.9.2' > '1.9.2-rc1'.
+  Tags that are not versions at all ('latest', 'main', commit ids) sort below every version.
+  """
+  match = _SEMVER.match(tag)
+  if not match:
+    return (0, (), 0, ())
+  major, minor, patch, pre = match.groups()
+  release = (int(major), int(minor or 0), int(patch or 0))
+  # A release outranks its own pre-releases; pre-release parts compare numerically where possible
+  pre_parts = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in re.split(r"[.-]", pre)) if pre else ()
+  return (1, release, 0 if pre else 1, pre_parts)
+
+class HarborCatalog:
+  """A thread-safe SQLite catalog with incremental and full refreshes from the Harbor API."""
+
+  def __init__(self, client, path: str):
+    self.client = client
+    self.path = path
+    self._db = None
+    self._lock = threading.Lock()          # guards the connection
+    self._refresh_lock = threading.Lock()  # one refresh at a time
+    self._stale_lock = threading.Lock()    # guards _stale_repositories
+    self._stale_repositories = {}          # "project/repository" -> time it was marked
+
+  def _conn(self) -> sqlite3.Connection:
+    if self._db is None:
+      directory = os.path.dirname(self.path)
+      if directory:
+        os.makedirs(directory, exist_ok=True)
+      self._db = sqlite3.connect(self.path, check_same_thread=False)
+      self._db.execute("PRAGMA journal_mode=WAL")
+      self._db.executescript(SCHEMA)
+    return self._db
+
+  def _query(self, sql: str, params: tuple = ()) -> list:
+    with self._lock:
+      return self._conn().execute(sql, params).fetchall()
+
+  def _meta(self, key: str):
+    rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+    return float(rows[0][0]) if rows else None
+
+  def _set_meta(self, db, key: str, value):
+    db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+  # Freshness
+
+  def age_seconds(self):
+    """Seconds since the last successful refresh, or None if the catalog was never synced."""
+    synced = self._meta("last_refresh")
+    return None if synced is None else time.time() - synced
+
+  def mark_stale(self, project: str, repository: str):
+    """Makes the next refresh re-read one repository, e.g. after a push or a finished scan."""
+    with self._stale_lock:
+      self._stale_repositories[f"{project}/{repository}"] = time.time()
+
+  def is_stale(self, project: str, repository: str = None) -> bool:
+    """True while a repository (or any repository of a project) is waiting to be re-read."""
+    with self._stale_lock:
+      if repository is not None:
+        return f"{project}/{repository}" in self._stale_repositories
+      return any(name.split("/", 1)[0] == project for name in self._stale_repositories)
+
+  def refresh_async(self):
+    """Starts a refresh in the background unless one is already running."""
+    if not self._refresh_lock.locked():
+      threading.Thread(target=self.refresh, name="harbor-catalog-refresh", daemon=True).start()
+
+  def _check(self):
+    """Returns the catalog's age, starting a background refresh when it is outdated or has stale repositories."""
+    age = self.age_seconds()
+    with self._stale_lock:
+      stale = bool(self._stale_repositories)
+    if age is None or age > settings.harbor.catalog_refresh_seconds or stale:
+      self.refresh_async()
+    return age
+
+  def ensure_fresh(self) -> bool:
+    """
+    Returns True when the catalog is recent enough (catalog_refresh_seconds) to answer
+    in place of the live API. An outdated index is refreshed in the background;
+    meanwhile, callers fall back to the live API.
+    """
+    if not settings.harbor.catalog_enabled:
+      return False
+    age = self._check()
+    return age is not None and age <= settings.harbor.catalog_refresh_seconds
+
+  def ensure_synced(self) -> bool:
+    """
+    Returns True when the catalog has been synced at least once, however long ago.
+    For catalog-only queries that have no live API equivalent; refreshes like ensure_fresh.
+    """
+    if not settings.harbor.catalog_enabled:
+      return False
+    return self._check() is not None
+
+  # Refresh
+
+  def refresh(self, full: bool = None) -> dict:
+    """
+    Brings the index up to date and returns what changed. Without `full`, a full
+    refresh happens only when the last one is older than catalog_full_refresh_seconds.
+    """
+    if not self._refresh_lock.acquire(blocking=False):
+      return {"status": "skipped", "message": "A refresh is already running."}
+    try:
+      if full is None:
+        last_full = self._meta("last_full_refresh")
+        full = last_full is None or time.time() - last_full > settings.harbor.catalog_full_refresh_seconds
+      return self._refresh(full)
+    except Exception as e:
+      print(f"--- HARBOR CATALOG: refresh failed: {e} ---")
+      return {"status": "error", "message": str(e)}
+    finally:
+      self._refresh_lock.release()
+
+  def _refresh(self, full: bool) -> dict:
+    started = time.time()
+    project_names = [project["name"] for project in self.client.iter_pages("/projects")]
+    known = {row[0]: row[1] for row in self._query("SELECT name, watermark FROM projects")}
+    synced = {row[0]: row[1] for row in self._query("SELECT name, synced_update_time FROM repositories")}
+    with self._stale_lock:
+      stale = set(self._stale_repositories)
+
+    changed, seen, watermarks = [], set(), {}
+    for project in project_names:
+      watermark = None if full else known.get(project)
+      newest = None
+      for repo in self.client.iter_pages(f"/projects/{project}/repositories", {"sort": "-update_time"}):
+        update_time = repo.get("update_time") or ""
+        newest = newest or update_time
+        # Newest first: everything past the watermark is unchanged since the last sync
+        if watermark and update_time <= watermark:
+          break
+        seen.add(repo["name"])
+        if full or synced.get(repo["name"]) != update_time:
+          changed.append((project, repo["name"], update_time))
+      watermarks[project] = newest or known.get(project)
+    changed_names = {name for _, name, _ in changed}
+    for name in stale - changed_names:
+      if name in synced:
+        project = name.split("/", 1)[0]
+        changed.append((project, name, None))
+
+    with ThreadPoolExecutor(max_workers=settings.harbor.sweep_workers) as pool:
+      fetched = list(pool.map(self._fetch_artifacts, changed))
+
+    with self._lock:
+      db = self._conn()
+      with db:
+        for (project, name, update_time), artifacts in zip(changed, fetched):
+          self._store_repository(db, project, name, update_time, artifacts)
+        for project, watermark in watermarks.items():
+          db.execute("INSERT OR REPLACE INTO projects (name, watermark) VALUES (?, ?)", (project, watermark))
+        removed = 0
+        if full:
+          removed = self._prune(db, set(project_names), seen)
+        self._set_meta(db, "last_refresh", started)
+        if full:
+          self._set_meta(db, "last_full_refresh", started)
+    # Marks made after this refresh listed the registry stay for the next one
+    with self._stale_lock:
+      for name in stale:
+        if self._stale_repositories.get(name, started) < started:
+          del self._stale_repositories[name]
+
+    return {
+      "status": "success",
+      "mode": "full" if full else "incremental",
+      "projects": len(project_names),
+      "repositories_updated": len(changed),
+      "repositories_removed": removed,
+      "duration_ms": round((time.time() - started) * 1000)
+    }
+
+  def _fetch_artifacts(self, change: tuple) -> list:
+    project, name, _ = change
+    repository = name[len(project) + 1:]
+    return self.client.get_all(f"/projects/{project}/repositories/{repo_path(repository)}/artifacts", ARTIFACT_PARAMS)
+
+  def _store_repository(self, db, project: str, name: str, update_time, artifacts: list):
+    repository = name[len(project) + 1:]
+    db.execute("DELETE FROM artifacts WHERE repository_name = ?", (name,))
+    db.execute("DELETE FROM tags WHERE repository_name = ?", (name,))
+    if update_time is None:
+      db.execute("UPDATE repositories SET synced_update_time = update_time WHERE name = ?", (name,))
+    else:
+      db.execute(
+        "INSERT OR REPLACE INTO repositories (name, project, repository, update_time, synced_update_time) VALUES (?, ?, ?, ?, ?)",
+        (name, project, repository, update_time, update_time)
+      )
+    for artifact in artifacts:
+      severity, summary, status = scan_summary(artifact)
+      db.execute(
+        "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (name, artifact["digest"], artifact.get("push_time"), status, severity,
+         summary.get("critical"), summary.get("high"), summary.get("medium"), summary.get("low"), summary.get("total"))
+      )
+      for tag in artifact.get("tags") or []:
+        db.execute(
+          "INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?)",
+          (name, tag["name"], artifact["digest"], tag.get("push_time") or artifact.get("push_time"))
+        )
+
+  def _prune(self, db, projects: set, repositories: set) -> int:
+    gone = [row[0] for row in db.execute("SELECT name FROM repositories") if row[0] not in repositories]
+    for name in gone:
+      for table, column in (("repositories", "name"), ("artifacts", "repository_name"), ("tags", "repository_name")):
+        db.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+    for (project,) in db.execute("SELECT name FROM projects").fetchall():
+      if project not in projects:
+        db.execute("DELETE FROM projects WHERE name = ?", (project,))
+    return len(gone)
+
+  # Queries
+
+  def projects(self) -> list:
+    return [row[0] for row in self._query("SELECT name FROM projects ORDER BY name")]
+
+  def repositories(self, project: str) -> list:
+    return [row[0] for row in self._query("SELECT repository FROM repositories WHERE project = ? ORDER BY repository", (project,))]
+
+  def tags(self, project: str, repository: str) -> list:
+    rows = self._query("SELECT tag FROM tags WHERE repository_name = ? ORDER BY push_time DESC", (f"{project}/{repository}",))
+    return [row[0] for row in rows]
+
+  def latest_tags(self, project: str, repository: str, limit: int = 5) -> list:
+    rows = self._query(
+      """SELECT t.tag, t.digest, t.push_time, a.severity FROM tags t
+         LEFT JOIN artifacts a ON a.repository_name = t.repository_name AND a.digest = t.digest
+         WHERE t.repository_name = ?""",
+      (f"{project}/{repository}",)
+    )
+    rows.sort(key=lambda row: (semver_key(row[0]), row[2] or ""), reverse=True)
+    return [{"tag": tag, "digest": digest, "push_time": push_time, "severity": severity} for tag, digest, push_time, severity in rows[:limit]]
+
+  def search(self, query: str, limit: int = 50) -> list:
+    """Repositories whose name, or tags, contain `query` (case-insensitive)."""
+    pattern = f"%{query.lower()}%"
+    rows = self._query(
+      """SELECT r.name, GROUP_CONCAT(t.tag, ',') FROM repositories r
+         LEFT JOIN tags t ON t.repository_name = r.name AND LOWER(t.tag) LIKE ?
+         WHERE LOWER(r.name) LIKE ? OR t.tag IS NOT NULL
+         GROUP BY r.name ORDER BY r.update_time DESC LIMIT ?""",
+      (pattern, pattern, limit)
+    )
+    return [{"repository": name, "matching_tags": tags.split(",") if tags else []} for name, tags in rows]
+
+  def find_digest(self, digest: str) -> list:
+    """Every repository holding an artifact whose digest starts with `digest`, with its tags."""
+    prefix = digest if digest.startswith("sha256:") else f"sha256:{digest}"
+    rows = self._query(
+      """SELECT a.repository_name, a.digest, a.push_time, a.severity, GROUP_CONCAT(t.tag, ',') FROM artifacts a
+         LEFT JOIN tags t ON t.repository_name = a.repository_name AND t.digest = a.digest
+         WHERE a.digest >= ? AND a.digest < ?
+         GROUP BY a.repository_name, a.digest""",
+      (prefix, prefix + "\uffff")
+    )
+    return [
+      {"repository": name, "digest": full, "push_time": push_time, "severity": severity, "tags": tags.split(",") if tags else []}
+      for name, full, push_time, severity, tags in rows
+    ]
+
+HARBOR_CATALOG = HarborCatalog(HARBOR_CLIENT, settings.harbor.catalog_path)
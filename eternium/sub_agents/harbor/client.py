@@ -0,0 +1,96 @@
+"""Pooled, retrying HTTP client for the Harbor v2.0 API."""
+
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import settings
+
+API_PREFIX = "/api/v2.0"
+
+def repo_path(repository_name: str) -> str:
+  """Harbor expects repository names containing '/' to be URL-encoded twice in paths."""
+  return quote(quote(repository_name, safe=""), safe="")
+
+class HarborClient:
+  """
+  A thin wrapper over one keep-alive `requests.Session`: pooled connections,
+  bounded retries with exponential backoff on idempotent requests, configurable
+  timeouts and page iteration driven by Harbor's Link / X-Total-Count headers.
+  """
+
+  def __init__(self, base_url: str, username: str, token: str, ssl_verify: bool = True):
+    self.base_url = base_url.rstrip("/")
+    self.timeout = (settings.harbor.connect_timeout_seconds, settings.harbor.read_timeout_seconds)
+    self.page_size = settings.harbor.page_size
+
+    retry = Retry(
+      total=settings.harbor.max_retries,
+      backoff_factor=settings.harbor.retry_backoff_seconds,
+      status_forcelist=(429, 500, 502, 503, 504),
+      allowed_methods=frozenset(["GET", "HEAD"]),
+      respect_retry_after_header=True,
+      raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.harbor.pool_size, max_retries=retry)
+    self.session = requests.Session()
+    self.session.auth = (username, token)
+    self.session.verify = ssl_verify
+    self.session.headers["Accept"] = "application/json"
+    self.session.mount("https://", adapter)
+    self.session.mount("http://", adapter)
+
+  def _url(self, endpoint: str) -> str:
+    if endpoint.startswith(API_PREFIX):
+      return f"{self.base_url}{endpoint}"
+    return f"{self.base_url}{API_PREFIX}{endpoint}"
+
+  def request(self, method: str, endpoint: str, params: dict = None, payload: dict = None) -> requests.Response:
+    """Sends a request and raises requests.HTTPError on a non-2xx response."""
+    response = self.session.request(method, self._url(endpoint), params=params, json=payload, timeout=self.timeout)
+    response.raise_for_status()
+    return response
+
+  def get_json(self, endpoint: str, params: dict = None):
+    response = self.request("GET", endpoint, params=params)
+    return response.json() if response.content else None
+
+  def iter_pages(self, endpoint: str, params: dict = None):
+    """
+    Yields every item of a paginated list endpoint, one page at a time. Follows
+    the `Link: <...>; rel="next"` header, and stops early once X-Total-Count
+    items have been seen.
+    """
+    base_params = params or {}
+    page, seen = 1, 0
+    url, query = self._url(endpoint), {**base_params, "page": page, "page_size": self.page_size}
+    while True:
+      response = self.session.get(url, params=query, timeout=self.timeout)
+      response.raise_for_status()
+      items = response.json() or []
+      yield from items
+      seen += len(items)
+
+      total = response.headers.get("X-Total-Count")
+      if not items or (total is not None and seen >= int(total)):
+        return
+      next_link = response.links.get("next", {}).get("url")
+      if next_link:
+        # The next link already carries page, page_size and the original query
+        url, query = self._url(next_link) if next_link.startswith("/") else next_link, None
+      elif len(items) >= self.page_size:
+        # No Link header: keep paging until a short page or the total is reached
+        page += 1
+        url, query = self._url(endpoint), {**base_params, "page": page, "page_size": self.page_size}
+      else:
+        return
+
+  def get_all(self, endpoint: str, params: dict = None) -> list:
+    return list(self.iter_pages(endpoint, params))
+
+HARBOR_CLIENT = HarborClient(
+  settings.harbor.url,
+  settings.harbor.username,
+  settings.harbor.token,
+  ssl_verify=settings.harbor.ssl_verify
+)
@@ -9,7 +9,8 @@ HARBOR_INSPECTOR_INSTRUCTIONS = """
 
 **Tool Selection Process:**
 * Your tools allow you to inspect the Harbor registry. You must choose the most appropriate tool for the user's request.
-* **Guidance:** Use `get_vulnerability_report` for security questions. Use `list_image_tags` for version questions. Use `list_harbor_projects` or `list_harbor_repositories` for discovery questions.
+* **Guidance:** Use `get_vulnerability_report` for security questions about one image tag, and `sweep_vulnerabilities` for questions across many images or the whole registry. Use `get_latest_tags` for "newest version" questions and `list_image_tags` for other version questions. Use `find_images` to locate an image or tag anywhere in the registry, `find_image_by_digest` for digest lookups, and `list_harbor_projects` or `list_harbor_repositories` for discovery questions.
+* **Scanning:** `scan_image` and `scan_images` start a background scan job and return a `job_id`. Do NOT poll `get_vulnerability_report` after a scan; call `get_scan_job` with the `job_id` and a `wait_seconds` value (e.g. 60) to wait for the results.
 
 **Instructions:**
 1.  Analyze the user's query to understand their core intent (e.g., are they asking about projects, versions, or security?).
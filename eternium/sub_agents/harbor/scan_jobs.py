@@ -0,0 +1,158 @@
+"""
+Background tracker for Harbor vulnerability scans.
+
+Harbor's scan endpoint only starts a scan, so waiting for a result used to cost
+the agent one LLM turn per poll. A ScanJob groups a batch of artifacts under one
+job id: each scan is submitted on a pool capped at `scan_max_concurrent`, then
+polled with exponential backoff until Harbor reports a final status. Callers can
+query a job's progress at any time or block until it finishes.
+"""
+
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from config import settings
+from ...tool_cache import RESULT_CACHE
+from .catalog import HARBOR_CATALOG
+from .client import HARBOR_CLIENT, repo_path
+from .sweep import scan_summary
+
+FINAL_STATES = {"Success", "Error", "Stopped", "Timeout"}
+
+def _report_end_time(artifact: dict):
+  overview = artifact.get("scan_overview") or {}
+  report = next(iter(overview.values()), None) or {}
+  return report.get("end_time")
+
+class ScanItem:
+  """One artifact in a scan job and what is known about its scan so far."""
+
+  def __init__(self, project: str, repository: str, reference: str):
+    self.project = project
+    self.repository = repository
+    self.reference = reference
+    self.state = "Queued"
+    self.severity = None
+    self.summary = {}
+    self.error = None
+    self.polls = 0
+
+  @property
+  def endpoint(self) -> str:
+    return f"/projects/{self.project}/repositories/{repo_path(self.repository)}/artifacts/{self.reference}"
+
+  def as_dict(self) -> dict:
+    item = {"image": f"{self.project}/{self.repository}:{self.reference}", "state": self.state}
+    if self.severity is not None:
+      item["severity"] = self.severity
+      item["summary"] = self.summary
+    if self.error:
+      item["error"] = self.error
+    return item
+
+class ScanJob:
+  def __init__(self, items: list):
+    self.id = uuid.uuid4().hex[:12]
+    self.items = items
+    self.created_at = time.time()
+    self.finished_at = None
+    self.done = threading.Event()
+    self._remaining = len(items)
+    self._lock = threading.Lock()
+
+  def item_finished(self):
+    with self._lock:
+      self._remaining -= 1
+      if self._remaining == 0:
+        self.finished_at = time.time()
+        self.done.set()
+
+  def snapshot(self) -> dict:
+    states, severities = {}, {}
+    for item in self.items:
+      states[item.state] = states.get(item.state, 0) + 1
+      if item.severity is not None:
+        severities[item.severity] = severities.get(item.severity, 0) + 1
+    finished = sum(count for state, count in states.items() if state in FINAL_STATES)
+    end = self.finished_at or time.time()
+    return {
+      "job_id": self.id,
+      "status": "completed" if self.done.is_set() else "running",
+      "progress": f"{finished}/{len(self.items)}",
+      "elapsed_seconds": round(end - self.created_at, 1),
+      "by_state": states,
+      "by_severity": severities,
+      "items": [item.as_dict() for item in self.items]
+    }
+
+class ScanJobTracker:
+  """Submits and polls scans on a bounded pool, and keeps the most recent jobs."""
+
+  def __init__(self, client):
+    self.client = client
+    self._pool = ThreadPoolExecutor(max_workers=settings.harbor.scan_max_concurrent, thread_name_prefix="harbor-scan")
+    self._jobs = {}  # job id -> ScanJob, oldest first
+    self._lock = threading.Lock()
+
+  def submit(self, artifacts: list) -> ScanJob:
+    """Starts a job for a list of (project, repository, reference) tuples."""
+    job = ScanJob([ScanItem(*artifact) for artifact in artifacts])
+    with self._lock:
+      self._jobs[job.id] = job
+      while len(self._jobs) > settings.harbor.scan_jobs_retained:
+        self._jobs.pop(next(iter(self._jobs)))
+    if not job.items:
+      job.done.set()
+    for item in job.items:
+      self._pool.submit(self._run, job, item)
+    return job
+
+  def get(self, job_id: str):
+    with self._lock:
+      return self._jobs.get(job_id)
+
+  def _run(self, job: ScanJob, item: ScanItem):
+    try:
+      self._scan(item)
+    except requests.exceptions.HTTPError as e:
+      item.state, item.error = "Error", f"HTTP Error: {e.response.status_code} - {e.response.text}"
+    except requests.exceptions.RequestException as e:
+      item.state, item.error = "Error", f"Request failed: {e}"
+    except Exception as e:
+      item.state, item.error = "Error", str(e)
+    finally:
+      # Cached reports and listings for this repository are stale once the scan ends
+      RESULT_CACHE.invalidate(("harbor", item.project, item.repository))
+      HARBOR_CATALOG.mark_stale(item.project, item.repository)
+      job.item_finished()
+
+  def _scan(self, item: ScanItem):
+    params = {"with_scan_overview": "true"}
+    # Remember the previous report so an old result is not mistaken for the new one
+    previous_end = _report_end_time(self.client.get_json(item.endpoint, params) or {})
+    self.client.request("POST", f"{item.endpoint}/scan", payload={})
+    item.state = "Submitted"
+
+    deadline = time.monotonic() + settings.harbor.scan_timeout_seconds
+    delays = (min(settings.harbor.scan_poll_initial_seconds * 2 ** n, settings.harbor.scan_poll_max_seconds) for n in itertools.count())
+    seen_in_progress = False
+    while True:
+      time.sleep(min(next(delays), max(deadline - time.monotonic(), 0)))
+      artifact = self.client.get_json(item.endpoint, params) or {}
+      item.polls += 1
+      severity, summary, status = scan_summary(artifact)
+      fresh = seen_in_progress or _report_end_time(artifact) != previous_end
+      if status in FINAL_STATES and fresh:
+        item.state, item.severity, item.summary = status, severity, summary
+        return
+      if status:
+        seen_in_progress = seen_in_progress or status not in FINAL_STATES
+        item.state = status if status not in FINAL_STATES else "Pending"
+      if time.monotonic() >= deadline:
+        item.state, item.error = "Timeout", f"No result after {settings.harbor.scan_timeout_seconds}s"
+        return
+
+SCAN_JOBS = ScanJobTracker(HARBOR_CLIENT)
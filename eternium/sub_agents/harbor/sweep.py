@@ -0,0 +1,92 @@
+"""Registry-wide vulnerability sweep: projects -> repositories -> artifacts, fetched concurrently."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import settings
+from .client import repo_path
+
+SEVERITY_RANK = {"Critical": 5, "High": 4, "Medium": 3, "Low": 2, "Negligible": 1, "Unknown": 1, "None": 0}
+COLUMNS = ["image", "severity", "critical", "high", "medium", "low", "total"]
+ARTIFACT_PARAMS = {"with_scan_overview": "true", "with_tag": "true", "with_label": "false"}
+
+def scan_summary(artifact: dict) -> tuple:
+  """
+  Returns (severity, summary dict, scan status) from an artifact's scan_overview,
+  or (None, {}, None) when the artifact has never been scanned.
+  """
+  overview = artifact.get("scan_overview") or {}
+  if not overview:
+    return None, {}, None
+  report = next(iter(overview.values())) or {}
+  return report.get("severity"), report.get("summary") or {}, report.get("scan_status")
+
+def _image_ref(project: str, repository: str, artifact: dict) -> str:
+  tags = [tag["name"] for tag in artifact.get("tags") or []]
+  if tags:
+    return f"{project}/{repository}:{tags[0]}"
+  return f"{project}/{repository}@{artifact.get('digest', '')[:19]}"
+
+def sweep_registry(client, project_names: list = None, min_severity: str = "High", max_results: int = 50, workers: int = None) -> dict:
+  """
+  Walks every repository of the given projects (all projects if None) on a
+  bounded thread pool, reading scan results straight from the artifact listing.
+  Only artifacts at or above `min_severity` are kept as rows; the rest are
+  just counted. Rows are ranked by severity, then critical and high counts.
+  """
+  threshold = SEVERITY_RANK.get(min_severity.capitalize(), SEVERITY_RANK["High"])
+  counts = {"projects": 0, "repositories": 0, "artifacts": 0, "not_scanned": 0, "by_severity": {}}
+  rows, errors = [], []
+
+  with ThreadPoolExecutor(max_workers=workers or settings.harbor.sweep_workers) as pool:
+    if project_names is None:
+      project_names = [project["name"] for project in client.iter_pages("/projects")]
+    counts["projects"] = len(project_names)
+
+    repo_futures = {pool.submit(client.get_all, f"/projects/{project}/repositories"): project for project in project_names}
+    artifact_futures = {}
+    for future in as_completed(repo_futures):
+      project = repo_futures[future]
+      try:
+        repositories = future.result()
+      except Exception as e:
+        errors.append({"project": project, "error": str(e)})
+        continue
+      for repo in repositories:
+        repository = repo["name"][len(project) + 1:]
+        endpoint = f"/projects/{project}/repositories/{repo_path(repository)}/artifacts"
+        artifact_futures[pool.submit(client.get_all, endpoint, ARTIFACT_PARAMS)] = (project, repository)
+    counts["repositories"] = len(artifact_futures)
+
+    for future in as_completed(artifact_futures):
+      project, repository = artifact_futures[future]
+      try:
+        artifacts = future.result()
+      except Exception as e:
+        errors.append({"repository": f"{project}/{repository}", "error": str(e)})
+        continue
+      for artifact in artifacts:
+        counts["artifacts"] += 1
+        severity, summary, _ = scan_summary(artifact)
+        if severity is None:
+          counts["not_scanned"] += 1
+          continue
+        counts["by_severity"][severity] = counts["by_severity"].get(severity, 0) + 1
+        if SEVERITY_RANK.get(severity, 0) < threshold:
+          continue
+        rows.append([
+          _image_ref(project, repository, artifact),
+          severity,
+          summary.get("critical", 0),
+          summary.get("high", 0),
+          summary.get("medium", 0),
+          summary.get("low", 0),
+          summary.get("total", 0)
+        ])
+
+  rows.sort(key=lambda row: (-SEVERITY_RANK.get(row[1], 0), -row[2], -row[3], row[0]))
+  return {
+    "summary": counts,
+    "columns": COLUMNS,
+    "rows": rows[:max_results],
+    "truncated": len(rows) > max_results,
+    "errors": errors
+  }
@@ -1,8 +1,13 @@
 """Tools for interacting with Helm to manage application releases."""
 import subprocess
 import json
+from typing import Optional
 from google.adk.agents import Agent
+from config import settings
+from ...executor import offload_all
+from ...tool_cache import cached, invalidates
 from . import prompt
+from .releases import HELM_RELEASES
 
 def _run_helm_command(command: list[str]) -> dict:
   """A helper function to run a helm command and return parsed JSON."""
@@ -27,32 +32,68 @@ def _run_helm_command(command: list[str]) -> dict:
   except Exception as e:
     return {"error": "An unexpected error occurred", "details": str(e)}
 
+_NATIVE_FAILED = object()
+
+def _read_native(read, *args):
+  """
+  Runs a native release read, or returns _NATIVE_FAILED so the caller falls back to the helm CLI.
+  An empty result falls back too: with another storage driver (configmap, sql) the release
+  secrets are simply absent, and only the CLI can tell whether a release exists.
+  """
+  if not settings.helm.native_releases or settings.helm.driver not in ("", "secret", "secrets"):
+    return _NATIVE_FAILED
+  try:
+    result = read(*args)
+  except Exception as e:
+    # e.g. no RBAC access to secrets
+    print(f"--- HELM: native release read failed ({e}), falling back to the helm CLI ---")
+    return _NATIVE_FAILED
+  if not result:
+    print("--- HELM: no release secrets found, falling back to the helm CLI ---")
+    return _NATIVE_FAILED
+  return result
+
 # --- Tool Functions ---
 
-def list_helm_releases(namespace: str, **kwargs) -> list:
+@cached(ttl=30, scope=("helm", "namespace"))
+def list_helm_releases(namespace: Optional[str] = None, **kwargs) -> list:
   """
-  Lists all Helm releases in a specific Kubernetes namespace.
+  Lists Helm releases in a specific Kubernetes namespace, or in all namespaces at once
+  when namespace is omitted or 'all'.
   """
-  print(f"--- TOOL: Called list_helm_releases for namespace: {namespace} ---")
-  command = ["helm", "list", "-n", namespace]
+  print(f"--- TOOL: Called list_helm_releases for namespace: {namespace or 'all'} ---")
+  all_namespaces = namespace in (None, "", "all")
+  releases = _read_native(HELM_RELEASES.list_releases, None if all_namespaces else namespace)
+  if releases is not _NATIVE_FAILED:
+    return releases
+  command = ["helm", "list", "-A"] if all_namespaces else ["helm", "list", "-n", namespace]
   return _run_helm_command(command)
 
+@cached(ttl=30, scope=("helm", "namespace"))
 def get_helm_release_status(release_name: str, namespace: str, **kwargs) -> dict:
   """
   Gets the detailed status of a specific Helm release in a namespace.
   """
   print(f"--- TOOL: Called get_helm_release_status for {release_name} ---")
+  status = _read_native(HELM_RELEASES.status, release_name, namespace)
+  if status is not _NATIVE_FAILED:
+    return status
   command = ["helm", "status", release_name, "-n", namespace]
   return _run_helm_command(command)
 
+@cached(ttl=30, scope=("helm", "namespace"))
 def get_helm_release_history(release_name: str, namespace: str, **kwargs) -> list:
   """
   Gets the revision history for a specific Helm release in a namespace.
   """
   print(f"--- TOOL: Called get_helm_release_history for {release_name} ---")
+  history = _read_native(HELM_RELEASES.history, release_name, namespace)
+  if history is not _NATIVE_FAILED:
+    return history
   command = ["helm", "history", release_name, "-n", namespace]
   return _run_helm_command(command)
 
+@invalidates(("helm", "namespace"), ("kubernetes", "namespace"))
 def upgrade_helm_release(release_name: str, namespace: str, chart: str, version: str, **kwargs) -> dict:
   """
   Upgrades a Helm release to a specific chart version. This is an ACTION.
@@ -85,10 +126,10 @@ def create_helm_agent(llm) -> Agent:
     name="helm_operator",
     model=llm,
     instruction=prompt.HELM_OPERATOR_INSTRUCTIONS,
-    tools = [
+    tools=offload_all("helm", [
       list_helm_releases,
       get_helm_release_status,
       get_helm_release_history,
       upgrade_helm_release
-    ]
+    ], timeouts={"upgrade_helm_release": settings.executor.helm_upgrade_timeout_seconds})
   )
\ No newline at end of file
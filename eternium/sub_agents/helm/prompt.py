@@ -6,7 +6,7 @@ HELM_OPERATOR_INSTRUCTIONS = """
 **Objective:** To use your suite of Helm tools to inspect, analyze, and upgrade applications deployed as Helm releases.
 
 **Tool Selection Process:**
-* Use `list_helm_releases` to discover what applications are installed in a namespace.
+* Use `list_helm_releases` to discover what applications are installed in a namespace. Omit the namespace to list releases across the whole cluster in one call.
 * Use `get_helm_release_status` and `get_helm_release_history` for diagnostic questions about a specific application.
 * Use the `upgrade_helm_release` action tool to update an application to a new version.
 
@@ -0,0 +1,206 @@
+"""
+Native reader for Helm 3 releases stored as Kubernetes secrets.
+
+Helm keeps every revision of a release in a secret of type helm.sh/release.v1,
+labelled owner=helm, name=<release>, version=<revision> and status=<status>.
+The `release` key holds base64 of gzipped JSON, which Kubernetes base64-encodes
+once more. Reading those secrets through the API avoids forking `helm`, which
+pays process start-up and kubeconfig loading on every call.
+
+Each read starts with a metadata-only list (PartialObjectMetadata): names,
+labels and resourceVersions, but no payloads. Decoded releases are cached per
+secret and keyed by resourceVersion, so only the secrets a call needs that are
+new or changed are fetched (in parallel, `read_workers` at a time) and decoded.
+`helm list` needs just the latest revision of each release.
+"""
+
+import base64
+import gzip
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from kubernetes import client, config
+from config import settings
+
+RELEASE_LABELS = "owner=helm"
+RELEASE_TYPE = "type=helm.sh/release.v1"
+_METADATA_ONLY = {"Accept": "application/json;as=PartialObjectMetadataList;v=v1;g=meta.k8s.io,application/json"}
+_KIND = re.compile(r"^kind:\s*(\S+)", re.MULTILINE)
+# `helm list` leaves out revisions that were replaced or uninstalled with --keep-history
+_HIDDEN_FROM_LIST = {"superseded", "uninstalled"}
+
+def decode_release(payload: str) -> dict:
+  """Decodes a secret's `release` value into Helm's release JSON."""
+  raw = base64.b64decode(base64.b64decode(payload))
+  if raw[:3] == b"\x1f\x8b\x08":
+    raw = gzip.decompress(raw)
+  return orjson.loads(raw)
+
+def summarize(release: dict) -> dict:
+  """The fields the tools report, without the chart templates, values or rendered manifest."""
+  info = release.get("info") or {}
+  metadata = (release.get("chart") or {}).get("metadata") or {}
+  kinds = {}
+  for kind in _KIND.findall(release.get("manifest") or ""):
+    kinds[kind] = kinds.get(kind, 0) + 1
+  return {
+    "name": release.get("name"),
+    "namespace": release.get("namespace"),
+    "revision": release.get("version"),
+    "status": info.get("status"),
+    "description": info.get("description"),
+    "first_deployed": info.get("first_deployed"),
+    "last_deployed": info.get("last_deployed"),
+    "chart": metadata.get("name"),
+    "chart_version": metadata.get("version"),
+    "app_version": metadata.get("appVersion"),
+    "notes": (info.get("notes") or "")[:2000],
+    "resources": kinds
+  }
+
+def _revision(meta: dict) -> int:
+  try:
+    return int(meta["labels"].get("version", 0))
+  except (TypeError, ValueError):
+    return 0
+
+class HelmReleaseReader:
+  """Reads release secrets through the Kubernetes API with a resourceVersion-keyed decode cache."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._api = None
+    self._decoded = {}  # (namespace, secret name) -> (resourceVersion, summary)
+    self._pool = ThreadPoolExecutor(max_workers=settings.helm.read_workers, thread_name_prefix="helm-read")
+    self.lists = self.fetched = self.reused = 0
+
+  @property
+  def api(self) -> client.CoreV1Api:
+    with self._lock:
+      if self._api is None:
+        try:
+          config.load_incluster_config()
+        except config.ConfigException:
+          config.load_kube_config()
+        self._api = client.CoreV1Api()
+      return self._api
+
+  def _list(self, namespace: str = None) -> list:
+    kwargs = {
+      "label_selector": RELEASE_LABELS,
+      "field_selector": RELEASE_TYPE,
+      "limit": settings.helm.list_page_size,
+      "_headers": _METADATA_ONLY
+    }
+    if namespace:
+      list_func, kwargs["namespace"] = self.api.list_namespaced_secret, namespace
+    else:
+      list_func = self.api.list_secret_for_all_namespaces
+
+    items, continue_token = [], None
+    while True:
+      if continue_token:
+        kwargs["_continue"] = continue_token
+      response = list_func(_preload_content=False, **kwargs)
+      try:
+        page = orjson.loads(response.data)
+      finally:
+        response.release_conn()
+      self.lists += 1
+      items.extend(page.get("items") or [])
+      continue_token = (page.get("metadata") or {}).get("continue")
+      if not continue_token:
+        return items
+
+  def _metadata(self, namespace: str = None) -> list:
+    """Metadata of every release secret, with `labels` always present."""
+    metas = []
+    for item in self._list(namespace):
+      meta = item.get("metadata") or {}
+      meta["labels"] = meta.get("labels") or {}
+      metas.append(meta)
+
+    # Forget decoded releases whose secrets are gone from the listed scope
+    present = {(meta["namespace"], meta["name"]) for meta in metas}
+    with self._lock:
+      for key in [key for key in self._decoded if (namespace is None or key[0] == namespace) and key not in present]:
+        del self._decoded[key]
+    return metas
+
+  def _fetch(self, meta: dict) -> tuple:
+    response = self.api.read_namespaced_secret(meta["name"], meta["namespace"], _preload_content=False)
+    try:
+      secret = orjson.loads(response.data)
+    finally:
+      response.release_conn()
+    summary = summarize(decode_release((secret.get("data") or {})["release"]))
+    return (meta["namespace"], meta["name"]), (secret["metadata"].get("resourceVersion"), summary)
+
+  def _summaries(self, metas: list) -> list:
+    """Decoded summaries for the given secrets, fetching only new or changed ones."""
+    with self._lock:
+      missing = [
+        meta for meta in metas
+        if self._decoded.get((meta["namespace"], meta["name"]), (None,))[0] != meta.get("resourceVersion")
+      ]
+    decoded = dict(self._pool.map(self._fetch, missing))
+    with self._lock:
+      self._decoded.update(decoded)
+      self.fetched += len(decoded)
+      self.reused += len(metas) - len(missing)
+      return [self._decoded[(meta["namespace"], meta["name"])][1] for meta in metas if (meta["namespace"], meta["name"]) in self._decoded]
+
+  def list_releases(self, namespace: str = None) -> list:
+    """The latest revision of every release, like `helm list` (all namespaces when namespace is None)."""
+    latest = {}
+    for meta in self._metadata(namespace):
+      key = (meta["namespace"], meta["labels"].get("name"))
+      if key not in latest or _revision(meta) > _revision(latest[key]):
+        latest[key] = meta
+    metas = [meta for meta in latest.values() if meta["labels"].get("status") not in _HIDDEN_FROM_LIST]
+    releases = [
+      {
+        "name": summary["name"],
+        "namespace": summary["namespace"],
+        "revision": str(summary["revision"]),
+        "updated": summary["last_deployed"],
+        "status": summary["status"],
+        "chart": f"{summary['chart']}-{summary['chart_version']}",
+        "app_version": summary["app_version"]
+      }
+      for summary in self._summaries(metas)
+    ]
+    return sorted(releases, key=lambda release: (release["namespace"], release["name"]))
+
+  def _release_metas(self, release_name: str, namespace: str) -> list:
+    metas = [meta for meta in self._metadata(namespace) if meta["labels"].get("name") == release_name]
+    return sorted(metas, key=_revision)
+
+  def history(self, release_name: str, namespace: str) -> list:
+    """Every stored revision of a release, oldest first, like `helm history`."""
+    return [
+      {
+        "revision": summary["revision"],
+        "updated": summary["last_deployed"],
+        "status": summary["status"],
+        "chart": f"{summary['chart']}-{summary['chart_version']}",
+        "app_version": summary["app_version"],
+        "description": summary["description"]
+      }
+      for summary in sorted(self._summaries(self._release_metas(release_name, namespace)), key=lambda summary: summary["revision"])
+    ]
+
+  def status(self, release_name: str, namespace: str):
+    """The latest revision of a release, like `helm status`, or None if it does not exist."""
+    metas = self._release_metas(release_name, namespace)
+    if not metas:
+      return None
+    summaries = self._summaries(metas[-1:])
+    return summaries[0] if summaries else None
+
+  def stats(self) -> dict:
+    with self._lock:
+      return {"decoded_releases": len(self._decoded), "list_calls": self.lists, "fetched": self.fetched, "reused": self.reused}
+
+HELM_RELEASES = HelmReleaseReader()
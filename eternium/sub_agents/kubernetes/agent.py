@@ -1,9 +1,13 @@
 """kubernetes_expert_agent: for intereacting with a kubernetes cluster"""
 
+import heapq
 import json
 from kubernetes import client, config
 from google.adk import Agent
-from . import prompt
+from config import settings
+from ...executor import offload_all
+from ...tool_cache import cached, invalidates
+from . import cache, condense, events, listing, logs, prompt
 
 # Configuration
 try:
@@ -17,6 +21,43 @@ CORE_V1_API = client.CoreV1Api()
 APPS_V1_API = client.AppsV1Api()
 NETWORKING_V1_API = client.NetworkingV1Api()
 
+# Namespaced and cluster-wide list calls per kind. The cluster-wide call feeds the
+# watch-backed cache; the namespaced one is the live fallback.
+RESOURCE_LISTERS = {
+  "pod": (CORE_V1_API.list_namespaced_pod, CORE_V1_API.list_pod_for_all_namespaces),
+  "service": (CORE_V1_API.list_namespaced_service, CORE_V1_API.list_service_for_all_namespaces),
+  "deployment": (APPS_V1_API.list_namespaced_deployment, APPS_V1_API.list_deployment_for_all_namespaces),
+  "statefulset": (APPS_V1_API.list_namespaced_stateful_set, APPS_V1_API.list_stateful_set_for_all_namespaces),
+  "daemonset": (APPS_V1_API.list_namespaced_daemon_set, APPS_V1_API.list_daemon_set_for_all_namespaces),
+  "ingress": (NETWORKING_V1_API.list_namespaced_ingress, NETWORKING_V1_API.list_ingress_for_all_namespaces),
+}
+
+def _list_resources(kind: str, namespace: str, label_selector: str = None) -> list:
+  """
+  Returns the raw objects of a kind in a namespace, served from the watch-backed
+  cache when it is warm and falling back to a live raw list otherwise.
+  """
+  list_namespaced, list_all = RESOURCE_LISTERS[kind]
+  items = cache.list_cached(kind, list_all, namespace, label_selector)
+  if items is not None:
+    return items
+  if label_selector:
+    return listing.list_raw(list_namespaced, namespace=namespace, label_selector=label_selector).get("items") or []
+  return listing.list_raw(list_namespaced, namespace=namespace).get("items") or []
+
+def _iter_resources_all_namespaces(kind: str, label_selector: str = None, field_selector: str = None):
+  """
+  Yields the objects of a kind across every namespace. A warm cache answers
+  label-only queries; anything else streams paginated pages from the API server.
+  """
+  list_all = RESOURCE_LISTERS[kind][1]
+  if not field_selector:
+    items = cache.list_cached(kind, list_all, None, label_selector)
+    if items is not None:
+      yield from items
+      return
+  yield from listing.iter_all_namespaces(list_all, label_selector=label_selector, field_selector=field_selector)
+
 # Tool Functions
 
 def get_pods(namespace: str, **kwargs) -> list[dict]:
@@ -25,16 +66,17 @@ def get_pods(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_pods for namespace: {namespace} ---")
   try:
-    pod_list = CORE_V1_API.list_namespaced_pod(namespace=namespace)
-    if not pod_list.items:
+    pod_list = _list_resources("pod", namespace)
+    if not pod_list:
       return []  # Return an empty list if no pods are found
 
     pods_info = []
-    for pod in pod_list.items:
-      restart_count = pod.status.container_statuses[0].restart_count if pod.status.container_statuses else 0
+    for pod in pod_list:
+      statuses = pod.get("status", {}).get("containerStatuses")
+      restart_count = statuses[0].get("restartCount", 0) if statuses else 0
       pods_info.append({
-        "name": pod.metadata.name,
-        "status": pod.status.phase,
+        "name": pod["metadata"]["name"],
+        "status": pod.get("status", {}).get("phase"),
         "restarts": restart_count
       })
     return pods_info
@@ -47,16 +89,16 @@ def get_deployments(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_deployments for namespace: {namespace} ---")
   try:
-    dep_list = APPS_V1_API.list_namespaced_deployment(namespace=namespace)
-    if not dep_list.items:
+    dep_list = _list_resources("deployment", namespace)
+    if not dep_list:
       return []
 
     deployments_info = []
-    for dep in dep_list.items:
+    for dep in dep_list:
       deployments_info.append({
-        "name": dep.metadata.name,
-        "ready_replicas": dep.status.available_replicas or 0,
-        "desired_replicas": dep.spec.replicas
+        "name": dep["metadata"]["name"],
+        "ready_replicas": dep.get("status", {}).get("availableReplicas") or 0,
+        "desired_replicas": dep["spec"].get("replicas")
       })
     return deployments_info
   except Exception as e:
@@ -68,16 +110,16 @@ def get_statefulsets(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_statefulsets for namespace: {namespace} ---")
   try:
-    sts_list = APPS_V1_API.list_namespaced_stateful_set(namespace=namespace)
-    if not sts_list.items:
+    sts_list = _list_resources("statefulset", namespace)
+    if not sts_list:
       return []
 
     statefulsets_info = []
-    for sts in sts_list.items:
+    for sts in sts_list:
       statefulsets_info.append({
-        "name": sts.metadata.name,
-        "ready_replicas": sts.status.ready_replicas or 0,
-        "desired_replicas": sts.spec.replicas
+        "name": sts["metadata"]["name"],
+        "ready_replicas": sts.get("status", {}).get("readyReplicas") or 0,
+        "desired_replicas": sts["spec"].get("replicas")
       })
     return statefulsets_info
   except Exception as e:
@@ -89,35 +131,36 @@ def get_daemonsets(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_daemonsets for namespace: {namespace} ---")
   try:
-    ds_list = APPS_V1_API.list_namespaced_daemon_set(namespace=namespace)
-    if not ds_list.items:
+    ds_list = _list_resources("daemonset", namespace)
+    if not ds_list:
       return []
 
     daemonsets_info = []
-    for ds in ds_list.items:
+    for ds in ds_list:
       daemonsets_info.append({
-        "name": ds.metadata.name,
-        "desired_scheduled": ds.status.desired_number_scheduled,
-        "ready": ds.status.number_ready
+        "name": ds["metadata"]["name"],
+        "desired_scheduled": ds.get("status", {}).get("desiredNumberScheduled"),
+        "ready": ds.get("status", {}).get("numberReady")
       })
     return daemonsets_info
   except Exception as e:
       return [{"error": f"Error listing daemonsets: {e}"}]
 
+@cached(ttl=60, scope=("kubernetes",))
 def get_namespaces(**kwargs) -> list[str]:
   """
   Retrieves a list of all namespaces within the cluster.
   """
   print(f"--- TOOL: Called get_namespaces ---")
   try:
-    ns_list = CORE_V1_API.list_namespace()
-    if not ns_list.items:
+    ns_list = listing.list_raw(CORE_V1_API.list_namespace).get("items")
+    if not ns_list:
       return []
 
-    namespace_names = [ns.metadata.name for ns in ns_list.items]
+    namespace_names = [ns["metadata"]["name"] for ns in ns_list]
     return namespace_names
   except Exception as e:
-    return [f"Error listing namespaces: {e}"]
+    return [{"error": f"Error listing namespaces: {e}"}]
 
 def get_ingresses(namespace: str, **kwargs) -> list[dict]:
   """
@@ -126,24 +169,24 @@ def get_ingresses(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_ingresses for namespace: {namespace} ---")
   try:
-    ingress_list = NETWORKING_V1_API.list_namespaced_ingress(namespace=namespace)
-    if not ingress_list.items:
+    ingress_list = _list_resources("ingress", namespace)
+    if not ingress_list:
         return []
 
     ingresses_info = []
-    for ingress in ingress_list.items:
+    for ingress in ingress_list:
       rules_info = []
-      if ingress.spec.rules:
-        for rule in ingress.spec.rules:
-          if rule.http and rule.http.paths:
-            paths = [
-              f"{path.path} -> {path.backend.service.name}:{path.backend.service.port.number}"
-              for path in rule.http.paths
-            ]
-            rules_info.append({"host": rule.host, "paths": paths})
+      for rule in ingress.get("spec", {}).get("rules") or []:
+        http_paths = rule.get("http", {}).get("paths")
+        if http_paths:
+          paths = []
+          for path in http_paths:
+            service = path.get("backend", {}).get("service", {})
+            paths.append(f"{path.get('path')} -> {service.get('name')}:{service.get('port', {}).get('number')}")
+          rules_info.append({"host": rule.get("host"), "paths": paths})
 
       ingresses_info.append({
-        "name": ingress.metadata.name,
+        "name": ingress["metadata"]["name"],
         "rules": rules_info
       })
     return ingresses_info
@@ -157,30 +200,117 @@ def get_services(namespace: str, **kwargs) -> list[dict]:
   """
   print(f"--- TOOL: Called get_services for namespace: {namespace} ---")
   try:
-    svc_list = CORE_V1_API.list_namespaced_service(namespace=namespace)
+    svc_list = _list_resources("service", namespace)
     result = []
-    for svc in svc_list.items:
+    for svc in svc_list:
+      spec = svc.get("spec", {})
       result.append({
-        "name": svc.metadata.name,
-        "type": svc.spec.type,
-        "cluster_ip": svc.spec.cluster_ip,
+        "name": svc["metadata"]["name"],
+        "type": spec.get("type"),
+        "cluster_ip": spec.get("clusterIP"),
         "ports": [
           {
-            "port": p.port,
-            "target_port": p.target_port,
-            "protocol": p.protocol,
-            "name": p.name
+            "port": p.get("port"),
+            "target_port": p.get("targetPort"),
+            "protocol": p.get("protocol"),
+            "name": p.get("name")
           }
-          for p in svc.spec.ports
+          for p in spec.get("ports") or []
         ],
-        "selector": svc.spec.selector or {},
-        "creation_timestamp": svc.metadata.creation_timestamp.isoformat() if svc.metadata.creation_timestamp else None
+        "selector": spec.get("selector") or {},
+        "creation_timestamp": svc["metadata"].get("creationTimestamp")
       })
 
     return result
   except Exception as e:
     return [{"error": f"Error listing services: {e}"}]
 
+@cached(ttl=15, scope=("kubernetes",))
+def find_pods(
+  phase: str = None,
+  min_restarts: int = 0,
+  waiting_reason: str = None,
+  label_selector: str = None,
+  field_selector: str = None,
+  max_results: int = 100,
+  **kwargs
+) -> dict:
+  """
+  Searches for pods across ALL namespaces in one call, filtering as it goes.
+  Use this for cluster-wide questions such as "which pods are crashlooping anywhere".
+  Args:
+    phase: Only pods in this phase (e.g. 'Running', 'Pending', 'Failed').
+    min_restarts: Only pods whose containers have restarted at least this many times in total.
+    waiting_reason: Only pods with a container waiting for this reason (e.g. 'CrashLoopBackOff').
+    label_selector: A Kubernetes label selector (e.g. 'app=nginx').
+    field_selector: A Kubernetes field selector (e.g. 'spec.nodeName=node-1').
+    max_results: Stop after this many matching pods.
+  """
+  print(f"--- TOOL: Called find_pods (phase={phase}, min_restarts={min_restarts}, reason={waiting_reason}) ---")
+  if phase:
+    # Push the phase filter to the API server so non-matching pods never leave it
+    phase_selector = f"status.phase={phase}"
+    field_selector = f"{field_selector},{phase_selector}" if field_selector else phase_selector
+
+  try:
+    matches = []
+    truncated = False
+    for pod in _iter_resources_all_namespaces("pod", label_selector, field_selector):
+      restarts = listing.pod_restarts(pod)
+      if restarts < min_restarts:
+        continue
+      reasons = listing.pod_waiting_reasons(pod)
+      if waiting_reason and waiting_reason not in reasons:
+        continue
+
+      if len(matches) >= max_results:
+        truncated = True
+        break
+      matches.append({
+        "namespace": pod["metadata"]["namespace"],
+        "name": pod["metadata"]["name"],
+        "status": pod.get("status", {}).get("phase"),
+        "restarts": restarts,
+        "waiting_reasons": reasons
+      })
+    return {"pods": matches, "count": len(matches), "truncated": truncated}
+  except Exception as e:
+    return {"error": f"Error searching pods: {e}"}
+
+@cached(ttl=15, scope=("kubernetes",))
+def find_workloads(kind: str, unhealthy_only: bool = True, label_selector: str = None, max_results: int = 100, **kwargs) -> dict:
+  """
+  Searches for deployments, statefulsets or daemonsets across ALL namespaces in one call.
+  By default only returns workloads with fewer ready replicas than desired.
+  The 'kind' can be 'deployment', 'statefulset' or 'daemonset'.
+  """
+  print(f"--- TOOL: Called find_workloads for kind: {kind} (unhealthy_only={unhealthy_only}) ---")
+  kind_lower = kind.lower()
+  if kind_lower not in ['deployment', 'statefulset', 'daemonset']:
+    return {"error": f"Searching workloads of kind '{kind}' is not supported."}
+
+  try:
+    matches = []
+    truncated = False
+    for obj in _iter_resources_all_namespaces(kind_lower, label_selector):
+      ready, desired = listing.workload_replicas(kind_lower, obj)
+      if unhealthy_only and ready >= desired:
+        continue
+
+      if len(matches) >= max_results:
+        truncated = True
+        break
+      matches.append({
+        "namespace": obj["metadata"]["namespace"],
+        "name": obj["metadata"]["name"],
+        "ready": ready,
+        "desired": desired
+      })
+    return {"workloads": matches, "count": len(matches), "truncated": truncated}
+  except Exception as e:
+    return {"error": f"Error searching {kind_lower}s: {e}"}
+
+@invalidates(("kubernetes", "namespace"))
 def scale_deployment(deployment_name: str, namespace: str, replicas: int, **kwargs) -> dict:
   """
   Scales a specific deployment to a desired number of replicas.
@@ -194,6 +324,7 @@ def scale_deployment(deployment_name: str, namespace: str, replicas: int, **kwar
   except Exception as e:
     return {"status": "error", "message": f"Error scaling deployment: {e}"}
 
+@invalidates(("kubernetes", "namespace"))
 def delete_pod(namespace: str, pod_name: str, **kwargs) -> dict:
   """
   Deletes a specific pod from a given namespace.
@@ -254,41 +385,94 @@ def describe_resource(name: str, namespace: str, kind: str, **kwargs) -> dict:
       return {"error": f"Describing resources of kind '{kind}' is not supported yet."}
 
     # --- Fetch and add associated events ---
-    field_selector = f"involvedObject.name={name},involvedObject.namespace={namespace},involvedObject.kind={resource_kind_for_events}"
-    events = CORE_V1_API.list_namespaced_event(namespace=namespace, field_selector=field_selector)
-
-    for event in events.items:
-      events_list.append({
-        "timestamp": event.last_timestamp.isoformat() if event.last_timestamp else None,
-        "type": event.type,
-        "reason": event.reason,
-        "message": event.message
-      })
+    event_index = events.get_event_index(CORE_V1_API.list_event_for_all_namespaces)
+    if event_index is not None:
+      recent = event_index.recent_for_object(namespace, resource_kind_for_events, name, 10)
+      events_list = [events.event_summary(event) for event in recent]
+    else:
+      field_selector = f"involvedObject.name={name},involvedObject.namespace={namespace},involvedObject.kind={resource_kind_for_events}"
+      event_items = listing.list_raw(CORE_V1_API.list_namespaced_event, namespace=namespace, field_selector=field_selector).get("items") or []
+      events_list = [events.event_summary(event) for event in event_items]
 
-    # Sort events by time, most recent last
-    events_list.sort(key=lambda e: e['timestamp'] or '', reverse=True)
+      # Sort events by time, most recent first
+      events_list.sort(key=lambda e: e['timestamp'] or '', reverse=True)
 
     return {"resource_info": resource_info, "events": events_list[:10]} # Return the 10 most recent events
   except Exception as e:
     return {"error": f"Error describing {kind}/{name}: {e}"}
 
-def get_logs(name: str, namespace: str, kind: str, tail_lines: int, previous: bool, **kwargs) -> dict:
+def get_recent_warnings(namespace: str = None, limit: int = 20, **kwargs) -> list[dict]:
+  """
+  Retrieves the most recent Warning events across the whole cluster, newest first.
+  Optionally restrict to one namespace. Use this for "what is going wrong right now?" questions.
+  """
+  print(f"--- TOOL: Called get_recent_warnings (namespace={namespace}, limit={limit}) ---")
+  try:
+    event_index = events.get_event_index(CORE_V1_API.list_event_for_all_namespaces)
+    if event_index is not None:
+      recent = event_index.recent_warnings(namespace, limit)
+    else:
+      field_selector = "type=Warning"
+      if namespace:
+        field_selector += f",metadata.namespace={namespace}"
+      warnings = listing.iter_all_namespaces(CORE_V1_API.list_event_for_all_namespaces, field_selector=field_selector)
+      recent = heapq.nlargest(limit, warnings, key=events.event_timestamp)
+
+    result = []
+    for event in recent:
+      involved = event.get("involvedObject") or {}
+      result.append({
+        "namespace": event["metadata"].get("namespace"),
+        "object": f"{involved.get('kind')}/{involved.get('name')}",
+        **events.event_summary(event),
+        "count": event.get("count")
+      })
+    return result
+  except Exception as e:
+    return [{"error": f"Error listing warning events: {e}"}]
+
+def _condensed(log_text: str, enabled: bool) -> dict:
+  """Returns condensed log fields to overlay on a result, or nothing for short logs."""
+  if not enabled or not log_text or log_text.count("\n") < settings.kubernetes.log_condense_min_lines:
+    return {}
+  return condense.condense_log(log_text)
+
+def get_logs(
+  name: str,
+  namespace: str,
+  kind: str,
+  tail_lines: int,
+  previous: bool,
+  all_pods: bool = False,
+  since_seconds: int = None,
+  limit_bytes: int = None,
+  condense_output: bool = True,
+  **kwargs
+) -> dict:
   """
   Retrieves logs for a given Kubernetes resource. If the kind is a controller
   (deployment, statefulset, daemonset), it finds a pod managed by it and gets its logs.
   The 'previous' flag only applies when the kind is 'pod'.
+  Set 'all_pods' to True to read every pod and container behind the resource in one
+  call (e.g. to find a flaky replica); lines are merged by timestamp and capped in size.
+  'since_seconds' and 'limit_bytes' (per container) further bound the logs returned.
+  Long logs are condensed (repeated lines folded with counts, errors and warnings
+  kept first); set 'condense_output' to False to get the raw lines instead.
   """
-  print(f"--- TOOL: Called get_logs for {kind}/{name} in {namespace} ---")
+  print(f"--- TOOL: Called get_logs for {kind}/{name} in {namespace} (all_pods={all_pods}) ---")
 
   try:
     pod_name_to_log = ""
     is_controller = False
+    pods = []
 
     # --- Step 1: Determine the actual pod to get logs from ---
     kind_lower = kind.lower()
 
     if kind_lower == 'pod':
       pod_name_to_log = name
+      if all_pods:
+        pods = [listing.list_raw(CORE_V1_API.read_namespaced_pod, name=name, namespace=namespace)]
 
     elif kind_lower in ['deployment', 'statefulset', 'daemonset']:
       is_controller = True
@@ -306,16 +490,24 @@ def get_logs(name: str, namespace: str, kind: str, tail_lines: int, previous: bo
         label_selector_str = ",".join([f"{k}={v}" for k, v in controller.spec.selector.match_labels.items()])
 
       # Find pods that match the controller's label selector
-      pods = CORE_V1_API.list_namespaced_pod(namespace=namespace, label_selector=label_selector_str)
-      if not pods.items:
+      pods = _list_resources("pod", namespace, label_selector=label_selector_str)
+      if not pods:
         return {"error": f"No pods found for {kind}/{name}."}
 
       # Select the first pod found
-      pod_name_to_log = pods.items[0].metadata.name
+      pod_name_to_log = pods[0]["metadata"]["name"]
 
     else:
       return {"error": f"Getting logs for kind '{kind}' is not supported."}
 
+    if all_pods:
+      result = logs.fetch_logs_fanout(
+        CORE_V1_API, namespace, pods,
+        tail_lines=tail_lines, since_seconds=since_seconds, limit_bytes=limit_bytes,
+        previous=previous if not is_controller else False, condense=condense_output
+      )
+      return {"source": f"{kind}/{name}", **result}
+
     # --- Step 2: Retrieve the logs from the target pod ---
     if not pod_name_to_log:
       return {"error": "Could not determine a pod to get logs from."}
@@ -323,18 +515,25 @@ def get_logs(name: str, namespace: str, kind: str, tail_lines: int, previous: bo
     # The 'previous' flag is only meaningful for direct pod queries, not controllers
     use_previous_flag = previous if not is_controller else False
 
-    logs = CORE_V1_API.read_namespaced_pod_log(
+    log_kwargs = {}
+    if since_seconds:
+      log_kwargs["since_seconds"] = since_seconds
+    if limit_bytes:
+      log_kwargs["limit_bytes"] = limit_bytes
+
+    log_text = CORE_V1_API.read_namespaced_pod_log(
       name=pod_name_to_log,
       namespace=namespace,
       tail_lines=tail_lines,
-      previous=use_previous_flag
+      previous=use_previous_flag,
+      **log_kwargs
     )
 
     log_source = f"{kind}/{name}"
     if is_controller:
       log_source += f" (via pod '{pod_name_to_log}')"
 
-    return {"source": log_source, "log_content": logs or "No logs found."}
+    return {"source": log_source, "log_content": log_text or "No logs found.", **_condensed(log_text, condense_output)}
   except Exception as e:
       return {"error": f"Error getting logs for {kind}/{name}: {e}"}
 
@@ -345,7 +544,7 @@ def create_kubernetes_agent(llm):
     model=llm,
     instruction=prompt.KUBERNETES_EXPERT_INSTRUCTIONS,
     output_key="kubernetes_expert_output",
-    tools=[
+    tools=offload_all("kubernetes", [
       get_pods,
       get_deployments,
       get_statefulsets,
@@ -353,9 +552,12 @@ def create_kubernetes_agent(llm):
       get_namespaces,
       get_ingresses,
       get_services,
+      find_pods,
+      find_workloads,
+      get_recent_warnings,
       get_logs,
       scale_deployment,
       delete_pod,
       describe_resource
-    ],
+    ]),
   )
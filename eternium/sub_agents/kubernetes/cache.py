@@ -0,0 +1,220 @@
+"""Informer-style, watch-backed cache of Kubernetes resources for the read-only tools."""
+
+import threading
+import time
+from kubernetes.client.rest import ApiException
+from config import settings
+from . import listing
+
+class ResourceInformer:
+  """
+  Keeps an in-memory copy of one resource kind across all namespaces, fed by a
+  single list+watch and indexed by namespace, name and labels. Objects are stored
+  as the raw dicts the API server returns (see listing.py).
+  The watch resumes from the last seen resourceVersion; the store is rebuilt from
+  a fresh list when that version expires (410 Gone) or the resync period elapses.
+  """
+
+  def __init__(self, kind: str, list_all_func):
+    self.kind = kind
+    self._list_all = list_all_func
+    self._lock = threading.RLock()
+    self._reset()
+    self._resource_version = None
+    self._last_list = 0.0
+    self._last_heartbeat = 0.0
+    self._synced = False
+    self._thread = None
+
+  def start(self):
+    """Starts the background list+watch loop if it is not already running."""
+    with self._lock:
+      if self._thread and self._thread.is_alive():
+        return
+      self._thread = threading.Thread(target=self._run, name=f"informer-{self.kind}", daemon=True)
+      self._thread.start()
+
+  def is_fresh(self) -> bool:
+    """True once the initial list has landed and the watch has reported in recently."""
+    if not self._synced or not self._thread or not self._thread.is_alive():
+      return False
+    return time.monotonic() - self._last_heartbeat < settings.kubernetes.cache_max_staleness_seconds
+
+  def list(self, namespace: str = None, label_selector: str = None):
+    """
+    Returns the cached objects in a namespace (all namespaces if None), sorted by
+    namespace and name, or None if the label selector uses syntax the label index
+    cannot answer (e.g. set-based).
+    """
+    requirements = _parse_label_selector(label_selector)
+    if requirements is None:
+      return None
+
+    with self._lock:
+      if namespace is None:
+        keys = set(self._objects)
+      else:
+        keys = {(namespace, n) for n in self._by_namespace.get(namespace, set())}
+      for key, op, value in requirements:
+        if op == "=":
+          keys &= self._by_label.get((key, value), set())
+      items = [self._objects[k] for k in keys]
+
+    for key, op, value in requirements:
+      if op == "!=":
+        items = [i for i in items if _labels(i).get(key) != value]
+      elif op == "exists":
+        items = [i for i in items if key in _labels(i)]
+      elif op == "!exists":
+        items = [i for i in items if key not in _labels(i)]
+    return sorted(items, key=lambda i: (i["metadata"].get("namespace", ""), i["metadata"]["name"]))
+
+  # --- Store maintenance ---
+
+  def _reset(self):
+    self._objects = {}       # (namespace, name) -> raw object
+    self._by_namespace = {}  # namespace -> set of names
+    self._by_label = {}      # (label key, label value) -> set of (namespace, name)
+
+  def _put(self, obj):
+    key = _key(obj)
+    with self._lock:
+      self._remove_key(key)
+      self._objects[key] = obj
+      self._by_namespace.setdefault(key[0], set()).add(key[1])
+      for label in _labels(obj).items():
+        self._by_label.setdefault(label, set()).add(key)
+
+  def _remove_key(self, key):
+    old = self._objects.pop(key, None)
+    if old is None:
+      return
+    names = self._by_namespace.get(key[0])
+    if names is not None:
+      names.discard(key[1])
+      if not names:
+        del self._by_namespace[key[0]]
+    for label in _labels(old).items():
+      keys = self._by_label.get(label)
+      if keys is not None:
+        keys.discard(key)
+        if not keys:
+          del self._by_label[label]
+
+  def _relist(self):
+    """Replaces the store with a full list and records its resourceVersion."""
+    result = listing.list_raw(self._list_all)
+    with self._lock:
+      self._reset()
+      for obj in result.get("items") or []:
+        self._put(obj)
+      self._resource_version = result["metadata"]["resourceVersion"]
+      self._last_list = self._last_heartbeat = time.monotonic()
+      self._synced = True
+
+  def _watch(self):
+    """Streams changes from the last resourceVersion until the server closes the watch."""
+    events = listing.watch_raw(
+      self._list_all,
+      resource_version=self._resource_version,
+      timeout_seconds=settings.kubernetes.watch_timeout_seconds
+    )
+    for event in events:
+      obj = event.get("object") or {}
+      if event["type"] == "ERROR":
+        if obj.get("code") == 410:
+          self._resource_version = None
+          events.close()
+          return
+        raise ApiException(status=obj.get("code"), reason=obj.get("message"))
+
+      if event["type"] == "ADDED" or event["type"] == "MODIFIED":
+        self._put(obj)
+      elif event["type"] == "DELETED":
+        with self._lock:
+          self._remove_key(_key(obj))
+
+      self._resource_version = obj.get("metadata", {}).get("resourceVersion", self._resource_version)
+      self._last_heartbeat = time.monotonic()
+    # A watch that ran to its timeout means we were in sync the whole time.
+    self._last_heartbeat = time.monotonic()
+
+  def _run(self):
+    backoff = 1
+    while True:
+      try:
+        resync_due = time.monotonic() - self._last_list >= settings.kubernetes.cache_resync_seconds
+        if self._resource_version is None or resync_due:
+          self._relist()
+        self._watch()
+        backoff = 1
+      except ApiException as e:
+        if e.status == 410:
+          self._resource_version = None
+          continue
+        print(f"--- WARNING: {self.kind} informer watch failed, retrying in {backoff}s: {e.reason} ---")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+      except Exception as e:
+        print(f"--- WARNING: {self.kind} informer failed, retrying in {backoff}s: {e} ---")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+
+def _key(obj: dict) -> tuple:
+  return (obj["metadata"].get("namespace"), obj["metadata"]["name"])
+
+def _labels(obj: dict) -> dict:
+  return obj["metadata"].get("labels") or {}
+
+def _parse_label_selector(label_selector: str):
+  """
+  Parses an equality-based label selector into (key, op, value) tuples.
+  Returns None for set-based selectors, which the cache leaves to the API server.
+  """
+  requirements = []
+  if not label_selector:
+    return requirements
+  for term in label_selector.split(","):
+    term = term.strip()
+    if not term:
+      continue
+    if " in " in term or " notin " in term or "(" in term:
+      return None
+    if "!=" in term:
+      key, value = term.split("!=", 1)
+      requirements.append((key.strip(), "!=", value.strip()))
+    elif "=" in term:
+      key, value = term.replace("==", "=").split("=", 1)
+      requirements.append((key.strip(), "=", value.strip()))
+    elif term.startswith("!"):
+      requirements.append((term[1:].strip(), "!exists", None))
+    else:
+      requirements.append((term, "exists", None))
+  return requirements
+
+_INFORMERS = {}
+_INFORMERS_LOCK = threading.Lock()
+
+def get_informer(kind: str, list_all_func, informer_class=ResourceInformer):
+  """
+  Returns the warm informer for a kind, or None when the caller should fall back
+  to the API server (cache disabled, cold or stale). The first call starts it.
+  """
+  if not settings.kubernetes.cache_enabled:
+    return None
+  with _INFORMERS_LOCK:
+    informer = _INFORMERS.get(kind)
+    if informer is None:
+      informer = _INFORMERS[kind] = informer_class(kind, list_all_func)
+  informer.start()
+  return informer if informer.is_fresh() else None
+
+def list_cached(kind: str, list_all_func, namespace: str = None, label_selector: str = None):
+  """
+  Returns the cached objects of a kind in a namespace (all namespaces if None), or None when the caller
+  should fall back to a live list (cache disabled, cold, stale or unsupported selector).
+  """
+  informer = get_informer(kind, list_all_func)
+  if informer is None:
+    return None
+  return informer.list(namespace, label_selector)
@@ -0,0 +1,83 @@
+"""Single-pass log condensation: clusters repeated lines into templates before they reach the LLM."""
+
+import re
+from config import settings
+
+# Any token carrying a digit (ids, counters, IPs, timestamps, pod hashes) is treated as a variable.
+_VARIABLE_TOKEN = re.compile(r"\S*\d\S*")
+_ERROR_LINE = re.compile(r"\b(ERROR|FATAL|CRITICAL|CRIT|PANIC|SEVERE)\b|\w*(Exception|Error)\b:?", re.IGNORECASE)
+_WARN_LINE = re.compile(r"\b(WARN|WARNING)\b", re.IGNORECASE)
+_STACK_LINE = re.compile(r"(^|\s)(at [\w$.<>]+\(|File \".*\", line \d+|Traceback \(most recent call last\)|Caused by:|goroutine \d+ \[)")
+
+PRIORITY_ERROR = 2
+PRIORITY_WARN = 1
+PRIORITY_INFO = 0
+
+def _priority(line: str) -> int:
+  if _ERROR_LINE.search(line) or _STACK_LINE.search(line):
+    return PRIORITY_ERROR
+  if _WARN_LINE.search(line):
+    return PRIORITY_WARN
+  return PRIORITY_INFO
+
+class LogCondenser:
+  """
+  Folds a stream of log lines into templates (variable tokens masked), keeping
+  the count plus the first and last occurrence of each. Rendering picks
+  templates by severity, then frequency, then first appearance, so the output
+  is deterministic for a given input and budget.
+  """
+
+  def __init__(self, max_lines: int = None, max_line_chars: int = None):
+    self.max_lines = max_lines or settings.kubernetes.log_condense_max_lines
+    self.max_line_chars = max_line_chars or settings.kubernetes.log_condense_max_line_chars
+    self.total_lines = 0
+    self._clusters = {}  # template -> [first_index, count, priority, first_line, last_line]
+
+  def feed(self, line: str):
+    if not line:
+      return
+    line = line[:self.max_line_chars]
+    template = _VARIABLE_TOKEN.sub("<*>", line)
+    cluster = self._clusters.get(template)
+    if cluster is None:
+      self._clusters[template] = [self.total_lines, 1, _priority(line), line, line]
+    else:
+      cluster[1] += 1
+      cluster[4] = line
+    self.total_lines += 1
+
+  def render(self) -> dict:
+    # Each template renders as one line, or two when its last occurrence differs from the first
+    ranked = sorted(self._clusters.values(), key=lambda c: (-c[2], -c[1], c[0]))
+    selected, used = [], 0
+    for cluster in ranked:
+      cost = 1 if cluster[3] == cluster[4] else 2
+      if used + cost > self.max_lines:
+        continue
+      selected.append(cluster)
+      used += cost
+
+    lines = []
+    for first_index, count, _, first_line, last_line in sorted(selected, key=lambda c: c[0]):
+      lines.append(first_line if count == 1 else f"[x{count}] {first_line}")
+      if last_line != first_line:
+        lines.append(f"    ... last: {last_line}")
+
+    return {
+      "log_content": "\n".join(lines) or "No logs found.",
+      "condensed": {
+        "total_lines": self.total_lines,
+        "templates": len(self._clusters),
+        "omitted_templates": len(self._clusters) - len(selected),
+        "error_templates": sum(1 for c in self._clusters.values() if c[2] == PRIORITY_ERROR),
+        "warning_templates": sum(1 for c in self._clusters.values() if c[2] == PRIORITY_WARN)
+      }
+    }
+
+def condense_log(text: str, max_lines: int = None) -> dict:
+  """Condenses a block of log text in one pass over its lines."""
+  condenser = LogCondenser(max_lines=max_lines)
+  for line in text.splitlines():
+    condenser.feed(line)
+  return condenser.render()
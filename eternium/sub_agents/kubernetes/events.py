@@ -0,0 +1,95 @@
+"""Cluster-wide event index, fed by a single watch and keyed by the object each event is about."""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from config import settings
+from . import cache
+
+def event_timestamp(event: dict) -> str:
+  """The most specific timestamp a raw event carries, as an ISO string."""
+  return event.get("lastTimestamp") or event.get("eventTime") or event["metadata"].get("creationTimestamp") or ""
+
+def event_summary(event: dict) -> dict:
+  return {
+    "timestamp": event_timestamp(event) or None,
+    "type": event.get("type"),
+    "reason": event.get("reason"),
+    "message": event.get("message")
+  }
+
+class EventInformer(cache.ResourceInformer):
+  """
+  An informer over Events that, instead of the usual namespace/label indexes,
+  keeps a bounded ring buffer per involved object ((namespace, kind, name)) and
+  one cluster-wide ring buffer of Warning events. Updated events move to the
+  newest end, so each buffer stays roughly in arrival order.
+  """
+
+  def _reset(self):
+    self._by_object = {}         # (namespace, kind, name) -> OrderedDict(event key -> raw event)
+    self._object_of = {}         # event key -> (namespace, kind, name)
+    self._warnings = OrderedDict()  # event key -> raw event
+
+  def _put(self, obj):
+    key = cache._key(obj)
+    involved = obj.get("involvedObject") or {}
+    object_key = (involved.get("namespace") or "", involved.get("kind"), involved.get("name"))
+    with self._lock:
+      self._remove_key(key)
+      bucket = self._by_object.setdefault(object_key, OrderedDict())
+      bucket[key] = obj
+      self._object_of[key] = object_key
+      if len(bucket) > settings.kubernetes.events_per_object:
+        evicted, _ = bucket.popitem(last=False)
+        self._object_of.pop(evicted, None)
+      if obj.get("type") == "Warning":
+        self._warnings[key] = obj
+        if len(self._warnings) > settings.kubernetes.events_max_warnings:
+          evicted, _ = self._warnings.popitem(last=False)
+          # Keep the reverse mapping only while the event is still in its object's buffer
+          if evicted not in self._by_object.get(self._object_of.get(evicted), {}):
+            self._object_of.pop(evicted, None)
+
+  def _remove_key(self, key):
+    self._warnings.pop(key, None)
+    object_key = self._object_of.pop(key, None)
+    if object_key is None:
+      return
+    bucket = self._by_object.get(object_key)
+    if bucket is not None:
+      bucket.pop(key, None)
+      if not bucket:
+        del self._by_object[object_key]
+
+  def recent_for_object(self, namespace: str, kind: str, name: str, limit: int) -> list[dict]:
+    """The newest events about one object, newest first, within the retention window."""
+    with self._lock:
+      events = list(self._by_object.get((namespace, kind, name), {}).values())
+    return _newest(events, limit)
+
+  def recent_warnings(self, namespace: str, limit: int) -> list[dict]:
+    """The newest Warning events cluster-wide (or in one namespace), newest first."""
+    with self._lock:
+      events = list(self._warnings.values())
+    if namespace:
+      events = [e for e in events if e["metadata"].get("namespace") == namespace]
+    return _newest(events, limit)
+
+def _newest(events: list[dict], limit: int) -> list[dict]:
+  """Drops events older than the retention window and returns the newest `limit`, newest first."""
+  cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.kubernetes.events_retention_seconds)
+  recent = []
+  for event in events:
+    stamp = event_timestamp(event)
+    try:
+      if stamp and datetime.fromisoformat(stamp.replace("Z", "+00:00")) < cutoff:
+        continue
+    except ValueError:
+      pass
+    recent.append(event)
+  recent.sort(key=event_timestamp, reverse=True)
+  return recent[:limit]
+
+def get_event_index(list_all_func):
+  """Returns the warm cluster-wide event index, or None if callers should query the API server."""
+  return cache.get_informer("event", list_all_func, informer_class=EventInformer)
@@ -0,0 +1,83 @@
+"""
+Raw, server-side paginated listing for the Kubernetes tools.
+
+List responses are requested with `_preload_content=False` and parsed with orjson
+into plain dicts, skipping the client's V1* model deserialization entirely. The
+tools only read a handful of fields, so the dicts are used as-is (camelCase keys,
+exactly as the API server returns them).
+"""
+
+import orjson
+from kubernetes.watch.watch import iter_resp_lines
+from config import settings
+
+def list_raw(list_func, **kwargs) -> dict:
+  """Calls a list_* (or read_*) API function and returns the parsed JSON body as a dict."""
+  response = list_func(_preload_content=False, **kwargs)
+  try:
+    return orjson.loads(response.data)
+  finally:
+    response.release_conn()
+
+def iter_all_namespaces(list_all_func, label_selector: str = None, field_selector: str = None):
+  """
+  Yields raw objects across all namespaces one page at a time, following the API
+  server's limit/continue tokens so only a single page is held in memory.
+  Callers that stop iterating early also stop further pages being requested.
+  """
+  kwargs = {"limit": settings.kubernetes.list_page_size}
+  if label_selector:
+    kwargs["label_selector"] = label_selector
+  if field_selector:
+    kwargs["field_selector"] = field_selector
+
+  continue_token = None
+  while True:
+    if continue_token:
+      kwargs["_continue"] = continue_token
+    page = list_raw(list_all_func, **kwargs)
+    yield from page.get("items") or []
+    continue_token = page.get("metadata", {}).get("continue")
+    if not continue_token:
+      return
+
+def watch_raw(list_all_func, resource_version: str, timeout_seconds: int):
+  """
+  Opens a watch from a resourceVersion and yields raw watch events
+  ({"type": ..., "object": {...}}) until the server closes the stream.
+  """
+  response = list_all_func(
+    watch=True,
+    resource_version=resource_version,
+    timeout_seconds=timeout_seconds,
+    allow_watch_bookmarks=True,
+    _preload_content=False
+  )
+  try:
+    for line in iter_resp_lines(response):
+      if line:
+        yield orjson.loads(line)
+  finally:
+    response.close()
+    response.release_conn()
+
+# --- Field extraction: only what each tool returns ---
+
+def pod_restarts(pod: dict) -> int:
+  """Total restart count across all of a pod's containers."""
+  statuses = pod.get("status", {}).get("containerStatuses") or []
+  return sum(cs.get("restartCount", 0) for cs in statuses)
+
+def pod_waiting_reasons(pod: dict) -> list[str]:
+  """Reasons for any containers currently waiting (e.g. 'CrashLoopBackOff')."""
+  statuses = pod.get("status", {}).get("containerStatuses") or []
+  return [cs["state"]["waiting"].get("reason") for cs in statuses if cs.get("state", {}).get("waiting")]
+
+def workload_replicas(kind: str, obj: dict) -> tuple[int, int]:
+  """Returns (ready, desired) replica counts for a deployment, statefulset or daemonset."""
+  spec, status = obj.get("spec", {}), obj.get("status", {})
+  if kind == "deployment":
+    return status.get("availableReplicas") or 0, spec.get("replicas") or 0
+  if kind == "statefulset":
+    return status.get("readyReplicas") or 0, spec.get("replicas") or 0
+  return status.get("numberReady") or 0, status.get("desiredNumberScheduled") or 0
@@ -0,0 +1,106 @@
+"""Concurrent log retrieval across every pod and container behind a resource."""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from .condense import LogCondenser
+
+def _timestamp_key(line: str) -> str:
+  """
+  Sort key for a line from a `timestamps=True` log. RFC3339Nano trims trailing
+  zeros from the fraction, so pad it to a fixed width before comparing.
+  """
+  stamp = line.split(" ", 1)[0]
+  if "." in stamp:
+    seconds, fraction = stamp.rstrip("Z").split(".", 1)
+    return f"{seconds}.{fraction:0<9}"
+  return f"{stamp.rstrip('Z')}.000000000"
+
+def _read_container_log(core_api, namespace, pod_name, container, tail_lines, since_seconds, limit_bytes, previous):
+  kwargs = {
+    "container": container,
+    "timestamps": True,
+    "previous": previous,
+    "_request_timeout": settings.kubernetes.log_request_timeout_seconds
+  }
+  if tail_lines:
+    kwargs["tail_lines"] = tail_lines
+  if since_seconds:
+    kwargs["since_seconds"] = since_seconds
+  if limit_bytes:
+    kwargs["limit_bytes"] = limit_bytes
+  text = core_api.read_namespaced_pod_log(name=pod_name, namespace=namespace, **kwargs)
+  prefix = f"[{pod_name}/{container}]"
+  return [(_timestamp_key(line), line, prefix) for line in (text or "").splitlines() if line]
+
+def fetch_logs_fanout(
+  core_api,
+  namespace: str,
+  pods: list[dict],
+  tail_lines: int = None,
+  since_seconds: int = None,
+  limit_bytes: int = None,
+  max_total_bytes: int = None,
+  previous: bool = False,
+  condense: bool = False
+) -> dict:
+  """
+  Reads the logs of every container in every given (raw) pod on a bounded
+  worker pool, merges the lines by timestamp and keeps the most recent lines
+  that fit in the total byte budget. With `condense`, long merged logs are
+  condensed first (so counts and error lines cover every fetched line) and the
+  budget applies to the condensed text.
+  """
+  max_total_bytes = max_total_bytes or settings.kubernetes.log_max_total_bytes
+  targets = [
+    (pod["metadata"]["name"], container["name"])
+    for pod in pods
+    for container in pod.get("spec", {}).get("containers") or []
+  ]
+
+  streams, errors = [], []
+  with ThreadPoolExecutor(max_workers=min(settings.kubernetes.log_workers, len(targets) or 1)) as pool:
+    futures = {
+      pool.submit(_read_container_log, core_api, namespace, pod_name, container, tail_lines, since_seconds, limit_bytes, previous): (pod_name, container)
+      for pod_name, container in targets
+    }
+    for future, (pod_name, container) in futures.items():
+      try:
+        streams.append(future.result())
+      except Exception as e:
+        errors.append({"pod": pod_name, "container": container, "error": str(e)})
+
+  # Each stream is already in time order, so a k-way merge is enough. Walk it
+  # backwards from the newest line until the byte budget runs out.
+  merged = list(heapq.merge(*streams))
+  result = {"containers": [f"{pod_name}/{container}" for pod_name, container in targets], "errors": errors}
+  if condense and len(merged) >= settings.kubernetes.log_condense_min_lines:
+    condenser = LogCondenser()
+    for _, line, prefix in merged:
+      condenser.feed(f"{prefix} {line}")
+    condensed = condenser.render()
+    lines, kept, used = condensed["log_content"].split("\n"), [], 0
+    for line in lines:
+      size = len(line.encode()) + 1
+      if used + size > max_total_bytes:
+        break
+      kept.append(line)
+      used += size
+    return {**result, **condensed, "log_content": "\n".join(kept), "lines": len(kept), "truncated": len(kept) < len(lines)}
+
+  kept, used = [], 0
+  for _, line, prefix in reversed(merged):
+    entry = f"{prefix} {line}"
+    size = len(entry.encode()) + 1
+    if used + size > max_total_bytes:
+      break
+    kept.append(entry)
+    used += size
+  kept.reverse()
+
+  return {
+    **result,
+    "log_content": "\n".join(kept) or "No logs found.",
+    "lines": len(kept),
+    "truncated": len(kept) < len(merged)
+  }
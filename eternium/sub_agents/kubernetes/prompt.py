@@ -9,7 +9,7 @@ KUBERNETES_EXPERT_INSTRUCTIONS = """
 
 **Tool Selection Process:**
 * You have a suite of tools for interacting with Kubernetes. Your most important task is to select the SINGLE best tool that directly answers the user's question based on its description.
-* **Guidance:** Use `describe_resource` for "why" questions (e.g., "why is this pod crashing?"). Use `get_logs` for application-level errors. Use the various `get_*` functions for "what" or "list" questions.
+* **Guidance:** Use `describe_resource` for "why" questions (e.g., "why is this pod crashing?"). Use `get_recent_warnings` for cluster-wide "what is going wrong?" questions. Use `get_logs` for application-level errors; set `all_pods=True` when a controller has several replicas and you need to see all of them (e.g. one flaky replica). Use the various `get_*` functions for "what" or "list" questions. Use `find_pods` or `find_workloads` for questions that span ALL namespaces (e.g. "which pods are crashlooping anywhere?") instead of calling a `get_*` tool once per namespace.
 
 **Instructions:**
 1.  Analyze the user's query to understand their core intent (e.g., are they asking for a list, a description, or logs?).
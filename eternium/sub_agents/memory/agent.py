@@ -1,10 +1,18 @@
-"""Tools for adding to and querying a persistent Milvus vectorstore."""
+"""Tools for adding to and querying a persistent vectorstore (Milvus, or the embedded local index)."""
 
+import json
 from langchain_ollama import OllamaEmbeddings
-from langchain_milvus import Milvus
 from google.adk import Agent
 from config import settings
+from ...executor import offload_all
+from ...tool_cache import cached, invalidates
 from . import prompt
+from .embedding_cache import CachedEmbeddings
+from .dedup import MinHashIndex, compact, find_duplicate, normalize
+from .ingest import bulk_ingest, chunk_text
+from .keyword_index import KeywordIndex, fuse
+from .local_store import LocalVectorStore
+from datetime import datetime, timezone
 from typing import Optional
 
 # Initialise the components for the memory system
@@ -13,15 +21,121 @@ embeddings = OllamaEmbeddings(
     model=settings.memory.embedding_model,
     base_url=settings.memory.embedding_url
 )
+if settings.memory.embedding_cache_enabled:
+  # Identical texts (repeated queries, re-ingested notes) skip the embedding model
+  embeddings = CachedEmbeddings(
+    embeddings,
+    model_name=settings.memory.embedding_model,
+    cache_dir=settings.memory.embedding_cache_dir,
+    max_entries=settings.memory.embedding_cache_max_entries
+  )
 
-vector_store = Milvus(
-    embedding_function=embeddings,
-    collection_name="eternium_homelab_memory",
-    connection_args={"uri": settings.milvus.url},
-    auto_id=settings.memory.auto_id,
-    drop_old=settings.memory.drop_old
-)
+if settings.memory.backend == "local":
+  vector_store = LocalVectorStore(embeddings, settings.memory.local_store_dir)
+else:
+  from langchain_milvus import Milvus
+  # Metadata goes to Milvus' dynamic field: without it, the first insert fixes the metadata keys
+  # as required columns. A collection created before this keeps its old schema (and may drop
+  # metadata) until it is recreated, e.g. with MEMORY_DROP_OLD=true.
+  vector_store = Milvus(
+      embedding_function=embeddings,
+      collection_name="eternium_homelab_memory",
+      connection_args={"uri": settings.milvus.url},
+      auto_id=settings.memory.auto_id,
+      drop_old=settings.memory.drop_old,
+      enable_dynamic_field=True
+  )
+
+def _existing_documents():
+  """Every (id, text) pair already in the vector store, used to fill the side indexes; None if unreadable."""
+  if isinstance(vector_store, LocalVectorStore):
+    return vector_store.documents()
+  if vector_store.col is None:
+    return []  # Nothing stored yet (or the collection was dropped)
+  documents = []
+  try:
+    iterator = vector_store.col.query_iterator(
+      batch_size=1000, expr="", output_fields=[vector_store._primary_field, vector_store._text_field]
+    )
+    while batch := iterator.next():
+      documents.extend((row[vector_store._primary_field], row[vector_store._text_field]) for row in batch)
+    iterator.close()
+  except Exception as e:
+    print(f"--- MEMORY: Could not read existing facts from the vector store: {e} ---")
+    return None
+  return documents
+
+def _stored_ids(ids: list) -> set:
+  """The ids (as strings) among `ids` that the vector store still holds."""
+  if not ids:
+    return set()
+  if isinstance(vector_store, LocalVectorStore):
+    return {str(doc.metadata["pk"]) for doc in vector_store.get_by_ids(ids)}
+  if vector_store.col is None:
+    return set()
+  pk = vector_store._primary_field
+  keys = [int(doc_id) if doc_id.isdigit() else doc_id for doc_id in ids]
+  return {str(row[pk]) for row in vector_store.col.query(expr=f"{pk} in {json.dumps(keys)}", output_fields=[pk])}
+
+keyword_index = None
+if settings.memory.retrieval_mode == "hybrid":
+  keyword_index = KeywordIndex(settings.memory.keyword_index_path)
+
+dedup_index = MinHashIndex() if settings.memory.dedup_enabled else None
+
+def _load_side_indexes():
+  """
+  Reconciles the persisted keyword index with the vector store by id, and fills the
+  in-memory duplicate index. The keyword index can drift from the store after
+  MEMORY_DROP_OLD, a backend switch, or a crash between the two writes.
+  """
+  if keyword_index is None and dedup_index is None:
+    return
+  documents = _existing_documents()
+  if documents is None:
+    return
+  if keyword_index is not None:
+    stored = {str(doc_id): text for doc_id, text in documents}
+    indexed = keyword_index.ids()
+    orphaned = indexed - stored.keys()
+    missing = [doc_id for doc_id in stored if doc_id not in indexed]
+    if orphaned:
+      keyword_index.delete(list(orphaned))
+    if missing:
+      keyword_index.add(missing, [stored[doc_id] for doc_id in missing])
+    if orphaned or missing:
+      print(f"--- MEMORY: Keyword index reconciled: {len(orphaned)} removed, {len(missing)} added ---")
+  if dedup_index is not None:
+    for doc_id, text in documents:
+      dedup_index.add(doc_id, text)
 
+_load_side_indexes()
+
+def _indexed(ids: list, texts: list):
+  """Records newly stored facts in the keyword and duplicate indexes."""
+  if keyword_index is not None:
+    keyword_index.add(ids, texts)
+  if dedup_index is not None:
+    for doc_id, text in zip(ids, texts):
+      dedup_index.add(doc_id, text)
+
+def _forget(ids: list):
+  """Drops deleted facts from the keyword and duplicate indexes."""
+  if keyword_index is not None:
+    keyword_index.delete(ids)
+  if dedup_index is not None:
+    for doc_id in ids:
+      dedup_index.remove(int(doc_id) if str(doc_id).isdigit() else doc_id)
+
+def _metadatas(count: int, source: str, chunked: bool = False) -> list:
+  """Per-fact metadata; every insert path writes the same keys (source, chunk, ingested_at)."""
+  ingested_at = datetime.now(timezone.utc).isoformat()
+  return [{"source": source, "chunk": i if chunked else 0, "ingested_at": ingested_at} for i in range(count)]
+
+def _find_duplicate(text: str):
+  return find_duplicate(vector_store, dedup_index, text) if dedup_index is not None else None
+
+@invalidates(("memory",))
 def add_to_memory(fact: str, **kwargs) -> dict:
   """
   Adds a new piece of text (a fact or note) to the agent's long-term memory.
@@ -29,24 +143,126 @@ def add_to_memory(fact: str, **kwargs) -> dict:
   """
   print(f"--- MEMORY TOOL: Called add_to_memory ---")
   try:
-    vector_store.add_texts([fact])
+    duplicate = _find_duplicate(fact)
+    ids = vector_store.add_texts([fact], metadatas=_metadatas(1, "note"))
+    _indexed(ids, [fact])
+    if duplicate is not None:
+      # Replace the older wording instead of keeping both
+      vector_store.delete([duplicate])
+      _forget([duplicate])
+      return {"status": "success", "message": f"Updated an existing memory (previously ID {duplicate}) instead of adding a duplicate."}
     return {"status": "success", "message": "The information has been added to long-term memory."}
   except Exception as e:
     return {"status": "error", "message": f"Failed to add fact to memory: {e}"}
 
-def query_memory(query: str, include_metadata: Optional[bool] = False, **kwargs) -> list:
+def _ingest(texts: list, metadatas: list) -> dict:
+  def report(done, total):
+    print(f"--- MEMORY TOOL: Ingested {done}/{total} ---")
+
+  # Exact repeats within the batch are dropped; near-duplicates of stored facts replace them
+  unique = {}
+  for text, metadata in zip(texts, metadatas):
+    unique.setdefault(normalize(text), (text, metadata))
+  texts, metadatas = [text for text, _ in unique.values()], [metadata for _, metadata in unique.values()]
+  replaced = list(dict.fromkeys(doc_id for doc_id in map(_find_duplicate, texts) if doc_id is not None))
+
+  result = bulk_ingest(vector_store, embeddings, texts, metadatas, progress=report, on_insert=_indexed)
+  result.pop("ids", None)
+  if replaced:
+    vector_store.delete(replaced)
+    _forget(replaced)
+  result["updated_existing"] = len(replaced)
+  return {"status": "success", "message": f"Added {result['ingested']} entries to long-term memory.", **result}
+
+@invalidates(("memory",))
+def add_many_to_memory(facts: list[str], source: Optional[str] = None, **kwargs) -> dict:
   """
-  Searches memory for a query. Can optionally return metadata including unique IDs.
+  Adds many facts or notes to long-term memory in one batched operation.
+  Use this instead of calling add_to_memory repeatedly when the user provides a list of facts.
+  Args:
+      facts: The facts to remember, one string per fact.
+      source: Optional label for where the facts came from (e.g. 'inventory import').
+  """
+  print(f"--- MEMORY TOOL: Called add_many_to_memory ({len(facts)} facts) ---")
+  try:
+    return _ingest(facts, _metadatas(len(facts), source or "bulk"))
+  except Exception as e:
+    return {"status": "error", "message": f"Failed to add facts to memory: {e}"}
+
+@invalidates(("memory",))
+def ingest_document(text: str, source: str, **kwargs) -> dict:
+  """
+  Splits a long document (a runbook, a README, meeting notes) into chunks and adds them all to long-term memory.
+  Args:
+      text: The full document text.
+      source: A short name for the document (e.g. 'postgres failover runbook'), stored with each chunk.
+  """
+  print(f"--- MEMORY TOOL: Called ingest_document for '{source}' ---")
+  try:
+    chunks = chunk_text(text)
+    return _ingest(chunks, _metadatas(len(chunks), source, chunked=True))
+  except Exception as e:
+    return {"status": "error", "message": f"Failed to ingest document: {e}"}
+
+def _hybrid_search(query: str, k: int) -> list:
+  """
+  Fuses the vector ranking (only hits within the relevance threshold) with the
+  BM25 keyword ranking. Returns up to k dicts, best first.
+  """
+  candidates = settings.memory.hybrid_candidates
+  vector_hits = [
+    (str(doc.metadata.get("pk")), doc.page_content)
+    for doc, score in vector_store.similarity_search_with_score(query, k=candidates) if score < QUERY_MEMORY_THRESHOLD
+  ]
+  keyword_hits = keyword_index.search(query, candidates)
+  # The keyword index returns its own copy of the text; keep only facts the vector store still holds
+  found = {doc_id for doc_id, _ in vector_hits}
+  unchecked = [doc_id for doc_id, _ in keyword_hits if doc_id not in found]
+  if unchecked:
+    try:
+      present = _stored_ids(unchecked)
+    except Exception as e:
+      print(f"--- MEMORY: Could not verify keyword matches, using vector matches only: {e} ---")
+      present = set()
+    keyword_hits = [(doc_id, content) for doc_id, content in keyword_hits if doc_id in found or doc_id in present]
+  contents = dict(vector_hits + keyword_hits)
+  vector_ids = [doc_id for doc_id, _ in vector_hits]
+  keyword_ids = [doc_id for doc_id, _ in keyword_hits]
+  fused = fuse([vector_ids, keyword_ids], rrf_k=settings.memory.rrf_k)[:k]
+  return [
+    {
+      "id": int(doc_id) if doc_id.isdigit() else doc_id,
+      "content": contents[doc_id],
+      "score": round(score, 4),
+      "matched_by": [name for name, ids in (("vector", vector_ids), ("keyword", keyword_ids)) if doc_id in ids]
+    }
+    for doc_id, score in fused
+  ]
+
+@cached(ttl=60, scope=("memory",))
+def query_memory(query: str, include_metadata: Optional[bool] = False, k: Optional[int] = None, **kwargs) -> list:
+  """
+  Searches memory for a query and returns all the best matches in one call.
+  Exact identifiers (hostnames, IPs, image tags) are matched by keyword as well as by meaning.
+  Can optionally return metadata including unique IDs.
   Args:
       query: The search query string (should be concise keywords).
       include_metadata: If True, returns a list of dictionaries with full metadata (for deletion).
                         If False, returns a simple list of strings (for context).
+      k: How many matches to return (defaults to the configured value, usually 3).
   """
   print(f"--- MEMORY TOOL: Called query_memory (Metadata: {include_metadata}) ---")
+  k = k or settings.memory.query_k
   try:
+    if keyword_index is not None:
+      results = _hybrid_search(query, k)
+      if include_metadata:
+        return results or [{"error": "No matching facts found."}]
+      return [result["content"] for result in results]
+
     # If we need metadata, we must use the method that provides scores to filter.
     if include_metadata:
-      results_with_scores = vector_store.similarity_search_with_score(query, k=3)
+      results_with_scores = vector_store.similarity_search_with_score(query, k=k)
       if not results_with_scores: return [{"error": "No matching facts found."}]
 
       filtered_results = [
@@ -58,13 +274,14 @@ def query_memory(query: str, include_metadata: Optional[bool] = False, **kwargs)
 
     # Otherwise, we can use the simpler search method for speed.
     else:
-      results = vector_store.similarity_search(query, k=1)
+      results = vector_store.similarity_search(query, k=k)
       if not results: return []
       return [doc.page_content for doc in results]
 
   except Exception as e:
       return [{"error": f"Error querying memory: {e}"}]
 
+@invalidates(("memory",))
 def delete_memory_by_id(doc_id: str, **kwargs) -> dict:
     """
     Deletes a specific fact from long-term memory using its unique ID.
@@ -74,6 +291,8 @@ def delete_memory_by_id(doc_id: str, **kwargs) -> dict:
     try:
         # LangChain's Milvus wrapper has a 'delete' method that takes a list of IDs
         result = vector_store.delete([doc_id])
+        if result:
+            _forget([doc_id])
         if result:
             return {"status": "success", "message": f"Successfully deleted memory with ID {doc_id}."}
         else:
@@ -81,6 +300,30 @@ def delete_memory_by_id(doc_id: str, **kwargs) -> dict:
     except Exception as e:
         return {"status": "error", "message": f"Error deleting memory by ID: {e}"}
 
+@invalidates(("memory",))
+def compact_memory(dry_run: Optional[bool] = True, **kwargs) -> dict:
+  """
+  Finds clusters of near-duplicate memories across the whole store and keeps only the newest fact of each.
+  This is a maintenance ACTION. Run it with dry_run=True first and show the user the clusters;
+  only run with dry_run=False after the user confirms.
+  Args:
+      dry_run: If True, only reports what would be merged.
+  """
+  print(f"--- MEMORY TOOL: Called compact_memory (dry_run={dry_run}) ---")
+  try:
+    report = compact(vector_store, _existing_documents(), dry_run=dry_run)
+    if not dry_run and report["removed_ids"]:
+      _forget(report["removed_ids"])
+      # Rewrite the store without the deleted rows and rebuild its search index
+      if isinstance(vector_store, LocalVectorStore):
+        vector_store.checkpoint()
+      elif getattr(vector_store, "col", None) is not None:
+        vector_store.col.compact()
+    report["removed"] = len(report.pop("removed_ids"))
+    return {"status": "success", "dry_run": dry_run, **report}
+  except Exception as e:
+    return {"status": "error", "message": f"Error compacting memory: {e}"}
+
 def create_memory_agent(llm):
   """Factory function that builds and returns the Memory agent."""
   return Agent(
@@ -88,5 +331,13 @@ def create_memory_agent(llm):
     model=llm,
     instruction=prompt.MEMORY_AGENT_INSTRUCTIONS,
     output_key="memory_output",
-    tools=[add_to_memory, query_memory, delete_memory_by_id]
+    tools=offload_all(
+      "memory",
+      [add_to_memory, add_many_to_memory, ingest_document, query_memory, delete_memory_by_id, compact_memory],
+      timeouts={
+        "add_many_to_memory": settings.executor.memory_ingest_timeout_seconds,
+        "ingest_document": settings.executor.memory_ingest_timeout_seconds,
+        "compact_memory": settings.executor.memory_ingest_timeout_seconds
+      }
+    )
   )
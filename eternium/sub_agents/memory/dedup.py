@@ -0,0 +1,140 @@
+"""
+Near-duplicate detection for long-term memory.
+
+A new fact is a duplicate of a stored one when both a cheap lexical check and
+the embedding agree: MinHash signatures over word shingles, bucketed with LSH,
+find stored facts whose estimated Jaccard similarity is at least
+`dedup_min_jaccard`; only then is a vector search run to confirm that one of
+them lies within `dedup_max_distance`. Most inserts have no LSH candidates and
+skip the vector search entirely.
+
+`compact` applies the same test to the whole store offline and merges each
+duplicate cluster into its newest member; the compact_memory tool then
+rebuilds the indexes.
+"""
+
+import re
+import threading
+import zlib
+import numpy as np
+from config import settings
+
+_PRIME = (1 << 31) - 1
+_WORDS = re.compile(r"\w(?:[\w.:/@-]*\w)?")
+
+def normalize(text: str) -> str:
+  return " ".join(_WORDS.findall(text.lower()))
+
+def shingles(text: str, size: int) -> set:
+  words = normalize(text).split()
+  if len(words) <= size:
+    return {" ".join(words)} if words else set()
+  return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHashIndex:
+  """MinHash signatures of stored texts with banded LSH buckets for candidate lookup."""
+
+  def __init__(self, num_perm: int = None, bands: int = None, shingle_size: int = None, seed: int = 1):
+    self.num_perm = num_perm or settings.memory.dedup_num_perm
+    self.bands = bands or settings.memory.dedup_bands
+    self.rows = self.num_perm // self.bands
+    self.shingle_size = shingle_size or settings.memory.dedup_shingle_size
+    rng = np.random.default_rng(seed)
+    self._a = rng.integers(1, _PRIME, self.num_perm, dtype=np.uint64)
+    self._b = rng.integers(0, _PRIME, self.num_perm, dtype=np.uint64)
+    self._lock = threading.Lock()
+    self._signatures = {}  # doc id -> signature
+    self._buckets = {}     # (band, band bytes) -> set of doc ids
+
+  def __len__(self) -> int:
+    return len(self._signatures)
+
+  def signature(self, text: str) -> np.ndarray:
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_size)] or [0], dtype=np.uint64)
+    return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+  def _bands(self, signature: np.ndarray):
+    for band in range(self.bands):
+      yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+  def add(self, doc_id, text: str):
+    signature = self.signature(text)
+    with self._lock:
+      self._signatures[doc_id] = signature
+      for key in self._bands(signature):
+        self._buckets.setdefault(key, set()).add(doc_id)
+
+  def remove(self, doc_id):
+    with self._lock:
+      signature = self._signatures.pop(doc_id, None)
+      if signature is None:
+        return
+      for key in self._bands(signature):
+        bucket = self._buckets.get(key)
+        if bucket:
+          bucket.discard(doc_id)
+          if not bucket:
+            del self._buckets[key]
+
+  def candidates(self, text: str, min_jaccard: float = None) -> list:
+    """Stored ids sharing an LSH bucket with `text` and an estimated Jaccard >= min_jaccard, best first."""
+    min_jaccard = settings.memory.dedup_min_jaccard if min_jaccard is None else min_jaccard
+    signature = self.signature(text)
+    with self._lock:
+      found = set()
+      for key in self._bands(signature):
+        found |= self._buckets.get(key, set())
+      scored = [(doc_id, float((self._signatures[doc_id] == signature).mean())) for doc_id in found]
+    return sorted([item for item in scored if item[1] >= min_jaccard], key=lambda item: item[1], reverse=True)
+
+def find_duplicate(vector_store, index: MinHashIndex, text: str, exclude=None):
+  """Returns the id of a stored near-duplicate of `text`, or None."""
+  candidates = {str(doc_id) for doc_id, _ in index.candidates(text) if doc_id != exclude}
+  if not candidates:
+    return None
+  for doc, distance in vector_store.similarity_search_with_score(text, k=max(5, len(candidates))):
+    doc_id = doc.metadata.get("pk")
+    if str(doc_id) in candidates and doc_id != exclude and distance <= settings.memory.dedup_max_distance:
+      return doc_id
+  return None
+
+def compact(vector_store, documents: list, dry_run: bool = False) -> dict:
+  """
+  Finds clusters of near-duplicates among `documents` ((id, text) pairs) and,
+  unless dry_run, deletes every member but the newest (highest id) of each.
+  Returns the cluster count, the ids removed and a few example clusters.
+  """
+  index = MinHashIndex()
+  texts = dict(documents)
+  for doc_id, text in documents:
+    index.add(doc_id, text)
+
+  parent = {doc_id: doc_id for doc_id in texts}
+
+  def root(doc_id):
+    while parent[doc_id] != doc_id:
+      parent[doc_id] = parent[parent[doc_id]]
+      doc_id = parent[doc_id]
+    return doc_id
+
+  for doc_id, text in documents:
+    if len(index.candidates(text)) < 2:
+      continue  # only itself
+    duplicate = find_duplicate(vector_store, index, text, exclude=doc_id)
+    if duplicate is not None and duplicate in parent:
+      parent[root(doc_id)] = root(duplicate)
+
+  clusters = {}
+  for doc_id in texts:
+    clusters.setdefault(root(doc_id), []).append(doc_id)
+  clusters = [sorted(members) for members in clusters.values() if len(members) > 1]
+  removed = [doc_id for members in clusters for doc_id in members[:-1]]
+  if removed and not dry_run:
+    vector_store.delete(removed)
+
+  return {
+    "documents": len(documents),
+    "duplicate_clusters": len(clusters),
+    "removed_ids": removed,
+    "examples": [[texts[doc_id] for doc_id in members] for members in clusters[:5]]
+  }
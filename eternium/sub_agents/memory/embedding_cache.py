@@ -0,0 +1,166 @@
+"""
+Content-addressed cache in front of the embedding model.
+
+Every memory write and search used to call the embedding endpoint, which is the
+bulk of the memory tools' latency on a CPU-only host. CachedEmbeddings keys each
+vector by the SHA-256 of its text and looks it up in two tiers: an in-process
+LRU, then an append-only on-disk store read through mmap. The disk store lives
+in a directory named after the embedding model, so switching models starts a
+fresh cache instead of mixing vectors from different embedding spaces.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+
+DIGEST_SIZE = 32
+FLOAT_SIZE = array("f").itemsize
+
+def text_digest(text: str) -> bytes:
+  return hashlib.sha256(text.encode("utf-8")).digest()
+
+class DiskVectorStore:
+  """
+  Append-only float32 vectors in `vectors.bin` with their text digests in
+  `keys.bin` (one 32-byte digest per row). A row only counts once its digest is
+  written, so a crash mid-append leaves at most an ignored partial row.
+  """
+
+  def __init__(self, directory: str):
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+    self._meta_path = os.path.join(directory, "meta.json")
+    self._vectors_path = os.path.join(directory, "vectors.bin")
+    self._keys_path = os.path.join(directory, "keys.bin")
+    self._lock = threading.Lock()
+    self._rows = {}  # digest -> row number
+    self._map = None
+    self.dimension = None
+    if os.path.exists(self._meta_path):
+      with open(self._meta_path) as f:
+        self.dimension = json.load(f)["dimension"]
+      self._load()
+
+  def _load(self):
+    for path in (self._vectors_path, self._keys_path):
+      open(path, "ab").close()
+    row_bytes = self.dimension * FLOAT_SIZE
+    complete_rows = os.path.getsize(self._vectors_path) // row_bytes
+    with open(self._keys_path, "rb") as f:
+      keys = f.read()
+    for row in range(min(len(keys) // DIGEST_SIZE, complete_rows)):
+      self._rows[keys[row * DIGEST_SIZE:(row + 1) * DIGEST_SIZE]] = row
+    # Drop any torn tail so new rows line up with their keys again
+    with open(self._vectors_path, "r+b") as f:
+      f.truncate(len(self._rows) * row_bytes)
+    with open(self._keys_path, "r+b") as f:
+      f.truncate(len(self._rows) * DIGEST_SIZE)
+
+  def __len__(self) -> int:
+    return len(self._rows)
+
+  def _remap(self):
+    if self._map is not None:
+      self._map.close()
+    with open(self._vectors_path, "rb") as f:
+      self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+  def get(self, digest: bytes):
+    with self._lock:
+      row = self._rows.get(digest)
+      if row is None:
+        return None
+      row_bytes = self.dimension * FLOAT_SIZE
+      if self._map is None or (row + 1) * row_bytes > len(self._map):
+        self._remap()
+      vector = array("f")
+      vector.frombytes(self._map[row * row_bytes:(row + 1) * row_bytes])
+      return vector.tolist()
+
+  def put_many(self, items: list):
+    """Appends (digest, vector) pairs that are not stored yet."""
+    with self._lock:
+      if self.dimension is None and items:
+        self.dimension = len(items[0][1])
+        with open(self._meta_path, "w") as f:
+          json.dump({"dimension": self.dimension}, f)
+      new = [(digest, vector) for digest, vector in items if digest not in self._rows and len(vector) == self.dimension]
+      if not new:
+        return
+      with open(self._vectors_path, "ab") as vectors, open(self._keys_path, "ab") as keys:
+        for digest, vector in new:
+          vectors.write(array("f", vector).tobytes())
+        vectors.flush()
+        for digest, _ in new:
+          keys.write(digest)
+      for digest, _ in new:
+        self._rows[digest] = len(self._rows)
+
+class CachedEmbeddings(Embeddings):
+  """Wraps an Embeddings model with an LRU tier and an mmap-backed disk tier."""
+
+  def __init__(self, inner: Embeddings, model_name: str, cache_dir: str, max_entries: int = 10000):
+    self.inner = inner
+    self.max_entries = max_entries
+    self._lru = OrderedDict()
+    self._lock = threading.Lock()
+    model_dir = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    self.disk = DiskVectorStore(os.path.join(cache_dir, model_dir)) if cache_dir else None
+    self.memory_hits = self.disk_hits = self.misses = 0
+
+  def _remember(self, digest: bytes, vector: list):
+    with self._lock:
+      self._lru[digest] = vector
+      self._lru.move_to_end(digest)
+      while len(self._lru) > self.max_entries:
+        self._lru.popitem(last=False)
+
+  def _lookup(self, digest: bytes):
+    with self._lock:
+      vector = self._lru.get(digest)
+      if vector is not None:
+        self._lru.move_to_end(digest)
+        self.memory_hits += 1
+        return vector
+    vector = self.disk.get(digest) if self.disk is not None else None
+    if vector is not None:
+      self.disk_hits += 1
+      self._remember(digest, vector)
+    return vector
+
+  def embed_documents(self, texts: list[str]) -> list[list[float]]:
+    digests = [text_digest(text) for text in texts]
+    vectors = [self._lookup(digest) for digest in digests]
+    missing = {}  # digest -> text, so duplicates within one batch are embedded once
+    for digest, text, vector in zip(digests, texts, vectors):
+      if vector is None:
+        missing.setdefault(digest, text)
+    if missing:
+      self.misses += len(missing)
+      fresh = dict(zip(missing, self.inner.embed_documents(list(missing.values()))))
+      for digest, vector in fresh.items():
+        self._remember(digest, vector)
+      if self.disk is not None:
+        self.disk.put_many(list(fresh.items()))
+      vectors = [vector if vector is not None else fresh[digest] for digest, vector in zip(digests, vectors)]
+    return vectors
+
+  def embed_query(self, text: str) -> list[float]:
+    return self.embed_documents([text])[0]
+
+  def stats(self) -> dict:
+    lookups = self.memory_hits + self.disk_hits + self.misses
+    return {
+      "memory_entries": len(self._lru),
+      "disk_entries": len(self.disk) if self.disk is not None else 0,
+      "memory_hits": self.memory_hits,
+      "disk_hits": self.disk_hits,
+      "misses": self.misses,
+      "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+    }
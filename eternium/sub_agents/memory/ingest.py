@@ -0,0 +1,99 @@
+"""
+Bulk ingest for long-term memory.
+
+`add_to_memory` pays one embedding request and one Milvus insert per fact.
+Ingesting runbooks or inventories instead goes through `bulk_ingest`: texts are
+embedded in batches of `ingest_embed_batch_size`, then written to the vector
+store in batches of `ingest_insert_batch_size` together with their metadata.
+Documents are first split into overlapping chunks along paragraph and sentence
+boundaries.
+"""
+
+import re
+import time
+from config import settings
+
+_PARAGRAPHS = re.compile(r"\n\s*\n")
+_SENTENCES = re.compile(r"(?<=[.!?])\s+")
+
+def _pieces(text: str, max_chars: int):
+  """
+  Yields (separator, piece): whole paragraphs, with any paragraph longer than
+  max_chars split into sentences, then hard-wrapped.
+  """
+  for paragraph in _PARAGRAPHS.split(text):
+    paragraph = paragraph.strip()
+    if len(paragraph) <= max_chars:
+      if paragraph:
+        yield "\n\n", paragraph
+      continue
+    separator = "\n\n"
+    for sentence in _SENTENCES.split(paragraph):
+      for i in range(0, len(sentence), max_chars):
+        yield separator, sentence[i:i + max_chars]
+        separator = " "
+
+def chunk_text(text: str, max_chars: int = None, overlap: int = None) -> list:
+  """
+  Splits a document into chunks of at most max_chars characters, packing whole
+  paragraphs (or sentences) together. Each chunk after the first starts with
+  the last `overlap` characters of the previous one, so facts that straddle a
+  boundary stay findable.
+  """
+  max_chars = max_chars or settings.memory.ingest_chunk_chars
+  overlap = settings.memory.ingest_chunk_overlap if overlap is None else overlap
+  chunks, current = [], ""
+  for separator, piece in _pieces(text, max_chars):
+    if current and len(current) + len(separator) + len(piece) > max_chars:
+      chunks.append(current)
+      tail = current[-overlap:] if overlap else ""
+      current = tail[tail.find(" ") + 1:] if " " in tail else tail
+    current = f"{current}{separator}{piece}" if current else piece
+  if current:
+    chunks.append(current)
+  return chunks
+
+def _batches(items: list, size: int):
+  for start in range(0, len(items), size):
+    yield start, items[start:start + size]
+
+def bulk_ingest(vector_store, embeddings, texts: list, metadatas: list = None, progress=None, on_insert=None) -> dict:
+  """
+  Embeds and stores `texts` in batches and returns counts and throughput.
+  After every insert batch, `on_insert(ids, texts)` and `progress(done, total)` are called.
+  """
+  started = time.perf_counter()
+  received = len(texts)
+  texts = [text.strip() for text in texts]
+  metadatas = metadatas or [{} for _ in texts]
+  keep = [i for i, text in enumerate(texts) if text]
+  texts, metadatas = [texts[i] for i in keep], [metadatas[i] for i in keep]
+
+  embed_size = settings.memory.ingest_embed_batch_size
+  insert_size = settings.memory.ingest_insert_batch_size
+  ids, embed_seconds, insert_seconds = [], 0.0, 0.0
+  for start, batch in _batches(texts, insert_size):
+    t0 = time.perf_counter()
+    vectors = []
+    for _, sub_batch in _batches(batch, embed_size):
+      vectors.extend(embeddings.embed_documents(sub_batch))
+    t1 = time.perf_counter()
+    batch_ids = vector_store.add_embeddings(texts=batch, embeddings=vectors, metadatas=metadatas[start:start + len(batch)]) or []
+    t2 = time.perf_counter()
+    ids.extend(batch_ids)
+    if on_insert:
+      on_insert(batch_ids, batch)
+    embed_seconds += t1 - t0
+    insert_seconds += t2 - t1
+    if progress:
+      progress(start + len(batch), len(texts))
+
+  elapsed = time.perf_counter() - started
+  return {
+    "ingested": len(texts),
+    "skipped_empty": received - len(texts),
+    "ids": ids,
+    "embed_seconds": round(embed_seconds, 3),
+    "insert_seconds": round(insert_seconds, 3),
+    "facts_per_second": round(len(texts) / elapsed, 1) if elapsed else None
+  }
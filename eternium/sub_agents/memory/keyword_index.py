@@ -0,0 +1,85 @@
+"""
+Keyword side of hybrid memory retrieval.
+
+Embeddings are poor at exact identifiers: a query for '10.0.0.12' or
+'nginx:1.25.3' often misses the one note that contains it. KeywordIndex keeps a
+BM25-ranked SQLite FTS5 index of every memory next to the vector store, and
+`fuse` merges its ranking with the vector ranking by reciprocal rank fusion
+(score = sum over rankings of 1 / (rrf_k + rank)).
+
+Identifiers are indexed whole (hostnames, IPs, image references, paths) and
+also split into their word parts, so both 'node-3.lan' and 'node' match.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+
+_IDENTIFIER = re.compile(r"\w[\w.:/@-]*\w|\w")
+_WORD = re.compile(r"[^\W_]+")
+
+def tokens(text: str) -> list:
+  """Lower-cased identifiers plus their alphanumeric parts, in order."""
+  result = []
+  for identifier in _IDENTIFIER.findall(text.lower()):
+    parts = _WORD.findall(identifier)
+    if len(parts) > 1 or (parts and parts[0] != identifier):
+      result.append(identifier)
+    result.extend(parts)
+  return result
+
+class KeywordIndex:
+  """A thread-safe FTS5 index of memory texts keyed by vector store id."""
+
+  def __init__(self, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    self._lock = threading.Lock()
+    self._db = sqlite3.connect(path, check_same_thread=False)
+    self._db.execute(
+      "CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5("
+      "doc_id UNINDEXED, content UNINDEXED, terms, tokenize=\"unicode61 tokenchars '.:/@-_'\")"
+    )
+
+  def __len__(self) -> int:
+    with self._lock:
+      return self._db.execute("SELECT COUNT(*) FROM memory_fts").fetchone()[0]
+
+  def ids(self) -> set:
+    """Every indexed doc id, as strings."""
+    with self._lock:
+      return {row[0] for row in self._db.execute("SELECT DISTINCT doc_id FROM memory_fts")}
+
+  def add(self, ids: list, texts: list):
+    rows = [(str(doc_id), text, " ".join(tokens(text))) for doc_id, text in zip(ids, texts)]
+    with self._lock, self._db:
+      self._db.executemany("INSERT INTO memory_fts (doc_id, content, terms) VALUES (?, ?, ?)", rows)
+
+  def delete(self, ids: list):
+    with self._lock, self._db:
+      self._db.executemany("DELETE FROM memory_fts WHERE doc_id = ?", [(str(doc_id),) for doc_id in ids])
+
+  def search(self, query: str, k: int) -> list:
+    """Returns up to k (doc_id, content) pairs, best BM25 match first."""
+    terms = list(dict.fromkeys(tokens(query)))
+    if not terms:
+      return []
+    match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    with self._lock:
+      return self._db.execute(
+        "SELECT doc_id, content FROM memory_fts WHERE memory_fts MATCH ? ORDER BY bm25(memory_fts) LIMIT ?",
+        (match, k)
+      ).fetchall()
+
+def fuse(rankings: list, rrf_k: int = 60) -> list:
+  """
+  Reciprocal rank fusion of several rankings, each a list of doc ids best first.
+  Returns (doc_id, score) pairs, best first.
+  """
+  scores = {}
+  for ranking in rankings:
+    for rank, doc_id in enumerate(ranking, start=1):
+      scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+  return sorted(scores.items(), key=lambda item: item[1], reverse=True)
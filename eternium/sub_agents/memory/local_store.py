@@ -0,0 +1,280 @@
+"""
+Embedded vector store for the memory agent, for deployments without Milvus.
+
+Vectors live in a memory-mapped float32 matrix and are searched with one
+vectorised NumPy pass (squared L2 distance, like Milvus' default L2 metric, so
+MEMORY_THRESHOLD keeps its meaning). Above `local_ann_min_rows` an IVF index
+(k-means centroids, probe the nearest `local_ann_nprobe` lists) narrows the scan.
+
+Durability comes from a write-ahead log: a vector is written to the mapped file
+first, then a JSON line describing the add or delete is appended and fsynced.
+Every `local_checkpoint_every` log records the store is rewritten compacted as a
+new generation (vectors, snapshot and an empty log), and `CURRENT` is switched
+to it atomically, so a crash at any point recovers a consistent state.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from config import settings
+
+class IVFIndex:
+  """Inverted-file index over the first `indexed_rows` rows of a vector matrix."""
+
+  def __init__(self, vectors: np.ndarray, alive: np.ndarray, iterations: int = 10, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    rows = np.flatnonzero(alive)
+    self.indexed_rows = len(vectors)
+    nlist = max(1, int(np.sqrt(len(rows))))
+    sample = vectors[rng.choice(rows, size=min(len(rows), nlist * 64), replace=False)]
+    self.centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+      assignment = self._nearest(sample, 1)[:, 0]
+      for c in range(nlist):
+        members = sample[assignment == c]
+        if len(members):
+          self.centroids[c] = members.mean(axis=0)
+    assignment = np.concatenate([self._nearest(vectors[start:start + 8192], 1)[:, 0] for start in range(0, len(vectors), 8192)])
+    order = np.argsort(assignment, kind="stable")
+    bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+    self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+
+  def _nearest(self, vectors: np.ndarray, n: int) -> np.ndarray:
+    distances = (self.centroids ** 2).sum(axis=1)[None, :] - 2 * vectors @ self.centroids.T
+    n = min(n, len(self.centroids))
+    return np.argpartition(distances, n - 1, axis=1)[:, :n]
+
+  def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+    probes = self._nearest(query[None, :], nprobe)[0]
+    return np.concatenate([self.lists[c] for c in probes])
+
+class LocalVectorStore(VectorStore):
+  """A single-process, file-backed vector store with add / search / delete."""
+
+  def __init__(self, embedding, directory: str, ann_min_rows: int = None, nprobe: int = None, checkpoint_every: int = None):
+    self.embedding = embedding
+    self.directory = directory
+    self.ann_min_rows = ann_min_rows or settings.memory.local_ann_min_rows
+    self.nprobe = nprobe or settings.memory.local_ann_nprobe
+    self.checkpoint_every = checkpoint_every or settings.memory.local_checkpoint_every
+    self._lock = threading.RLock()
+    os.makedirs(directory, exist_ok=True)
+    self._load()
+
+  @property
+  def embeddings(self):
+    return self.embedding
+
+  # Files and recovery
+
+  def _path(self, name: str, generation: int = None) -> str:
+    generation = self.generation if generation is None else generation
+    return os.path.join(self.directory, f"{name}-{generation}")
+
+  def _load(self):
+    current = os.path.join(self.directory, "CURRENT")
+    self.generation = 0
+    if os.path.exists(current):
+      with open(current) as f:
+        self.generation = int(f.read())
+    snapshot = {}
+    if os.path.exists(self._path("snapshot.json")):
+      with open(self._path("snapshot.json")) as f:
+        snapshot = json.load(f)
+    self.dimension = snapshot.get("dimension")
+    self.next_id = snapshot.get("next_id", 1)
+    self.count = 0
+    self._docs = {}  # id -> (row, text, metadata)
+    self._vectors = None
+    self._index = None
+    if self.dimension:
+      self._open_vectors()
+    for doc_id, row, text, metadata in snapshot.get("docs", []):
+      self._docs[doc_id] = (row, text, metadata)
+    self.count = snapshot.get("count", 0)
+
+    self._wal_records = 0
+    if os.path.exists(self._path("wal.jsonl")):
+      with open(self._path("wal.jsonl")) as f:
+        for line in f:
+          try:
+            record = json.loads(line)
+          except json.JSONDecodeError:
+            break  # torn final line: the write it described never completed
+          self._apply(record)
+          self._wal_records += 1
+    self._wal = open(self._path("wal.jsonl"), "a")
+    self._refresh_derived()
+
+  def _apply(self, record: dict):
+    if record["op"] == "add":
+      if self.dimension is None:
+        self.dimension = record["dimension"]
+        self._open_vectors()
+      self._docs[record["id"]] = (record["row"], record["text"], record["metadata"])
+      self.count = max(self.count, record["row"] + 1)
+      self.next_id = max(self.next_id, record["id"] + 1)
+    elif record["op"] == "delete":
+      self._docs.pop(record["id"], None)
+
+  def _open_vectors(self, capacity: int = 0):
+    path = self._path("vectors.f32")
+    row_bytes = self.dimension * 4
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size < capacity * row_bytes or size == 0:
+      with open(path, "ab") as f:
+        f.truncate(max(capacity, 1024) * row_bytes)
+      size = os.path.getsize(path)
+    if self._vectors is not None:
+      self._vectors.flush()
+    self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(size // row_bytes, self.dimension))
+
+  def _refresh_derived(self):
+    """Recomputes the row -> id map, liveness mask and norms from the document table."""
+    self._row_ids = np.zeros(self.count, dtype=np.int64)
+    self._alive = np.zeros(self.count, dtype=bool)
+    for doc_id, (row, _, _) in self._docs.items():
+      self._row_ids[row], self._alive[row] = doc_id, True
+    self._norms = (np.asarray(self._vectors[:self.count]) ** 2).sum(axis=1) if self.count else np.zeros(0, dtype=np.float32)
+    if self._index is None and len(self._docs) >= self.ann_min_rows:
+      self._index = IVFIndex(np.asarray(self._vectors[:self.count]), self._alive)
+
+  def _log(self, records: list):
+    self._wal.write("".join(json.dumps(record) + "\n" for record in records))
+    self._wal.flush()
+    os.fsync(self._wal.fileno())
+    self._wal_records += len(records)
+    if self._wal_records >= self.checkpoint_every:
+      self.checkpoint()
+
+  def checkpoint(self):
+    """Writes a compacted generation (live rows only) and switches CURRENT to it."""
+    with self._lock:
+      old, new = self.generation, self.generation + 1
+      live = sorted(self._docs.items(), key=lambda item: item[1][0])
+      docs = []
+      if self.dimension:
+        rows = np.array([row for _, (row, _, _) in live], dtype=np.int64)
+        vectors = np.memmap(self._path("vectors.f32", new), dtype=np.float32, mode="w+", shape=(max(len(rows), 1024), self.dimension))
+        if len(rows):
+          vectors[:len(rows)] = self._vectors[rows]
+        vectors.flush()
+        del vectors
+        docs = [[doc_id, new_row, text, metadata] for new_row, (doc_id, (_, text, metadata)) in enumerate(live)]
+      snapshot = {"dimension": self.dimension, "next_id": self.next_id, "count": len(docs), "docs": docs}
+      with open(self._path("snapshot.json", new), "w") as f:
+        json.dump(snapshot, f)
+        f.flush()
+        os.fsync(f.fileno())
+      open(self._path("wal.jsonl", new), "w").close()
+      with open(os.path.join(self.directory, "CURRENT.tmp"), "w") as f:
+        f.write(str(new))
+        f.flush()
+        os.fsync(f.fileno())
+      os.replace(os.path.join(self.directory, "CURRENT.tmp"), os.path.join(self.directory, "CURRENT"))
+
+      self._wal.close()
+      self._vectors = None
+      self._load()
+      for name in ("vectors.f32", "snapshot.json", "wal.jsonl"):
+        if os.path.exists(self._path(name, old)):
+          os.remove(self._path(name, old))
+
+  def documents(self) -> list:
+    """All live (id, text) pairs, oldest first."""
+    with self._lock:
+      return [(doc_id, text) for doc_id, (_, text, _) in sorted(self._docs.items())]
+
+  # VectorStore interface
+
+  def add_texts(self, texts, metadatas: list = None, **kwargs) -> list:
+    texts = list(texts)
+    return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas)
+
+  def add_embeddings(self, texts: list, embeddings: list, metadatas: list = None, **kwargs) -> list:
+    if not texts:
+      return []
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    metadatas = metadatas or [{} for _ in texts]
+    with self._lock:
+      if self.dimension is None:
+        self.dimension = vectors.shape[1]
+        self._open_vectors()
+      if vectors.shape[1] != self.dimension:
+        raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's {self.dimension}")
+      start = self.count
+      if start + len(texts) > len(self._vectors):
+        self._open_vectors(capacity=2 * (start + len(texts)))
+      self._vectors[start:start + len(texts)] = vectors
+      self._vectors.flush()
+
+      ids = list(range(self.next_id, self.next_id + len(texts)))
+      records = [
+        {"op": "add", "id": doc_id, "row": start + i, "text": text, "metadata": metadata, "dimension": self.dimension}
+        for i, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas))
+      ]
+      for record in records:
+        self._apply(record)
+      self._row_ids = np.concatenate([self._row_ids, np.array(ids, dtype=np.int64)])
+      self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+      self._norms = np.concatenate([self._norms, (vectors ** 2).sum(axis=1)])
+      self._log(records)
+    return ids
+
+  def delete(self, ids: list = None, **kwargs) -> bool:
+    with self._lock:
+      found = [int(doc_id) for doc_id in ids or [] if int(doc_id) in self._docs]
+      if not found:
+        return False
+      for doc_id in found:
+        row = self._docs.pop(doc_id)[0]
+        self._alive[row] = False
+      self._log([{"op": "delete", "id": doc_id} for doc_id in found])
+    return True
+
+  def get_by_ids(self, ids, /) -> list:
+    with self._lock:
+      found = [(int(doc_id), self._docs.get(int(doc_id))) for doc_id in ids if str(doc_id).isdigit()]
+      return [Document(page_content=doc[1], metadata={**doc[2], "pk": doc_id}) for doc_id, doc in found if doc]
+
+  def similarity_search_by_vector_with_score(self, embedding: list, k: int = 4, **kwargs) -> list:
+    query = np.asarray(embedding, dtype=np.float32)
+    with self._lock:
+      if not self._docs:
+        return []
+      if self._index is not None:
+        # Rows added since the index was built are scanned directly
+        rows = np.concatenate([self._index.candidates(query, self.nprobe), np.arange(self._index.indexed_rows, self.count)])
+        rows = rows[self._alive[rows]]
+        distances = self._norms[rows] - 2 * (self._vectors[rows] @ query) + query @ query
+      else:
+        # A contiguous scan of the mapped matrix beats gathering the live rows first
+        rows = np.arange(self.count)
+        distances = self._norms - 2 * (self._vectors[:self.count] @ query) + query @ query
+        rows, distances = rows[self._alive], distances[self._alive]
+      k = min(k, len(rows))
+      if k == 0:
+        return []  # e.g. the probed IVF lists hold only deleted rows
+      best = np.argpartition(distances, k - 1)[:k]
+      best = best[np.argsort(distances[best])]
+      results = []
+      for i in best:
+        doc_id = int(self._row_ids[rows[i]])
+        _, text, metadata = self._docs[doc_id]
+        results.append((Document(page_content=text, metadata={**metadata, "pk": doc_id}), max(float(distances[i]), 0.0)))
+      return results
+
+  def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> list:
+    return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k)
+
+  def similarity_search(self, query: str, k: int = 4, **kwargs) -> list:
+    return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+  @classmethod
+  def from_texts(cls, texts, embedding, metadatas: list = None, directory: str = None, **kwargs):
+    store = cls(embedding, directory or settings.memory.local_store_dir, **kwargs)
+    store.add_texts(texts, metadatas)
+    return store
@@ -11,10 +11,11 @@ MEMORY_AGENT_INSTRUCTIONS = """
 2.  **Keyword Extraction:** For 'query' or 'delete' intents, your next step is to extract the essential keywords from the user's request. For example, if the request is "what did I say yesterday about the prowlarr deployment on kubernetes?", the extracted keywords should be "prowlarr deployment kubernetes".
 
 3.  **Tool Execution:**
-    * If the intent is to **'add'**, call the `add_to_memory` tool with the user's fact.
-    * If the intent is to **'query'** for context, call the `query_memory` tool using the **extracted keywords** as the `query` parameter, and set `include_metadata=False`.
+    * If the intent is to **'add'**, call the `add_to_memory` tool with the user's fact. If the user gives several facts at once, call `add_many_to_memory` once with all of them. If the user gives a whole document (a runbook, notes, a README), call `ingest_document` with its full text and a short `source` name.
+    * If the intent is to **'query'** for context, call the `query_memory` tool ONCE using the **extracted keywords** as the `query` parameter, and set `include_metadata=False`. Keep exact identifiers (hostnames, IPs, image tags) verbatim in the query. If you need more than the default 3 matches, pass a larger `k` instead of querying again.
     * If the intent is to **'delete'**, call the `query_memory` tool using the **extracted keywords** as the `query` parameter, and set `include_metadata=True`. This will return the necessary IDs for the user to confirm the deletion in a follow-up step.
     * If the user provides a specific ID to delete, call the `delete_memory_by_id` tool.
+    * If the user asks to clean up or de-duplicate memory, call `compact_memory` with `dry_run=True`, show the result, and only call it again with `dry_run=False` once the user confirms.
 
 **Output Requirements:**
 * You MUST return only the raw, unmodified, structured data from the tool.
@@ -1,24 +1,30 @@
 """Tools for interacting with a MySQL database as a DBA using SQLAlchemy."""
-import os
-import subprocess
-from datetime import datetime
-from sqlalchemy import create_engine, text
+import json
+import re
+from typing import Optional
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from google.adk import Agent
 from config import settings
+from ...executor import offload_all
+from ...tool_cache import RESULT_CACHE, cached, invalidates
 from . import prompt
+from .backups import BACKUP_JOBS, prune
+from .engines import ENGINES
+from .explain import plan_from_analyze, plan_from_json, suggest_indexes, table_aliases, top_statements
+from .results import read_only, run_capped
+from .schema import digest, load_schema
 
-# Setup the SQLAlchemy engine (global)
-DATABASE_URL = f"mysql+mysqlconnector://{settings.mysql.username}:{settings.mysql.password}@{settings.mysql.host}:{settings.mysql.port}"
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+_DDL = re.compile(r"^\s*(?:create|alter|drop|rename|truncate)\b", re.IGNORECASE)
 
 # --- Tool Functions ---
 
+@invalidates(("mysql", "db_name"))
 def create_database(db_name: str, **kwargs) -> dict:
   """Creates a new database (schema) in MySQL."""
   print(f"--- TOOL: Called create_database for '{db_name}' ---")
   try:
-    with engine.connect() as conn:
+    with ENGINES.get().connect() as conn:
       conn.execute(text(f"CREATE DATABASE `{db_name}`"))
     return {"status": "success", "message": f"Database '{db_name}' created successfully."}
   except SQLAlchemyError as e:
@@ -31,7 +37,7 @@ def manage_user(username: str, action: str, password: str, **kwargs) -> dict:
     return {"status": "error", "message": "Invalid action. Must be 'create' or 'drop'."}
 
   try:
-    with engine.connect() as conn:
+    with ENGINES.get().connect() as conn:
       if action.lower() == 'create':
         if not password:
           return {"status": "error", "message": "Password is required to create a user."}
@@ -49,7 +55,7 @@ def grant_privileges(username: str, db_name: str, privileges: str, **kwargs) ->
   """Grants specific privileges to a user on a database."""
   print(f"--- TOOL: Granting '{privileges}' on '{db_name}' to '{username}' ---")
   try:
-    with engine.connect() as conn:
+    with ENGINES.get().connect() as conn:
       conn.execute(text(f"GRANT {privileges} ON `{db_name}`.* TO '{username}'@'%'"))
       conn.execute(text("FLUSH PRIVILEGES"))
     return {"status": "success", "message": f"Privileges granted successfully."}
@@ -58,51 +64,139 @@ def grant_privileges(username: str, db_name: str, privileges: str, **kwargs) ->
 
 def backup_database(db_name: str, **kwargs) -> dict:
   """
-  Creates a backup of a specific database using mysqldump.
-  The backup is stored on a persistent volume at '/backups'.
+  Starts a compressed backup of a specific database using mysqldump, as a background job.
+  The backup is stored on a persistent volume at MYSQL_BACKUP_DIR ('/backups' by default).
+  Returns a job_id immediately; use get_backup_job to follow the backup.
   """
   print(f"--- ACTION TOOL: Called backup_database for '{db_name}' ---")
-  backup_dir = "/backups"
-  if not os.path.exists(backup_dir):
-    os.makedirs(backup_dir)
-
-  timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-  backup_file = f"{backup_dir}/{db_name}_{timestamp}.sql"
-
-  command = [
-    "mysqldump",
-    "-h", settings.mysql.host,
-    "-P", str(settings.mysql.port),
-    "-u", settings.mysql.username,
-    f"--password={settings.mysql.password}",
-    db_name
-  ]
+  job = BACKUP_JOBS.submit([db_name])
+  return {"status": "success", "job_id": job.id, "message": f"Backup of '{db_name}' started ({job.compression})."}
 
+def backup_databases(db_names: list[str], **kwargs) -> dict:
+  """
+  Starts compressed backups of several databases as ONE background job and returns its job_id.
+  Databases are dumped concurrently; a manifest with checksums is written when all are done.
+  """
+  print(f"--- ACTION TOOL: Called backup_databases for {len(db_names)} databases ---")
+  if not db_names:
+    return {"status": "error", "message": "No databases given."}
+  job = BACKUP_JOBS.submit(db_names)
+  return {"status": "success", "job_id": job.id, "message": f"Backups started for {len(job.items)} databases ({job.compression})."}
+
+def get_backup_job(job_id: str, wait_seconds: int = 0, **kwargs) -> dict:
+  """
+  Reports the progress of a backup job: bytes dumped and written, tables done, and each
+  database's file and SHA-256 checksum once finished, plus the manifest path.
+  Args:
+    job_id: The job id returned when the backup was started.
+    wait_seconds: How long to wait for the job to finish before reporting (0 reports immediately).
+  """
+  print(f"--- TOOL: Called get_backup_job for {job_id} (wait={wait_seconds}s) ---")
+  job = BACKUP_JOBS.get(job_id)
+  if job is None:
+    return {"error": f"Unknown backup job '{job_id}'."}
+  if wait_seconds:
+    job.done.wait(min(wait_seconds, settings.mysql.backup_wait_max_seconds))
+  return job.snapshot()
+
+def prune_backups(dry_run: Optional[bool] = True, **kwargs) -> dict:
+  """
+  Applies the backup retention policy: per database the newest backups are always kept and
+  older ones are deleted once past the retention period. Run with dry_run=True first.
+  """
+  print(f"--- ACTION TOOL: Called prune_backups (dry_run={dry_run}) ---")
   try:
-    with open(backup_file, "w") as f:
-      subprocess.run(command, stdout=f, stderr=subprocess.PIPE, text=True, check=True)
-    return {"status": "success", "message": f"Backup completed successfully. File saved to {backup_file}."}
-  except subprocess.CalledProcessError as e:
-    return {"status": "error", "message": "mysqldump failed.", "details": e.stderr}
-  except Exception as e:
+    removed = prune(settings.mysql.backup_dir, dry_run=dry_run is not False)
+  except OSError as e:
     return {"status": "error", "message": str(e)}
+  return {"status": "success", "dry_run": dry_run is not False, "removed": removed}
+
+@cached(ttl=settings.mysql.schema_cache_ttl_seconds, scope=("mysql", "db_name"))
+def _schema(db_name: str) -> dict:
+  try:
+    with ENGINES.get(db_name).connect() as conn:
+      return {"tables": load_schema(conn, db_name)}
+  except SQLAlchemyError as e:
+    return {"error": str(e.__cause__ or e)}
 
-def run_sql_query(query: str, db_name: str, **kwargs) -> list[dict]:
+def get_schema(db_name: str, tables: Optional[list[str]] = None, **kwargs) -> dict:
+  """
+  Returns a compact digest of a database's schema: every table with its approximate row count,
+  columns (type, PK, NULL, foreign key targets) and indexes, one line per table.
+  Use this before writing SQL instead of running SHOW TABLES or DESCRIBE through run_sql_query.
+  Args:
+    db_name: The database to describe.
+    tables: Optional table names to describe in full when the digest of the whole database is truncated.
+  """
+  print(f"--- TOOL: Called get_schema for '{db_name}' (tables={tables}) ---")
+  schema = _schema(db_name)
+  if "error" in schema:
+    return schema
+  return {"database": db_name, **digest(schema["tables"], settings.mysql.schema_digest_max_chars, tables)}
+
+def run_sql_query(query: str, db_name: str, max_rows: Optional[int] = None, auto_limit: Optional[bool] = True, **kwargs) -> dict:
   """
   Executes a raw SQL query against a specific database and returns the result.
   Handles both data retrieval (SELECT) and data modification (INSERT, UPDATE) queries.
+  Rows come back as {"columns": [...], "rows": [[...], ...]}, capped at max_rows and a byte budget;
+  "truncated" tells you whether more rows exist. Plain SELECTs get a LIMIT added unless auto_limit is False.
   """
   print(f"--- TOOL: Running SQL query on database '{db_name}': '{query[:100]}...' ---")
+  cap = settings.mysql.query_max_rows
   try:
-    db_url = f"{DATABASE_URL}/{db_name}"
-    db_engine = create_engine(db_url, pool_pre_ping=True)
+    # One pooled engine per database, reused across queries
+    with ENGINES.get(db_name).connect() as conn:
+      return run_capped(
+        conn, query,
+        max_rows=min(max_rows or cap, cap),
+        max_bytes=settings.mysql.query_max_bytes,
+        auto_limit=settings.mysql.query_auto_limit if auto_limit is None else auto_limit,
+        batch_rows=settings.mysql.query_batch_rows
+      )
+  except SQLAlchemyError as e:
+    return {"error": str(e.__cause__ or e)}
+  finally:
+    if _DDL.match(query):
+      # DDL can touch any database's schema (e.g. ALTER TABLE other_db.t), so drop every cached one
+      RESULT_CACHE.invalidate(("mysql",))
 
-    with db_engine.connect() as conn:
-      result = conn.execute(text(query))
-      if result.returns_rows:
-        return [dict(row) for row in result.mappings().all()] or []
+def explain_query(query: str, db_name: str, analyze: Optional[bool] = False, **kwargs) -> dict:
+  """
+  Explains why a query is slow. Returns its execution plan as a compact tree with the costliest
+  nodes marked '!!', the full table scans, and CREATE INDEX suggestions for filtered full scans.
+  By default the plan is estimated without running the query (EXPLAIN FORMAT=JSON).
+  With analyze=True the SELECT is actually executed (EXPLAIN ANALYZE) and real times and row counts are shown.
+  """
+  print(f"--- TOOL: Explaining query on database '{db_name}' (analyze={analyze}): '{query[:100]}...' ---")
+  statement = query.strip().rstrip(";")
+  if analyze and not read_only(statement):
+    return {"error": "EXPLAIN ANALYZE executes the statement; it is only allowed for read-only SELECT queries (a WITH must lead to a SELECT)."}
+  try:
+    with ENGINES.get(db_name).connect() as conn:
+      # exec_driver_sql: the statement is passed through as-is, without bind parameter parsing
+      if analyze:
+        summary = plan_from_analyze("\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN ANALYZE {statement}")))
       else:
-        return [{"status": "success", "rows_affected": result.rowcount}]
+        summary = plan_from_json(json.loads(conn.exec_driver_sql(f"EXPLAIN FORMAT=JSON {statement}").scalar()))
+  except (SQLAlchemyError, ValueError) as e:
+    return {"error": str(e.__cause__ or e)}
+
+  max_nodes = settings.mysql.explain_max_nodes
+  if len(summary["plan"]) > max_nodes:
+    summary["plan"] = summary["plan"][:max_nodes] + [f"... {len(summary['plan']) - max_nodes} more nodes"]
+  summary["index_suggestions"] = suggest_indexes(summary["full_scans"], table_aliases(statement), settings.mysql.explain_min_scan_rows)
+  return summary
+
+def get_top_statements(db_name: Optional[str] = None, limit: Optional[int] = 10, **kwargs) -> list:
+  """
+  Lists the statements that consumed the most total time on the server since statistics were last reset,
+  from performance_schema, with call counts, average and max latency, rows examined vs. sent, and flags such as
+  'no index used'. Optionally limited to one database. Use explain_query on a flagged statement to dig deeper.
+  """
+  print(f"--- TOOL: Called get_top_statements (db={db_name}, limit={limit}) ---")
+  try:
+    with ENGINES.get().connect() as conn:
+      return top_statements(conn, db_name, min(limit or 10, 50))
   except SQLAlchemyError as e:
     return [{"error": str(e.__cause__ or e)}]
 
@@ -112,11 +206,17 @@ def create_mysql_agent(llm) -> Agent:
     name="mysql_dba",
     model=llm,
     instruction=prompt.MYSQL_DBA_INSTRUCTIONS,
-    tools=[
+    tools=offload_all("mysql", [
       create_database,
       manage_user,
       grant_privileges,
       backup_database,
-      run_sql_query
-    ],
+      backup_databases,
+      get_backup_job,
+      prune_backups,
+      get_schema,
+      run_sql_query,
+      explain_query,
+      get_top_statements
+    ], timeouts={"get_backup_job": settings.mysql.backup_wait_max_seconds + 10}),
   )
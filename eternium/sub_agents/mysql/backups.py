@@ -0,0 +1,345 @@
+"""
+Background, compressed MySQL backups.
+
+A BackupJob dumps one or more databases on a pool of `backup_workers` threads.
+Each dump streams from mysqldump's stdout straight into the compressor (the
+zstd binary, or gzip from the standard library) and on to disk, so no
+uncompressed copy is ever written. While a dump runs, the job reports how
+many bytes were dumped and written and which tables are done.
+
+The output goes to a `.partial` file that is renamed only after mysqldump
+exits cleanly. When the job finishes, a manifest with sizes and SHA-256
+checksums is written next to the dumps, and old backups are pruned: per
+database, the newest `backup_keep_last` are always kept, and older ones go
+once they pass `backup_retention_days`.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from config import settings
+from .engines import ENGINES
+
+EXTENSIONS = {"zstd": ".sql.zst", "gzip": ".sql.gz", "none": ".sql"}
+_BACKUP_FILE = re.compile(r"^(?P<db>.+)_(?P<stamp>\d{8}_\d{6})\.sql(?:\.gz|\.zst)?$")
+_TABLE_MARKER = b"\n-- Table structure for table "
+
+def compression() -> str:
+  """The configured compression, falling back to gzip when the zstd binary is missing."""
+  method = settings.mysql.backup_compression
+  if method == "zstd" and not shutil.which("zstd"):
+    return "gzip"
+  return method if method in EXTENSIONS else "gzip"
+
+class _HashingFile:
+  """Write-only file wrapper that counts and hashes what goes through it."""
+
+  def __init__(self, path: str):
+    self._file = open(path, "wb")
+    self.sha256 = hashlib.sha256()
+    self.bytes = 0
+
+  def write(self, data) -> int:
+    self._file.write(data)
+    self.sha256.update(data)
+    self.bytes += len(data)
+    return len(data)
+
+  def flush(self):
+    self._file.flush()
+
+  def close(self):
+    self._file.close()
+
+class _ZstdWriter:
+  """Feeds a zstd process; a thread copies its output to the sink."""
+
+  def __init__(self, sink: _HashingFile, level: int):
+    self._process = subprocess.Popen(
+      ["zstd", "-q", "-c", f"-{level}"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    self._copier = threading.Thread(target=self._copy, args=(sink,), daemon=True)
+    self._copier.start()
+
+  def _copy(self, sink: _HashingFile):
+    for chunk in iter(lambda: self._process.stdout.read(settings.mysql.backup_chunk_bytes), b""):
+      sink.write(chunk)
+
+  def write(self, data: bytes):
+    self._process.stdin.write(data)
+
+  def close(self):
+    self._process.stdin.close()
+    self._copier.join()
+    if self._process.wait() != 0:
+      raise RuntimeError(f"zstd failed: {self._process.stderr.read().decode(errors='replace').strip()}")
+
+def _writer(method: str, sink: _HashingFile):
+  level = settings.mysql.backup_compression_level
+  if method == "zstd":
+    return _ZstdWriter(sink, level)
+  if method == "gzip":
+    return gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=min(max(level, 1), 9))
+  return sink
+
+class BackupItem:
+  """One database in a backup job and its progress."""
+
+  def __init__(self, db_name: str):
+    self.db_name = db_name
+    self.state = "Queued"
+    self.file = None
+    self.sha256 = None
+    self.dumped_bytes = 0
+    self.written_bytes = 0
+    self.tables_done = 0
+    self.tables_total = None
+    self.seconds = None
+    self.error = None
+
+  def as_dict(self) -> dict:
+    item = {
+      "database": self.db_name,
+      "state": self.state,
+      "dumped_bytes": self.dumped_bytes,
+      "written_bytes": self.written_bytes,
+      "tables": f"{self.tables_done}/{self.tables_total if self.tables_total is not None else '?'}"
+    }
+    if self.file:
+      item["file"] = self.file
+      item["sha256"] = self.sha256
+      item["seconds"] = self.seconds
+    if self.error:
+      item["error"] = self.error
+    return item
+
+class BackupJob:
+  def __init__(self, items: list, method: str):
+    self.id = uuid.uuid4().hex[:12]
+    self.items = items
+    self.compression = method
+    self.created_at = time.time()
+    self.finished_at = None
+    self.manifest = None
+    self.pruned = []
+    self.done = threading.Event()
+    self._remaining = len(items)
+    self._lock = threading.Lock()
+
+  def item_finished(self) -> bool:
+    """Returns True for the last item."""
+    with self._lock:
+      self._remaining -= 1
+      return self._remaining == 0
+
+  def snapshot(self) -> dict:
+    states = {}
+    for item in self.items:
+      states[item.state] = states.get(item.state, 0) + 1
+    finished = states.get("Success", 0) + states.get("Error", 0)
+    end = self.finished_at or time.time()
+    return {
+      "job_id": self.id,
+      "status": "completed" if self.done.is_set() else "running",
+      "progress": f"{finished}/{len(self.items)}",
+      "compression": self.compression,
+      "elapsed_seconds": round(end - self.created_at, 1),
+      "dumped_bytes": sum(item.dumped_bytes for item in self.items),
+      "written_bytes": sum(item.written_bytes for item in self.items),
+      "by_state": states,
+      "manifest": self.manifest,
+      "pruned": self.pruned,
+      "items": [item.as_dict() for item in self.items]
+    }
+
+def _count_tables(db_name: str):
+  try:
+    with ENGINES.get().connect() as conn:
+      return conn.execute(
+        text("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = :db AND table_type = 'BASE TABLE'"), {"db": db_name}
+      ).scalar()
+  except Exception:
+    return None  # progress is then reported without a total
+
+def prune(backup_dir: str, keep_last: int = None, retention_days: int = None, dry_run: bool = False) -> list:
+  """Deletes backups beyond the retention policy and manifests left without files; returns the removed names."""
+  keep_last = settings.mysql.backup_keep_last if keep_last is None else keep_last
+  retention_days = settings.mysql.backup_retention_days if retention_days is None else retention_days
+  cutoff = datetime.now() - timedelta(days=retention_days)
+  if not os.path.isdir(backup_dir):
+    return []
+
+  by_database = {}
+  for name in os.listdir(backup_dir):
+    match = _BACKUP_FILE.match(name)
+    if match:
+      by_database.setdefault(match["db"], []).append((match["stamp"], name))
+  removed = []
+  for backups in by_database.values():
+    for stamp, name in sorted(backups, reverse=True)[keep_last:]:
+      if datetime.strptime(stamp, "%Y%m%d_%H%M%S") < cutoff:
+        removed.append(name)
+
+  remaining = set(os.listdir(backup_dir)) - set(removed)
+  for name in sorted(remaining):
+    if not name.endswith(".manifest.json"):
+      continue
+    try:
+      with open(os.path.join(backup_dir, name)) as f:
+        files = [entry["file"] for entry in json.load(f).get("backups", [])]
+    except (OSError, ValueError, KeyError):
+      continue
+    if not any(os.path.basename(path) in remaining for path in files):
+      removed.append(name)
+
+  if not dry_run:
+    for name in removed:
+      try:
+        os.remove(os.path.join(backup_dir, name))
+      except FileNotFoundError:
+        pass
+  return removed
+
+class BackupJobTracker:
+  """Runs dumps on a bounded pool and keeps the most recent jobs."""
+
+  def __init__(self):
+    self._pool = ThreadPoolExecutor(max_workers=settings.mysql.backup_workers, thread_name_prefix="mysql-backup")
+    self._jobs = {}  # job id -> BackupJob, oldest first
+    self._lock = threading.Lock()
+
+  @property
+  def backup_dir(self) -> str:
+    return settings.mysql.backup_dir
+
+  def submit(self, db_names: list) -> BackupJob:
+    job = BackupJob([BackupItem(name) for name in dict.fromkeys(db_names)], compression())
+    with self._lock:
+      self._jobs[job.id] = job
+      while len(self._jobs) > settings.mysql.backup_jobs_retained:
+        self._jobs.pop(next(iter(self._jobs)))
+    if not job.items:
+      job.finished_at = time.time()
+      job.done.set()
+    for item in job.items:
+      self._pool.submit(self._run, job, item)
+    return job
+
+  def get(self, job_id: str):
+    with self._lock:
+      return self._jobs.get(job_id)
+
+  def _run(self, job: BackupJob, item: BackupItem):
+    try:
+      self._dump(job, item)
+      item.state = "Success"
+    except Exception as e:
+      item.state, item.error = "Error", str(e)
+    finally:
+      if job.item_finished():
+        self._finish(job)
+
+  def _dump(self, job: BackupJob, item: BackupItem):
+    os.makedirs(self.backup_dir, exist_ok=True)
+    item.state = "Running"
+    item.tables_total = _count_tables(item.db_name)
+    started = time.monotonic()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(self.backup_dir, f"{item.db_name}_{timestamp}{EXTENSIONS[job.compression]}")
+    partial = path + ".partial"
+
+    command = [
+      "mysqldump",
+      "-h", settings.mysql.host,
+      "-P", str(settings.mysql.port),
+      "-u", settings.mysql.username,
+      f"--password={settings.mysql.password}",
+      "--single-transaction",
+      "--quick",
+      item.db_name
+    ]
+    sink = _HashingFile(partial)
+    writer = None
+    try:
+      writer = _writer(job.compression, sink)
+      with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as dump:
+        # Drain stderr concurrently so a chatty mysqldump cannot block on a full pipe
+        errors = []
+        reader = threading.Thread(target=lambda: errors.append(dump.stderr.read()), daemon=True)
+        reader.start()
+        tail = b""
+        for chunk in iter(lambda: dump.stdout.read(settings.mysql.backup_chunk_bytes), b""):
+          writer.write(chunk)
+          item.dumped_bytes += len(chunk)
+          item.written_bytes = sink.bytes
+          window = tail + chunk
+          item.tables_done += window.count(_TABLE_MARKER)
+          tail = window[-(len(_TABLE_MARKER) - 1):]
+        reader.join()
+        if dump.wait() != 0:
+          raise RuntimeError(f"mysqldump failed: {b''.join(errors).decode(errors='replace').strip()}")
+      writer, finishing = None, writer
+      if finishing is not sink:
+        finishing.close()
+      sink.close()
+      os.replace(partial, path)
+    except BaseException:
+      if writer is not None and writer is not sink:
+        try:
+          writer.close()
+        except Exception:
+          pass
+      sink.close()
+      if os.path.exists(partial):
+        os.remove(partial)
+      raise
+    item.file, item.sha256 = path, sink.sha256.hexdigest()
+    item.written_bytes = sink.bytes
+    item.tables_done = item.tables_total if item.tables_total is not None else item.tables_done
+    item.seconds = round(time.monotonic() - started, 1)
+
+  def _finish(self, job: BackupJob):
+    successful = [item for item in job.items if item.state == "Success"]
+    try:
+      if successful:
+        manifest = {
+          "job_id": job.id,
+          "created_at": datetime.fromtimestamp(job.created_at).isoformat(timespec="seconds"),
+          "compression": job.compression,
+          "backups": [
+            {
+              "database": item.db_name,
+              "file": os.path.basename(item.file),
+              "sha256": item.sha256,
+              "dumped_bytes": item.dumped_bytes,
+              "written_bytes": item.written_bytes,
+              "tables": item.tables_done,
+              "seconds": item.seconds
+            }
+            for item in successful
+          ],
+          "failed": {item.db_name: item.error for item in job.items if item.state == "Error"}
+        }
+        stamp = datetime.fromtimestamp(job.created_at).strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.backup_dir, f"backup_{stamp}_{job.id}.manifest.json")
+        with open(path, "w") as f:
+          json.dump(manifest, f, indent=2)
+        job.manifest = path
+      job.pruned = prune(self.backup_dir)
+    except OSError as e:
+      job.pruned = [f"pruning failed: {e}"]
+    finally:
+      job.finished_at = time.time()
+      job.done.set()
+
+BACKUP_JOBS = BackupJobTracker()
@@ -0,0 +1,115 @@
+"""
+Bounded registry of per-database SQLAlchemy engines.
+
+Each engine owns a connection pool, so creating one per query pays a TCP
+connect and authentication every time and leaks the pool afterwards. The
+registry keeps one engine per database, least recently used first, capped at
+`max_engines`. Engines idle for longer than `engine_idle_seconds` and engines
+pushed out of the LRU are disposed, closing their pooled connections.
+"""
+
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from config import settings
+
+def database_url(db_name: str = None) -> URL:
+  """Server URL, or a database URL when db_name is given. Credentials are escaped by SQLAlchemy."""
+  return URL.create(
+    "mysql+mysqlconnector",
+    username=settings.mysql.username,
+    password=settings.mysql.password,
+    host=settings.mysql.host,
+    port=settings.mysql.port,
+    database=db_name or None
+  )
+
+class EngineRegistry:
+  """Thread-safe LRU of engines keyed by database name (None for the server-level engine)."""
+
+  def __init__(self, url_for=database_url, max_engines: int = None, idle_seconds: int = None, **engine_options):
+    self.url_for = url_for
+    self.max_engines = max_engines or settings.mysql.max_engines
+    self.idle_seconds = idle_seconds or settings.mysql.engine_idle_seconds
+    self.engine_options = engine_options or {
+      "pool_size": settings.mysql.pool_size,
+      "max_overflow": settings.mysql.max_overflow,
+      "pool_recycle": settings.mysql.pool_recycle_seconds,
+      "pool_timeout": settings.mysql.pool_timeout_seconds,
+      "pool_pre_ping": True
+    }
+    self._lock = threading.Lock()
+    self._engines = OrderedDict()  # db name -> (engine, last used)
+    self.created = self.reused = self.evicted = self.expired = 0
+
+  def get(self, db_name: str = None):
+    """Returns the engine for db_name, creating it if needed."""
+    now = time.monotonic()
+    disposable = []
+    with self._lock:
+      disposable.extend(self._expire(now))
+      entry = self._engines.get(db_name)
+      if entry:
+        engine = entry[0]
+        self.reused += 1
+      else:
+        engine = create_engine(self.url_for(db_name), **self.engine_options)
+        self.created += 1
+      self._engines[db_name] = (engine, now)
+      self._engines.move_to_end(db_name)
+      while len(self._engines) > self.max_engines:
+        _, (old, _) = self._engines.popitem(last=False)
+        disposable.append(old)
+        self.evicted += 1
+    # Disposing closes sockets; do it outside the lock
+    for old in disposable:
+      old.dispose()
+    return engine
+
+  def _expire(self, now: float) -> list:
+    idle = [name for name, (_, last_used) in self._engines.items() if now - last_used > self.idle_seconds]
+    self.expired += len(idle)
+    return [self._engines.pop(name)[0] for name in idle]
+
+  def dispose(self, db_name: str = None):
+    """Disposes one database's engine, e.g. after the database was dropped."""
+    with self._lock:
+      entry = self._engines.pop(db_name, None)
+    if entry:
+      entry[0].dispose()
+
+  def dispose_all(self):
+    with self._lock:
+      engines = [engine for engine, _ in self._engines.values()]
+      self._engines.clear()
+    for engine in engines:
+      engine.dispose()
+
+  def stats(self) -> dict:
+    now = time.monotonic()
+    with self._lock:
+      pools = {
+        name or "(server)": {
+          "size": engine.pool.size(),
+          "checked_out": engine.pool.checkedout(),
+          "checked_in": engine.pool.checkedin(),
+          "overflow": engine.pool.overflow(),
+          "idle_seconds": round(now - last_used, 1)
+        }
+        for name, (engine, last_used) in self._engines.items()
+      }
+      return {
+        "engines": len(self._engines),
+        "max_engines": self.max_engines,
+        "created": self.created,
+        "reused": self.reused,
+        "evicted": self.evicted,
+        "expired": self.expired,
+        "pools": pools
+      }
+
+ENGINES = EngineRegistry()
+atexit.register(ENGINES.dispose_all)
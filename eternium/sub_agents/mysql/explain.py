@@ -0,0 +1,276 @@
+"""
+Query plan analysis for the MySQL agent.
+
+`plan_from_json` walks the output of EXPLAIN FORMAT=JSON, which estimates without
+running the query. `plan_from_analyze` parses the tree that EXPLAIN ANALYZE prints
+after actually running it. Both return a compact indented tree of plan nodes. The
+costliest nodes are marked: by estimated cost for JSON plans, and by measured
+self time for EXPLAIN ANALYZE. Both also list the full scans.
+
+`suggest_indexes` turns each filtered full scan into a candidate index. The
+candidate puts the columns compared with `=` / IN first and one range column
+last, read from the condition attached to the scan.
+
+`top_statements` ranks performance_schema's statement digests by total latency.
+"""
+
+import re
+from sqlalchemy import text
+
+_OPERATIONS = {
+  "nested_loop": "nested loop",
+  "ordering_operation": "sort",
+  "grouping_operation": "group",
+  "duplicates_removal": "distinct",
+  "windowing": "window",
+  "union_result": "union",
+  "materialized_from_subquery": "materialized subquery",
+  "attached_subqueries": "subquery",
+  "optimized_away_subqueries": "subquery (optimized away)"
+}
+_KEYWORDS = {"where", "on", "using", "join", "inner", "left", "right", "cross", "straight_join", "natural",
+             "group", "order", "limit", "having", "union", "window", "for", "lock", "as", "set", "force", "ignore", "use"}
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+`?([\w$]+)`?(?:\s*\.\s*`?([\w$]+)`?)?(?:\s+(?:as\s+)?`?([\w$]+)`?)?", re.IGNORECASE)
+_ANALYZE_LINE = re.compile(
+  r"^(?P<indent>\s*)-> (?P<op>.*?)"
+  r"(?:\s+\(cost=(?P<cost>[\d.e+]+)(?:\.\.[\d.e+]+)? rows=(?P<rows>[\d.e+]+)\))?"
+  r"(?:\s+\(actual time=(?P<first>[\d.]+)\.\.(?P<last>[\d.]+) rows=(?P<actual_rows>[\d.e+]+) loops=(?P<loops>\d+)\)"
+  r"|\s+\((?P<never>never executed)\))?\s*$"
+)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_QUALIFIED = re.compile(r"[\w$]+(?:\.[\w$]+)+")
+
+def _float(value) -> float:
+  try:
+    return float(value)
+  except (TypeError, ValueError):
+    return 0.0
+
+def _count(value) -> str:
+  value = _float(value)
+  for limit, suffix in ((1e9, "G"), (1e6, "M"), (1e3, "k")):
+    if value >= limit:
+      return f"{value / limit:.3g}{suffix}"
+  return f"{value:.3g}"
+
+def table_aliases(query: str) -> dict:
+  """Maps the aliases used in a query to table names (best effort; unaliased tables map to themselves)."""
+  aliases = {}
+  for first, second, alias in _TABLE_REF.findall(_STRING.sub("''", query)):
+    table = second or first
+    if alias and alias.lower() not in _KEYWORDS:
+      aliases[alias] = table
+    aliases.setdefault(table, table)
+  return aliases
+
+def _table_node(node: dict, depth: int) -> dict:
+  cost = node.get("cost_info") or {}
+  return {
+    "depth": depth,
+    "table": node.get("table_name"),
+    "access": node.get("access_type"),
+    "key": node.get("key"),
+    "possible_keys": node.get("possible_keys"),
+    "rows": _float(node.get("rows_examined_per_scan")),
+    "filtered": _float(node.get("filtered") or 100),
+    "cost": round(_float(cost.get("read_cost")) + _float(cost.get("eval_cost")), 2),
+    "condition": node.get("attached_condition"),
+    "covering": bool(node.get("using_index"))
+  }
+
+def _walk(node, depth: int, out: list):
+  if isinstance(node, list):
+    for child in node:
+      _walk(child, depth, out)
+    return
+  if not isinstance(node, dict):
+    return
+  if "table_name" in node and "access_type" in node:
+    out.append(_table_node(node, depth))
+    for key, value in node.items():
+      if key in _OPERATIONS:
+        out.append({"depth": depth + 1, "op": _OPERATIONS[key]})
+        _walk(value, depth + 2, out)
+    return
+  for key, value in node.items():
+    if key in _OPERATIONS:
+      flags = [flag for flag in ("using_filesort", "using_temporary_table") if isinstance(value, dict) and value.get(flag)]
+      out.append({"depth": depth, "op": _OPERATIONS[key] + (f" ({', '.join(flags)})" if flags else "")})
+      _walk(value, depth + 1, out)
+    elif isinstance(value, (dict, list)):
+      _walk(value, depth, out)
+
+def _render_table(node: dict) -> str:
+  parts = [f"[{node['access']}] {node['table']}"]
+  if node["key"]:
+    parts.append(f"key={node['key']}")
+  parts.append(f"rows={_count(node['rows'])}")
+  if node["filtered"] < 100:
+    parts.append(f"filtered={node['filtered']:g}%")
+  parts.append(f"cost={node['cost']:g}")
+  if node["covering"]:
+    parts.append("covering")
+  if node["condition"]:
+    parts.append(f"where {node['condition'][:160]}")
+  return " ".join(parts)
+
+def plan_from_json(plan: dict, top: int = 3) -> dict:
+  """Summarizes an EXPLAIN FORMAT=JSON document."""
+  nodes = []
+  _walk(plan.get("query_block", plan), 0, nodes)
+  tables = [node for node in nodes if "table" in node]
+  costliest = sorted((node for node in tables if node["cost"] > 0), key=lambda node: node["cost"], reverse=True)[:top]
+  lines = []
+  for node in nodes:
+    line = node["op"] if "op" in node else _render_table(node)
+    if any(node is hot for hot in costliest):
+      line = "!! " + line
+    lines.append("  " * node["depth"] + line)
+  return {
+    "total_cost": _float((plan.get("query_block", {}).get("cost_info") or {}).get("query_cost")),
+    "plan": lines,
+    "costliest": [_render_table(node) for node in costliest],
+    "full_scans": [
+      {"table": node["table"], "rows": node["rows"], "condition": node["condition"]}
+      for node in tables if node["access"] in ("ALL", "index") and not node["covering"]
+    ]
+  }
+
+def plan_from_analyze(tree: str, top: int = 3) -> dict:
+  """Summarizes the text tree printed by EXPLAIN ANALYZE; times are in milliseconds."""
+  nodes = []
+  for raw in tree.splitlines():
+    match = _ANALYZE_LINE.match(raw)
+    if not match:
+      continue
+    loops = int(match["loops"] or 0)
+    nodes.append({
+      "depth": len(match["indent"]) // 4,
+      "op": match["op"],
+      "estimated_rows": _float(match["rows"]) if match["rows"] else None,
+      "rows": _float(match["actual_rows"]) * loops,
+      "total_ms": _float(match["last"]) * loops,
+      "executed": not match["never"]
+    })
+
+  # Self time: a node's total minus its direct children's totals
+  for index, node in enumerate(nodes):
+    children = 0.0
+    for child in nodes[index + 1:]:
+      if child["depth"] <= node["depth"]:
+        break
+      if child["depth"] == node["depth"] + 1:
+        children += child["total_ms"]
+    node["self_ms"] = max(node["total_ms"] - children, 0.0)
+
+  costliest = sorted((node for node in nodes if node["self_ms"] > 0), key=lambda node: node["self_ms"], reverse=True)[:top]
+  lines, full_scans = [], []
+  for index, node in enumerate(nodes):
+    stats = f"{node['total_ms']:.2f} ms, rows={_count(node['rows'])}" if node["executed"] else "never executed"
+    if node["executed"] and node["estimated_rows"] is not None:
+      stats += f" (est {_count(node['estimated_rows'])})"
+    lines.append("  " * node["depth"] + ("!! " if any(node is hot for hot in costliest) else "") + f"{node['op'][:160]} [{stats}]")
+    scan = re.match(r"(?:Table scan|Index scan) on (\S+)", node["op"])
+    if scan:
+      # The filter or join condition for a scan sits on its ancestors
+      conditions, depth = [], node["depth"]
+      for parent in reversed(nodes[:index]):
+        if parent["depth"] < depth:
+          depth = parent["depth"]
+          if re.match(r"Filter:|.*join\b.*\(", parent["op"], re.IGNORECASE):
+            conditions.append(parent["op"])
+          if len(conditions) == 2 or depth == 0:
+            break
+      full_scans.append({"table": scan.group(1), "rows": node["rows"], "condition": " AND ".join(conditions) or None})
+  return {
+    "total_ms": round(nodes[0]["total_ms"], 3) if nodes else None,
+    "plan": lines,
+    "costliest": [f"{node['op'][:160]} (self {node['self_ms']:.2f} ms)" for node in costliest],
+    "full_scans": full_scans
+  }
+
+def index_columns(alias: str, condition: str) -> list:
+  """Columns of `alias` in a condition: equality / IN columns first, then at most one range column."""
+  if not condition:
+    return []
+  clean = _STRING.sub("?", condition.replace("`", ""))
+  equality, ranged = [], []
+  for match in _QUALIFIED.finditer(clean):
+    parts = match.group(0).split(".")
+    if len(parts) < 2 or parts[-2] != alias:
+      continue
+    column = parts[-1]
+    after, before = clean[match.end():].lstrip(), clean[:match.start()].rstrip()
+    is_equality = (
+      after.startswith("=") or re.match(r"in\s*\(", after, re.IGNORECASE)
+      or (before.endswith("=") and not before.endswith(("<=", ">=", "!=")))
+    )
+    target = equality if is_equality else ranged
+    if column not in equality and column not in ranged:
+      target.append(column)
+  return equality + ranged[:1]
+
+def suggest_indexes(full_scans: list, aliases: dict, min_rows: int = 1000) -> list:
+  """CREATE INDEX suggestions for filtered full scans over at least min_rows rows."""
+  suggestions, seen = [], set()
+  for scan in full_scans:
+    if scan["rows"] and scan["rows"] < min_rows:
+      continue
+    columns = index_columns(scan["table"], scan["condition"])
+    if not columns:
+      continue
+    table = aliases.get(scan["table"], scan["table"])
+    if (table, tuple(columns)) in seen:
+      continue
+    seen.add((table, tuple(columns)))
+    name = f"ix_{table}_{'_'.join(columns)}"[:64]
+    suggestions.append({
+      "table": table,
+      "columns": columns,
+      "statement": f"CREATE INDEX `{name}` ON `{table}` ({', '.join(f'`{column}`' for column in columns)})",
+      "reason": f"full scan of ~{_count(scan['rows'])} rows filtered on {', '.join(columns)}"
+    })
+  return suggestions
+
+_TOP_STATEMENTS = text("""
+  SELECT SCHEMA_NAME AS schema_name, DIGEST_TEXT AS digest_text, COUNT_STAR AS calls,
+         SUM_TIMER_WAIT AS total_wait, AVG_TIMER_WAIT AS avg_wait, MAX_TIMER_WAIT AS max_wait,
+         SUM_ROWS_EXAMINED AS rows_examined, SUM_ROWS_SENT AS rows_sent,
+         SUM_NO_INDEX_USED AS no_index_used, SUM_CREATED_TMP_DISK_TABLES AS tmp_disk_tables,
+         SUM_SORT_MERGE_PASSES AS sort_merge_passes
+  FROM performance_schema.events_statements_summary_by_digest
+  WHERE DIGEST_TEXT IS NOT NULL AND (:db IS NULL OR SCHEMA_NAME = :db)
+  ORDER BY SUM_TIMER_WAIT DESC
+  LIMIT :limit
+""")
+
+def _ms_from_picoseconds(value) -> float:
+  return round(_float(value) / 1e9, 3)
+
+def top_statements(conn, db_name: str = None, limit: int = 10) -> list:
+  """Statement digests ranked by total latency, with the signs of a missing index flagged."""
+  statements = []
+  for row in conn.execute(_TOP_STATEMENTS, {"db": db_name, "limit": limit}).mappings():
+    calls = int(row["calls"] or 0)
+    examined, sent = int(row["rows_examined"] or 0), int(row["rows_sent"] or 0)
+    flags = []
+    if row["no_index_used"]:
+      flags.append(f"no index used in {int(row['no_index_used'])}/{calls} calls")
+    if sent and examined / sent >= 100:
+      flags.append(f"examines {examined // sent} rows per row returned")
+    if row["tmp_disk_tables"]:
+      flags.append("temporary tables on disk")
+    if row["sort_merge_passes"]:
+      flags.append("sort spills to disk")
+    statements.append({
+      "database": row["schema_name"],
+      "statement": (row["digest_text"] or "")[:300],
+      "calls": calls,
+      "total_ms": _ms_from_picoseconds(row["total_wait"]),
+      "avg_ms": _ms_from_picoseconds(row["avg_wait"]),
+      "max_ms": _ms_from_picoseconds(row["max_wait"]),
+      "rows_examined": examined,
+      "rows_sent": sent,
+      "flags": flags
+    })
+  return statements
@@ -9,8 +9,16 @@ MYSQL_DBA_INSTRUCTIONS = """
 * Use `create_database` to create new schemas.
 * Use `manage_user` with `action='create'` or `action='drop'` for user administration.
 * Use `grant_privileges` to assign permissions to users for a specific database.
-* Use `backup_database` to perform backups. NOTE: This is an action that saves a file to a persistent volume.
+* Use `backup_database` (one database) or `backup_databases` (several at once) to perform backups. NOTE: These are actions that save compressed files to a persistent volume.
+  They return a `job_id` immediately; use `get_backup_job` (optionally with `wait_seconds`) to report progress, files and checksums.
+* Use `prune_backups` to apply the retention policy to old backups. Run it with `dry_run=True` first and show the user what would be removed.
+* Use `get_schema` to learn a database's tables, columns, keys and indexes before writing SQL. It is cached, so call it freely instead of running `SHOW TABLES` or `DESCRIBE`.
+* Use `explain_query` when asked why a query is slow: it returns the plan with the costliest steps marked `!!`, full table scans and index suggestions. Only use `analyze=True` (which runs the query) for SELECTs that are safe to execute.
+* Use `get_top_statements` to find which statements use the most server time, then `explain_query` on the worst ones.
+  Present index suggestions as recommendations; never create indexes without the user's confirmation.
 * Use `run_sql_query` to execute any raw SQL queries to read or modify data within a specific database.
+  Results are columnar (`columns` once, `rows` as arrays) and capped; if `truncated` is true, do not guess the missing rows.
+  Prefer `COUNT(*)`, aggregates, `WHERE` filters and explicit columns over `SELECT *` on large tables.
 
 **Instructions:**
 1.  Analyze the user's request to understand the exact DBA task required.
@@ -0,0 +1,141 @@
+"""
+Row- and byte-capped execution of ad hoc SQL for run_sql_query.
+
+Results are read incrementally (`stream_results` / `yield_per`) and copied into
+a compact columnar shape: column names once, each row as a list. Reading
+stops at `max_rows` rows or `max_bytes` of JSON-encoded row data, whichever
+comes first, and the response says which budget was hit.
+
+A read-only statement (`read_only`: a SELECT, or a WITH whose main statement
+is a SELECT) without a trailing LIMIT gets `LIMIT max_rows + 1` appended,
+so the server never sends more than one row beyond the budget; the extra row
+only tells us the result was truncated. Statements where appending is unsafe
+(comments, several statements, locking reads, SELECT ... INTO) run unchanged
+and rely on the row and byte budget alone.
+"""
+
+import re
+import time
+from datetime import date, datetime, time as dtime
+import orjson
+from sqlalchemy import text
+
+_TOKEN = re.compile(
+  r"--[^\n]*|#[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`(?:[^`]|``)*`|[()]|\w+",
+  re.DOTALL
+)
+_WRITES = {"insert", "update", "delete", "replace"}
+_HAS_LIMIT = re.compile(r"\blimit\s+\d+(?:\s*(?:,|offset)\s*\d+)?\s*$", re.IGNORECASE)
+_UNSAFE = re.compile(r"--|#|/\*|;|\bfor\s+(?:update|share)\b|\block\s+in\s+share\s+mode\b|\binto\b", re.IGNORECASE)
+
+def read_only(statement: str) -> bool:
+  """
+  True for a SELECT, or a WITH whose main statement is a SELECT. A WITH list can
+  also lead an UPDATE or DELETE, so no write verb may appear outside parentheses
+  (a function such as REPLACE(...) is not a verb). Quoted text and comments are
+  skipped; MySQL's executable /*! ... */ comments are refused outright.
+  """
+  if "/*!" in statement:
+    return False
+  words, depth, previous = [], 0, None
+  for token in _TOKEN.findall(statement):
+    if token == "(":
+      if previous in _WRITES and words and words[-1][1] == previous:
+        words.pop()  # a function call, e.g. REPLACE(name, 'a', 'b')
+      depth += 1
+    elif token == ")":
+      depth -= 1
+    elif token[0].isalnum() or token[0] == "_":
+      words.append((depth, token.lower()))
+    previous = token.lower()
+  if not words or words[0][1] not in ("select", "with"):
+    return False
+  return not any(
+    depth == 0 and word in _WRITES and not (word == "update" and i and words[i - 1][1] == "for")
+    for i, (depth, word) in enumerate(words)
+  )
+
+def with_limit(query: str, limit: int) -> tuple:
+  """Returns (statement, applied limit or None)."""
+  statement = query.strip().rstrip(";").rstrip()
+  if not read_only(statement) or _HAS_LIMIT.search(statement) or _UNSAFE.search(statement):
+    return query, None
+  return f"{statement} LIMIT {limit}", limit
+
+def _cell(value):
+  """Makes a column value JSON-safe without losing precision."""
+  if value is None or isinstance(value, (str, int, float, bool)):
+    return value
+  if isinstance(value, (datetime, date, dtime)):
+    return value.isoformat()
+  if isinstance(value, (bytes, bytearray)):
+    try:
+      return bytes(value).decode("utf-8")
+    except UnicodeDecodeError:
+      return "0x" + bytes(value).hex()
+  if isinstance(value, set):
+    return sorted(value)
+  return str(value)  # Decimal, timedelta and driver-specific types
+
+def _ms(seconds: float) -> float:
+  return round(seconds * 1000, 1)
+
+def run_capped(conn, query: str, max_rows: int, max_bytes: int, auto_limit: bool = True, batch_rows: int = 200) -> dict:
+  """
+  Executes one statement on an open connection. Row-returning statements give
+  columns, rows, truncation metadata and timings; others are committed and
+  give the affected row count.
+  """
+  started = time.perf_counter()
+  statement, limit = with_limit(query, max_rows + 1) if auto_limit else (query, None)
+  result = conn.execution_options(stream_results=True, yield_per=batch_rows).execute(text(statement))
+  executed = time.perf_counter()
+
+  if not result.returns_rows:
+    rows_affected = result.rowcount
+    conn.commit()
+    finished = time.perf_counter()
+    return {
+      "status": "success",
+      "rows_affected": rows_affected,
+      "timing_ms": {"execute": _ms(executed - started), "total": _ms(finished - started)}
+    }
+
+  columns = list(result.keys())
+  rows, size, truncated_by = [], 0, None
+  try:
+    for row in result:
+      if len(rows) >= max_rows:
+        truncated_by = "max_rows"
+        break
+      cells = [_cell(value) for value in row]
+      row_bytes = len(orjson.dumps(cells, default=str))
+      if size + row_bytes > max_bytes:
+        truncated_by = "max_bytes"
+        break
+      rows.append(cells)
+      size += row_bytes
+  finally:
+    result.close()
+  finished = time.perf_counter()
+
+  response = {
+    "columns": columns,
+    "rows": rows,
+    "row_count": len(rows),
+    "truncated": truncated_by is not None,
+    "truncated_by": truncated_by,
+    "limit_applied": limit,
+    "bytes": size,
+    "timing_ms": {
+      "execute": _ms(executed - started),
+      "fetch": _ms(finished - executed),
+      "total": _ms(finished - started)
+    }
+  }
+  if truncated_by:
+    response["message"] = (
+      f"Result truncated after {len(rows)} rows ({truncated_by}). "
+      "Narrow the query with WHERE, aggregate it, or select fewer columns."
+    )
+  return response
@@ -0,0 +1,137 @@
+"""
+Schema catalog for the MySQL agent.
+
+`load_schema` reads a database's tables, columns, indexes, foreign keys and
+row estimates from information_schema in three bulk queries on one
+connection, instead of one SHOW TABLES / DESCRIBE round trip (and LLM turn)
+per table. The agent caches the result in the shared tool cache under
+("mysql", db_name) and drops it when DDL goes through its own tools.
+
+`digest` renders the schema as one compact line per table, e.g.
+
+  orders ~120k rows: id bigint PK auto, customer_id int ->customers.id, status varchar(16), note text NULL | idx status(status)
+
+and, for a whole database, stops adding column detail once `max_chars` is
+reached, listing the remaining tables by name only. Tables asked for by name
+are always described in full.
+"""
+
+from sqlalchemy import text
+
+_TABLES_AND_COLUMNS = text("""
+  SELECT t.table_name AS table_name, t.table_type AS table_type, t.table_rows AS table_rows,
+         c.column_name AS column_name, c.column_type AS column_type, c.is_nullable AS is_nullable,
+         c.column_key AS column_key, c.extra AS extra
+  FROM information_schema.tables t
+  JOIN information_schema.columns c ON c.table_schema = t.table_schema AND c.table_name = t.table_name
+  WHERE t.table_schema = :db
+  ORDER BY t.table_name, c.ordinal_position
+""")
+
+_INDEXES = text("""
+  SELECT table_name AS table_name, index_name AS index_name, MIN(non_unique) AS non_unique,
+         GROUP_CONCAT(column_name ORDER BY seq_in_index SEPARATOR ',') AS columns
+  FROM information_schema.statistics
+  WHERE table_schema = :db AND index_name <> 'PRIMARY'
+  GROUP BY table_name, index_name
+  ORDER BY table_name, index_name
+""")
+
+_FOREIGN_KEYS = text("""
+  SELECT table_name AS table_name, column_name AS column_name,
+         referenced_table_name AS referenced_table, referenced_column_name AS referenced_column
+  FROM information_schema.key_column_usage
+  WHERE table_schema = :db AND referenced_table_name IS NOT NULL
+""")
+
+def load_schema(conn, db_name: str) -> dict:
+  """Returns {table: {"type", "rows", "columns": [...], "indexes": [...]}} for db_name."""
+  tables = {}
+  for row in conn.execute(_TABLES_AND_COLUMNS, {"db": db_name}).mappings():
+    table = tables.setdefault(row["table_name"], {
+      "type": "view" if row["table_type"] == "VIEW" else "table",
+      "rows": row["table_rows"],
+      "columns": [],
+      "indexes": []
+    })
+    table["columns"].append({
+      "name": row["column_name"],
+      "type": row["column_type"],
+      "nullable": row["is_nullable"] == "YES",
+      "primary": row["column_key"] == "PRI",
+      "auto": "auto_increment" in (row["extra"] or ""),
+      "references": None
+    })
+
+  for row in conn.execute(_FOREIGN_KEYS, {"db": db_name}).mappings():
+    for column in tables.get(row["table_name"], {}).get("columns", []):
+      if column["name"] == row["column_name"]:
+        column["references"] = f"{row['referenced_table']}.{row['referenced_column']}"
+
+  for row in conn.execute(_INDEXES, {"db": db_name}).mappings():
+    if row["table_name"] in tables:
+      tables[row["table_name"]]["indexes"].append({
+        "name": row["index_name"],
+        "unique": not int(row["non_unique"]),
+        "columns": row["columns"]
+      })
+  return tables
+
+def _rows(count) -> str:
+  if count is None:
+    return ""
+  count = int(count)
+  for limit, suffix in ((10 ** 9, "G"), (10 ** 6, "M"), (10 ** 3, "k")):
+    if count >= limit:
+      return f" ~{count / limit:.3g}{suffix} rows"
+  return f" ~{count} rows"
+
+def table_line(name: str, table: dict) -> str:
+  columns = []
+  for column in table["columns"]:
+    parts = [column["name"], column["type"]]
+    if column["primary"]:
+      parts.append("PK")
+    if column["auto"]:
+      parts.append("auto")
+    if column["nullable"]:
+      parts.append("NULL")
+    if column["references"]:
+      parts.append(f"->{column['references']}")
+    columns.append(" ".join(parts))
+  line = f"{name}{' [view]' if table['type'] == 'view' else _rows(table['rows'])}: {', '.join(columns)}"
+  if table["indexes"]:
+    line += " | " + ", ".join(
+      f"{'unique ' if index['unique'] else 'idx '}{index['name']}({index['columns']})" for index in table["indexes"]
+    )
+  return line
+
+def digest(schema: dict, max_chars: int, tables: list = None) -> dict:
+  """
+  A prompt-sized text digest of the schema. With `tables`, only those tables are
+  described, in full and without the max_chars cap.
+  """
+  names = sorted(schema)
+  missing = []
+  if tables:
+    wanted = {name.lower() for name in tables}
+    missing = [name for name in tables if name.lower() not in {table.lower() for table in names}]
+    names = [name for name in names if name.lower() in wanted]
+
+  lines, size, detailed = [], 0, 0
+  for name in names:
+    line = table_line(name, schema[name])
+    if not tables and size + len(line) > max_chars and detailed:
+      break
+    lines.append(line)
+    size += len(line) + 1
+    detailed += 1
+  rest = names[detailed:]
+  if rest:
+    shown = ", ".join(rest[:200]) + (", ..." if len(rest) > 200 else "")
+    lines.append(f"... {len(rest)} more tables (ask for them by name): {shown}")
+
+  result = {"tables": len(names), "digest": "\n".join(lines), "truncated": bool(rest)}
+  if missing:
+    result["unknown_tables"] = missing
+  return result
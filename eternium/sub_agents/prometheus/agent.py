@@ -4,6 +4,8 @@ import json
 from prometheus_api_client import PrometheusConnect
 from google.adk import Agent
 from config import settings
+from ...executor import offload_all
+from ...tool_cache import cached
 from . import prompt
 
 # Configuration
@@ -11,6 +13,7 @@ PROMETHEUS_URL = settings.prometheus.url
 
 # Tool Functions
 
+@cached(ttl=15, scope=("prometheus",))
 def run_promql_query(query: str, **kwargs) -> list:
   """
   Executes a PromQL query against the homelab Prometheus instance and returns the raw, structured result.
@@ -45,5 +48,5 @@ def create_prometheus_agent(llm):
     model=llm,
     instruction=prompt.PROMETHEUS_ANALYST_INSTRUCTIONS,
     output_key="prometheus_analyser_output",
-    tools=[run_promql_query]
+    tools=offload_all("prometheus", [run_promql_query])
   )
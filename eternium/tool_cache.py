@@ -0,0 +1,159 @@
+"""
+Shared TTL result cache for read-only tools, with request coalescing.
+
+Read-only tools decorated with `cached` keep their results for a per-tool TTL in
+one process-wide LRU, so repeated calls within a session and across concurrent
+sessions are served from memory. Concurrent identical calls are coalesced
+(singleflight): the first caller runs the backend request and the others wait
+for its result.
+
+Every cached entry has a scope such as ("kubernetes", "media") or ("harbor",
+"library", "nginx"), built from the tool's own arguments. Mutating tools
+decorated with `invalidates` drop every entry whose scope is a prefix of theirs
+or has theirs as a prefix, so a `delete_pod` in 'media' clears both the
+'media' listings and the cluster-wide ones.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from config import settings
+
+def _is_error(result) -> bool:
+  """Errors are never cached; tools report them as {'error': ...} or [{'error': ...}]."""
+  if isinstance(result, dict):
+    return "error" in result or result.get("status") == "error"
+  if isinstance(result, list) and result and isinstance(result[0], dict):
+    return "error" in result[0]
+  return False
+
+def _overlaps(a: tuple, b: tuple) -> bool:
+  shorter = min(len(a), len(b))
+  return a[:shorter] == b[:shorter]
+
+class ResultCache:
+  """A thread-safe LRU of tool results with TTLs, scopes and singleflight."""
+
+  def __init__(self, max_entries: int):
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._entries = OrderedDict()  # key -> (expires_at, scope, value)
+    self._inflight = {}            # key -> Future shared by coalesced callers
+    self._invalidations = 0
+    self.hits = self.misses = self.coalesced = self.evictions = 0
+
+  def get_or_call(self, key, scope: tuple, ttl: int, call):
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry and entry[0] > time.monotonic():
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+      future = self._inflight.get(key)
+      leader = future is None
+      if leader:
+        future = self._inflight[key] = Future()
+        generation = self._invalidations
+        self.misses += 1
+      else:
+        self.coalesced += 1
+
+    if not leader:
+      return future.result()
+
+    try:
+      value = call()
+    except BaseException as e:
+      with self._lock:
+        self._inflight.pop(key, None)
+      future.set_exception(e)
+      raise
+
+    with self._lock:
+      self._inflight.pop(key, None)
+      # A mutation that ran while we were fetching may have made this result stale
+      if not _is_error(value) and generation == self._invalidations:
+        self._entries[key] = (time.monotonic() + ttl, scope, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+          self._entries.popitem(last=False)
+          self.evictions += 1
+    future.set_result(value)
+    return value
+
+  def invalidate(self, scope: tuple) -> int:
+    with self._lock:
+      self._invalidations += 1
+      stale = [key for key, (_, entry_scope, _) in self._entries.items() if _overlaps(entry_scope, scope)]
+      for key in stale:
+        del self._entries[key]
+      return len(stale)
+
+  def stats(self) -> dict:
+    with self._lock:
+      lookups = self.hits + self.misses + self.coalesced
+      return {
+        "entries": len(self._entries),
+        "hits": self.hits,
+        "misses": self.misses,
+        "coalesced": self.coalesced,
+        "evictions": self.evictions,
+        "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+      }
+
+RESULT_CACHE = ResultCache(settings.app.tool_cache_max_entries)
+
+def _scope_builder(func, scope_spec: tuple):
+  """
+  Turns a spec like ("harbor", "project_name") into a function of the tool's
+  call arguments: the first item is literal, the rest are argument names.
+  Trailing unset arguments are dropped, widening the scope.
+  """
+  signature = inspect.signature(func)
+
+  def build(args, kwargs) -> tuple:
+    arguments = signature.bind_partial(*args, **kwargs).arguments
+    values = [arguments.get(name) for name in scope_spec[1:]]
+    while values and values[-1] is None:
+      values.pop()
+    return (scope_spec[0], *values)
+
+  return build
+
+def cached(ttl: int, scope: tuple):
+  """Caches a read-only tool's successful results for `ttl` seconds under `scope`."""
+
+  def decorator(func):
+    build_scope = _scope_builder(func, scope)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      if not settings.app.tool_cache_enabled:
+        return func(*args, **kwargs)
+      key = (func.__module__, func.__name__, repr(args), repr(sorted(kwargs.items())))
+      return RESULT_CACHE.get_or_call(key, build_scope(args, kwargs), ttl, lambda: func(*args, **kwargs))
+
+    return wrapper
+
+  return decorator
+
+def invalidates(*scopes: tuple):
+  """Marks a mutating tool: after it runs, cached results overlapping any of `scopes` are dropped."""
+
+  def decorator(func):
+    builders = [_scope_builder(func, scope) for scope in scopes]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      try:
+        return func(*args, **kwargs)
+      finally:
+        for build_scope in builders:
+          RESULT_CACHE.invalidate(build_scope(args, kwargs))
+
+    return wrapper
+
+  return decorator
@@ -3,6 +3,8 @@ import uvicorn
 from fastapi import FastAPI
 from google.adk.cli.fast_api import get_fast_api_app
 from config import settings
+from eternium.router import ROUTER_STATS
+from eternium.tool_cache import RESULT_CACHE
 
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -19,5 +21,39 @@ app: FastAPI = get_fast_api_app(
 def health():
   return {"status": "ok"}
 
+# Fast-path router decisions and hit rate.
+@app.get('/metrics/router', tags=["Metrics"])
+def router_metrics():
+  return ROUTER_STATS.snapshot()
+
+# Shared tool result cache hit rate and size.
+@app.get('/metrics/tool-cache', tags=["Metrics"])
+def tool_cache_metrics():
+  return RESULT_CACHE.stats()
+
+# Memory agent embedding cache hit rate and size.
+@app.get('/metrics/embedding-cache', tags=["Metrics"])
+def embedding_cache_metrics():
+  if not (settings.app.enabled_memory and settings.memory.embedding_cache_enabled):
+    return {"enabled": False}
+  from eternium.sub_agents.memory.agent import embeddings
+  return {"enabled": True, **embeddings.stats()}
+
+# MySQL agent per-database connection pools.
+@app.get('/metrics/mysql-pools', tags=["Metrics"])
+def mysql_pool_metrics():
+  if not settings.app.enabled_mysql:
+    return {"enabled": False}
+  from eternium.sub_agents.mysql.engines import ENGINES
+  return {"enabled": True, **ENGINES.stats()}
+
+# Helm native release reader: list calls and decode cache reuse.
+@app.get('/metrics/helm-releases', tags=["Metrics"])
+def helm_release_metrics():
+  if not settings.app.enabled_helm:
+    return {"enabled": False}
+  from eternium.sub_agents.helm.releases import HELM_RELEASES
+  return {"enabled": True, **HELM_RELEASES.stats()}
+
 if __name__ == "__main__":
   uvicorn.run(app, host=settings.app.host, port=settings.app.port)